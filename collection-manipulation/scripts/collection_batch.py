@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+Run many collection operations through POST /api/tools concurrently.
+
+Each operation is one `/api/tools` payload (tool_id, history_id, inputs,
+as in references/api-patterns.md) plus an optional `key`. Operations are
+submitted from a bounded thread pool with `use_cached_job` enabled for the
+deterministic collection tools, and all resulting jobs are tracked by one
+shared poller that lists job states per history instead of polling every
+job separately.
+
+An input may reference the output collection of another operation in the
+same batch with {"src": "hdca", "from": "<key>"} (optionally "output":
+"<output name>"). Galaxy returns output collection ids at submission time,
+so chained operations are queued right away and Galaxy schedules them once
+their inputs are ready - no waiting between steps.
+
+Usage:
+    # Filter failed datasets then sort, across many histories
+    python collection_batch.py operations.yml --url https://usegalaxy.org --api-key KEY
+
+    # Submit only, write the collection mapping, do not wait for jobs
+    python collection_batch.py operations.yml --no-wait --output collections.json
+
+Exit status: 0 when every operation finished ok (or was submitted, with
+--no-wait), 1 when an operation failed or its state could not be polled,
+2 when --timeout expired with jobs still running.
+
+Operations file (YAML or JSON list):
+    - key: filtered_h1
+      tool_id: __FILTER_FAILED_DATASETS__
+      history_id: abc123
+      inputs: {input: {src: hdca, id: coll1}}
+    - key: sorted_h1
+      tool_id: __SORTLIST__
+      history_id: abc123
+      inputs:
+        input: {src: hdca, from: filtered_h1}
+        sort_type|sort_type: alpha
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+DEFAULT_WORKERS = 8
+DEFAULT_WAIT_TIMEOUT = 24 * 3600
+# Consecutive polling cycles with failed requests before giving up
+MAX_POLL_FAILURES = 5
+
+# Their result depends on element states/contents at run time, not only on
+# parameters and input ids, so a cached job may not match what would run now
+NO_CACHE_TOOLS = {"__FILTER_FAILED_DATASETS__", "__FILTER_EMPTY_DATASETS__", "__DATA_FETCH__"}
+
+OK_STATES = {"ok", "skipped"}
+FAILED_STATES = {"error", "failed", "deleted", "deleting", "paused", "stopped"}
+
+
+class GalaxyAPIError(Exception):
+    """Galaxy returned an error response"""
+
+
+class CollectionBatch:
+    """Submit collection operations concurrently and track their jobs together"""
+
+    def __init__(self, url: str, api_key: str, workers: int = DEFAULT_WORKERS, timeout: float = 60):
+        """
+        Args:
+            url: Galaxy instance URL
+            api_key: Galaxy API key
+            workers: Maximum concurrent API requests
+            timeout: Per-request timeout in seconds
+        """
+        self.url = url.rstrip("/")
+        self.api_key = api_key
+        self.workers = workers
+        self.timeout = timeout
+
+    # ── HTTP ──
+
+    def _request(self, method: str, path: str, payload: Optional[Dict[str, Any]] = None, **params) -> Any:
+        url = f"{self.url}/api/{path}"
+        if params:
+            url += "?" + urllib.parse.urlencode(params)
+        data = json.dumps(payload).encode() if payload is not None else None
+        req = urllib.request.Request(url, data=data, method=method,
+                                     headers={"x-api-key": self.api_key, "Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                return json.load(resp)
+        except urllib.error.HTTPError as e:
+            try:
+                message = json.load(e).get("err_msg", e.reason)
+            except ValueError:
+                message = e.reason
+            raise GalaxyAPIError(f"{method} {path}: HTTP {e.code}: {message}") from e
+
+    # ── submission ──
+
+    @staticmethod
+    def _dependencies(value: Any) -> List[str]:
+        if isinstance(value, dict):
+            if "from" in value:
+                return [value["from"]]
+            return [d for v in value.values() for d in CollectionBatch._dependencies(v)]
+        if isinstance(value, list):
+            return [d for v in value for d in CollectionBatch._dependencies(v)]
+        return []
+
+    @staticmethod
+    def _resolve(value: Any, results: Dict[str, Dict[str, Any]]) -> Any:
+        """Replace {"from": key} references with the referenced output collection id"""
+        if isinstance(value, dict):
+            if "from" in value:
+                outputs = results[value["from"]]["output_collections"]
+                name = value.get("output")
+                if name is None:
+                    if not outputs:
+                        raise GalaxyAPIError(f"Operation {value['from']} produced no output collection")
+                    name = next(iter(outputs))
+                if name not in outputs:
+                    raise GalaxyAPIError(f"Operation {value['from']} has no output collection {name!r}")
+                return {"src": value.get("src", "hdca"), "id": outputs[name]}
+            return {k: CollectionBatch._resolve(v, results) for k, v in value.items()}
+        if isinstance(value, list):
+            return [CollectionBatch._resolve(v, results) for v in value]
+        return value
+
+    def _submit(self, op: Dict[str, Any], results: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        payload = {k: v for k, v in op.items() if k != "key"}
+        payload["inputs"] = self._resolve(op.get("inputs", {}), results)
+        payload.setdefault("use_cached_job", op["tool_id"] not in NO_CACHE_TOOLS)
+        response = self._request("POST", "tools", payload)
+        collections = response.get("output_collections", []) + response.get("implicit_collections", [])
+        return {
+            "tool_id": op["tool_id"],
+            "history_id": op["history_id"],
+            "output_collections": {c.get("output_name") or str(i): c["id"] for i, c in enumerate(collections)},
+            "outputs": {d.get("output_name") or str(i): d["id"] for i, d in enumerate(response.get("outputs", []))},
+            "jobs": [j["id"] for j in response.get("jobs", [])],
+        }
+
+    def submit(self, operations: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Submit all operations, in dependency waves, each wave concurrently
+
+        Args:
+            operations: /api/tools payloads with optional `key`; inputs may
+                reference other operations' outputs with {"from": key}
+
+        Returns:
+            Dict of key -> result with output_collections (output name -> id),
+            outputs, jobs, or error. Operations whose dependency failed get
+            an error without being submitted.
+        """
+        ops = {}
+        for i, op in enumerate(operations):
+            key = str(op.get("key", i))
+            if key in ops:
+                raise ValueError(f"Duplicate operation key: {key}")
+            ops[key] = op
+        deps = {key: set(self._dependencies(op.get("inputs", {}))) for key, op in ops.items()}
+        for key, wanted in deps.items():
+            unknown = wanted - ops.keys()
+            if unknown:
+                raise ValueError(f"Operation {key} references unknown operation(s): {', '.join(sorted(unknown))}")
+
+        results: Dict[str, Dict[str, Any]] = {}
+        pending = dict(ops)
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while pending:
+                ready = [k for k in pending if deps[k] <= results.keys()]
+                if not ready:
+                    raise ValueError(f"Circular references between operations: {', '.join(sorted(pending))}")
+                for key in ready:
+                    failed = [d for d in deps[key] if "error" in results[d]]
+                    if failed:
+                        results[key] = {"tool_id": pending.pop(key)["tool_id"],
+                                        "error": f"Dependency failed: {', '.join(failed)}"}
+                ready = [k for k in ready if k in pending]
+
+                def run(key):
+                    try:
+                        return key, self._submit(pending[key], results)
+                    except (GalaxyAPIError, urllib.error.URLError, OSError, ValueError, KeyError) as e:
+                        return key, {"tool_id": pending[key]["tool_id"], "error": str(e)}
+
+                for key, result in pool.map(run, ready):
+                    results[key] = result
+                for key in ready:
+                    del pending[key]
+        return results
+
+    # ── polling ──
+
+    def _history_job_states(self, history_id: str, since: str) -> Dict[str, str]:
+        states, offset, limit = {}, 0, 500
+        while True:
+            page = self._request("GET", "jobs", history_id=history_id, date_range_min=since,
+                                 limit=limit, offset=offset, view="collection")
+            states.update((j["id"], j["state"]) for j in page)
+            if len(page) < limit:
+                return states
+            offset += limit
+
+    def _poll(self, func, *args, **kwargs) -> Any:
+        """Run one polling request; errors are reported and returned instead of raised"""
+        try:
+            return func(*args, **kwargs)
+        except (GalaxyAPIError, urllib.error.URLError, OSError, ValueError) as e:
+            print(f"  poll failed: {e}", file=sys.stderr)
+            return e
+
+    def wait(self, results: Dict[str, Dict[str, Any]], interval: float = 2, max_interval: float = 30,
+             timeout: Optional[float] = DEFAULT_WAIT_TIMEOUT) -> Dict[str, str]:
+        """
+        Wait for every job in `results` with one shared poller
+
+        Each cycle lists job states once per history (one request per
+        history, concurrently) rather than once per job. Jobs missing from
+        the listing are fetched individually. The interval backs off while
+        nothing changes, or while polling requests fail; a failed request
+        is retried next cycle, and waiting stops only after
+        MAX_POLL_FAILURES cycles in a row had failures.
+
+        Args:
+            timeout: Stop waiting after this many seconds (None or 0: wait
+                     until every job is terminal)
+
+        Returns:
+            Dict of job id -> terminal state (or last seen state on timeout).
+            Each result also gets `state` (ok/error/running) and, for failed
+            jobs, `job_errors` with the job's stderr. If waiting stopped
+            because polling kept failing, unfinished results get `poll_error`.
+        """
+        job_history = {job: r["history_id"] for r in results.values() for job in r.get("jobs", [])}
+        states: Dict[str, str] = {}
+        since = (datetime.now(timezone.utc) - timedelta(days=1)).strftime("%Y-%m-%d")
+        start = time.monotonic()
+        delay = interval
+        poll_failures = 0
+        last_error: Optional[Exception] = None
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while True:
+                waiting = [j for j in job_history if states.get(j) not in OK_STATES | FAILED_STATES]
+                if not waiting or (timeout and time.monotonic() - start > timeout):
+                    break
+                histories = sorted({job_history[j] for j in waiting})
+                before = dict(states)
+                errors, unlisted_histories = [], set()
+                for history, listing in zip(histories, pool.map(
+                        lambda h: self._poll(self._history_job_states, h, since), histories)):
+                    if isinstance(listing, Exception):
+                        errors.append(listing)
+                        unlisted_histories.add(history)
+                    else:
+                        states.update((j, s) for j, s in listing.items() if j in job_history)
+                # jobs of a history whose listing failed wait for the next cycle
+                unlisted = [j for j in waiting if j not in states and job_history[j] not in unlisted_histories]
+                for job in pool.map(lambda j: self._poll(self._request, "GET", f"jobs/{j}"), unlisted):
+                    if isinstance(job, Exception):
+                        errors.append(job)
+                    else:
+                        states[job["id"]] = job["state"]
+                done = len(job_history) - len([j for j in job_history if states.get(j) not in OK_STATES | FAILED_STATES])
+                print(f"  {done}/{len(job_history)} jobs finished", file=sys.stderr)
+                if done == len(job_history):
+                    break
+                if errors:
+                    poll_failures += 1
+                    last_error = errors[-1]
+                    if poll_failures >= MAX_POLL_FAILURES:
+                        print(f"  giving up after {poll_failures} failed polling cycles", file=sys.stderr)
+                        break
+                    delay = min(delay * 2, max_interval)
+                else:
+                    poll_failures = 0
+                    delay = interval if states != before else min(delay * 1.5, max_interval)
+                time.sleep(delay)
+
+            failed_jobs = [j for j, s in states.items() if s in FAILED_STATES]
+            details = {}
+            for job_id, job in zip(failed_jobs, pool.map(
+                    lambda j: self._poll(self._request, "GET", f"jobs/{j}", full="true"), failed_jobs)):
+                details[job_id] = {"state": states[job_id]} if isinstance(job, Exception) else job
+
+        for result in results.values():
+            if "error" in result:
+                continue
+            job_states = [states.get(j) for j in result["jobs"]]
+            if any(s in FAILED_STATES for s in job_states):
+                result["state"] = "error"
+                result["job_errors"] = {j: (details[j].get("stderr") or details[j]["state"]).strip()
+                                        for j in result["jobs"] if j in details}
+            elif all(s in OK_STATES for s in job_states):
+                result["state"] = "ok"
+            else:
+                result["state"] = "running"
+                if poll_failures >= MAX_POLL_FAILURES:
+                    result["poll_error"] = str(last_error)
+        return states
+
+
+def load_operations(path: Path) -> List[Dict[str, Any]]:
+    with open(path) as f:
+        if path.suffix == ".json":
+            data = json.load(f)
+        else:
+            try:
+                import yaml
+            except ImportError:
+                print("Error: PyYAML is not installed. Install with: pip install pyyaml", file=sys.stderr)
+                sys.exit(1)
+            data = yaml.safe_load(f)
+    if isinstance(data, dict):
+        data = data.get("operations", [])
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run collection operations concurrently via POST /api/tools",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument("operations", type=Path, help="YAML/JSON list of /api/tools payloads")
+    parser.add_argument("--url", help="Galaxy instance URL (or set GALAXY_URL env var)")
+    parser.add_argument("--api-key", help="Galaxy API key (or set GALAXY_API_KEY env var)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Concurrent API requests (default: {DEFAULT_WORKERS})")
+    parser.add_argument("--no-wait", action="store_true", help="Submit only; do not wait for jobs")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_WAIT_TIMEOUT,
+                        help=f"Stop waiting after this many seconds; unfinished jobs are reported as running "
+                             f"and the exit status is 2 (default: {DEFAULT_WAIT_TIMEOUT}, 0 waits indefinitely)")
+    parser.add_argument("--output", type=Path, help="Write key -> output collections mapping as JSON")
+    args = parser.parse_args()
+
+    url = args.url or os.environ.get("GALAXY_URL")
+    api_key = args.api_key or os.environ.get("GALAXY_API_KEY")
+    if not url or not api_key:
+        print("Error: Galaxy URL and API key required (--url/--api-key or GALAXY_URL/GALAXY_API_KEY)",
+              file=sys.stderr)
+        sys.exit(1)
+
+    operations = load_operations(args.operations)
+    batch = CollectionBatch(url, api_key, args.workers)
+    try:
+        results = batch.submit(operations)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    submitted = sum(1 for r in results.values() if "error" not in r)
+    print(f"Submitted {submitted}/{len(results)} operations")
+
+    if not args.no_wait:
+        batch.wait(results, timeout=args.timeout)
+
+    failed = unknown = unfinished = 0
+    for key, result in results.items():
+        collections = ", ".join(f"{name}={cid}" for name, cid in result.get("output_collections", {}).items())
+        if "error" in result or result.get("state") == "error":
+            failed += 1
+            reason = result.get("error") or "; ".join(result.get("job_errors", {}).values())
+            print(f"❌ {key} ({result['tool_id']}): {reason}")
+        elif result.get("state") == "running":
+            print(f"⏳ {key} ({result['tool_id']}): {collections}")
+            if result.get("poll_error"):
+                unknown += 1
+                print(f"   State unknown, polling failed: {result['poll_error']}")
+            elif not args.no_wait:
+                unfinished += 1
+                print(f"   Still running after --timeout {args.timeout:g}s")
+        else:
+            print(f"✅ {key} ({result['tool_id']}): {collections}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if failed or unknown:
+        sys.exit(1)
+    sys.exit(2 if unfinished else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""
+Persistent, content-addressed cache around gxy.get for JupyterLite notebooks.
+
+JupyterLite keeps its file browser drive (mounted at /drive in the kernel)
+in the browser's IndexedDB, so files written there survive kernel restarts
+and page reloads. This module stores downloaded datasets there, keyed by
+Galaxy dataset id and update_time, deduplicated by content hash, and evicts
+the least recently used files beyond a size limit.
+
+Galaxy datasets in state "ok" never change, so a cached dataset is served
+without any request; a HID is resolved to its dataset id once per history
+and remembered.
+
+Usage (put this file next to the notebook in the JupyterLite file browser):
+
+    import gxy
+    import gxy_cache
+    gxy_cache.install()            # gxy.get is now cached; adds gxy.get_many
+
+    path = await gxy.get(13437)    # downloads once, then served from the drive
+    paths = await gxy.get_many([13372, 13437, 13681])  # concurrent downloads
+
+    gxy_cache.info()               # entries, size, limit
+    gxy_cache.clear()
+
+Only `identifier_type="hid"` and `"id"` are cached; name/tag/regex lookups
+are passed through to the original gxy.get.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import time
+from typing import Any, Dict, List, Optional, Union
+
+DEFAULT_CACHE_DIR = "/drive/.gxy_cache" if os.path.isdir("/drive") else os.path.expanduser("~/.cache/gxy")
+DEFAULT_MAX_BYTES = 500 * 1024 * 1024
+DEFAULT_CONCURRENCY = 4
+
+TERMINAL_STATES = {"ok"}
+
+
+class GxyCache:
+    """Size-bounded LRU dataset cache on persistent storage"""
+
+    def __init__(self, get, api, get_history_id, cache_dir: str = DEFAULT_CACHE_DIR,
+                 max_bytes: int = DEFAULT_MAX_BYTES, concurrency: int = DEFAULT_CONCURRENCY):
+        """
+        Args:
+            get: The original (uncached) gxy.get coroutine
+            api: gxy.api coroutine, used for dataset metadata
+            get_history_id: gxy.get_history_id coroutine
+            cache_dir: Directory for objects and manifest (persistent under /drive)
+            max_bytes: Evict least recently used objects beyond this total size
+            concurrency: Maximum simultaneous downloads in get_many
+        """
+        self._get = get
+        self._api = api
+        self._get_history_id = get_history_id
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.concurrency = concurrency
+        self._history_id: Optional[str] = None
+        self._manifest_path = os.path.join(cache_dir, "manifest.json")
+        os.makedirs(os.path.join(cache_dir, "objects"), exist_ok=True)
+        self.manifest = self._load()
+
+    # ── manifest ──
+
+    def _load(self) -> Dict[str, Any]:
+        try:
+            with open(self._manifest_path) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            manifest = {}
+        for key in ("hids", "datasets", "objects"):
+            manifest.setdefault(key, {})
+        return manifest
+
+    def _save(self):
+        tmp = self._manifest_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.manifest, f)
+        os.replace(tmp, self._manifest_path)
+
+    # ── lookup ──
+
+    async def _history(self) -> str:
+        if self._history_id is None:
+            self._history_id = await self._get_history_id()
+        return self._history_id
+
+    async def _dataset_id(self, identifier: Union[int, str], identifier_type: str) -> str:
+        if identifier_type == "id":
+            return str(identifier)
+        key = f"{await self._history()}:{identifier}"
+        if key not in self.manifest["hids"]:
+            # HIDs are never reused within a history, so this is resolved only once
+            contents = await self._api(
+                f"/api/histories/{await self._history()}/contents?v=dev&keys=id,hid"
+                f"&q=hid-eq&qv={identifier}&q=history_content_type-eq&qv=dataset")
+            if not contents:
+                raise ValueError(f"No dataset with HID {identifier} in the current history")
+            self.manifest["hids"][key] = contents[0]["id"]
+        return self.manifest["hids"][key]
+
+    def _object_path(self, entry: Optional[Dict[str, Any]]) -> Optional[str]:
+        obj = self.manifest["objects"].get(entry["object"]) if entry else None
+        if not obj or not os.path.exists(obj["path"]):
+            return None
+        obj["last_access"] = time.time()
+        return obj["path"]
+
+    def _cached_path(self, dataset_id: str) -> Optional[str]:
+        """Path of a cached dataset that can no longer change, without any request"""
+        entry = self.manifest["datasets"].get(dataset_id)
+        if not entry or entry.get("state") not in TERMINAL_STATES:
+            return None
+        return self._object_path(entry)
+
+    # ── download ──
+
+    async def _download(self, dataset_id: str) -> str:
+        meta = await self._api(f"/api/datasets/{dataset_id}?keys=id,update_time,state,extension,file_size")
+        entry = self.manifest["datasets"].get(dataset_id)
+        if entry and entry.get("update_time") == meta.get("update_time"):
+            path = self._object_path(entry)
+            if path:
+                entry["state"] = meta.get("state")
+                return path
+
+        downloaded = await self._get(dataset_id, identifier_type="id")
+        digest = hashlib.sha256()
+        with open(downloaded, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        object_id = digest.hexdigest()
+        ext = meta.get("extension") or "dat"
+        path = os.path.join(self.cache_dir, "objects", f"{object_id}.{ext}")
+        if os.path.exists(path):
+            os.remove(downloaded)
+        else:
+            shutil.move(downloaded, path)
+        self.manifest["objects"][object_id] = {"path": path, "size": os.path.getsize(path),
+                                               "last_access": time.time()}
+        self.manifest["datasets"][dataset_id] = {"object": object_id, "update_time": meta.get("update_time"),
+                                                 "state": meta.get("state"), "extension": ext}
+        return path
+
+    def _evict(self, keep: set):
+        """Remove least recently used objects until under max_bytes, never those in `keep`"""
+        objects = self.manifest["objects"]
+        total = sum(o["size"] for o in objects.values())
+        for object_id, obj in sorted(objects.items(), key=lambda item: item[1]["last_access"]):
+            if total <= self.max_bytes:
+                break
+            if object_id in keep:
+                continue
+            if os.path.exists(obj["path"]):
+                os.remove(obj["path"])
+            total -= obj["size"]
+            del objects[object_id]
+        live = set(objects)
+        self.manifest["datasets"] = {k: v for k, v in self.manifest["datasets"].items() if v["object"] in live}
+
+    # ── public ──
+
+    async def get_many(self, identifiers: List[Union[int, str]], identifier_type: str = "hid",
+                       retrieve_datatype: bool = False) -> List[Any]:
+        """
+        Fetch several datasets, serving cached ones locally and downloading the rest concurrently
+
+        Returns:
+            Paths in the order of `identifiers` (or (path, datatype) tuples
+            with retrieve_datatype=True)
+        """
+        if identifier_type not in ("hid", "id"):
+            return await self._get(identifiers, identifier_type=identifier_type,
+                                   retrieve_datatype=retrieve_datatype)
+        dataset_ids = await asyncio.gather(*(self._dataset_id(i, identifier_type) for i in identifiers))
+        paths: Dict[str, str] = {}
+        for dataset_id in dataset_ids:
+            path = self._cached_path(dataset_id)
+            if path:
+                paths[dataset_id] = path
+
+        missing = [d for d in dict.fromkeys(dataset_ids) if d not in paths]
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def fetch(dataset_id):
+            async with semaphore:
+                paths[dataset_id] = await self._download(dataset_id)
+
+        try:
+            await asyncio.gather(*(fetch(d) for d in missing))
+        finally:
+            if missing:
+                self._evict({self.manifest["datasets"][d]["object"] for d in paths})
+            self._save()
+
+        if retrieve_datatype:
+            return [(paths[d], self.manifest["datasets"][d]["extension"]) for d in dataset_ids]
+        return [paths[d] for d in dataset_ids]
+
+    async def get(self, identifiers, identifier_type: str = "hid", retrieve_datatype: bool = False):
+        """Drop-in replacement for gxy.get (single identifier or list)"""
+        if isinstance(identifiers, (list, tuple)):
+            return await self.get_many(list(identifiers), identifier_type, retrieve_datatype)
+        if identifier_type not in ("hid", "id"):
+            return await self._get(identifiers, identifier_type=identifier_type,
+                                   retrieve_datatype=retrieve_datatype)
+        return (await self.get_many([identifiers], identifier_type, retrieve_datatype))[0]
+
+    def info(self) -> Dict[str, Any]:
+        objects = self.manifest["objects"]
+        return {"cache_dir": self.cache_dir, "datasets": len(self.manifest["datasets"]),
+                "objects": len(objects), "bytes": sum(o["size"] for o in objects.values()),
+                "max_bytes": self.max_bytes}
+
+    def clear(self):
+        shutil.rmtree(os.path.join(self.cache_dir, "objects"), ignore_errors=True)
+        os.makedirs(os.path.join(self.cache_dir, "objects"), exist_ok=True)
+        self.manifest = {"hids": {}, "datasets": {}, "objects": {}}
+        self._save()
+
+
+_cache: Optional[GxyCache] = None
+
+
+def install(cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES,
+            concurrency: int = DEFAULT_CONCURRENCY) -> GxyCache:
+    """
+    Replace gxy.get with the cached version and add gxy.get_many
+
+    Safe to call again (e.g. re-running the import cell); the original
+    gxy.get is wrapped only once.
+    """
+    global _cache
+    import gxy
+
+    original = getattr(gxy, "_uncached_get", gxy.get)
+    gxy._uncached_get = original
+    _cache = GxyCache(original, gxy.api, gxy.get_history_id, cache_dir, max_bytes, concurrency)
+    gxy.get = _cache.get
+    gxy.get_many = _cache.get_many
+    return _cache
+
+
+def info() -> Dict[str, Any]:
+    return _cache.info() if _cache else {}
+
+
+def clear():
+    if _cache:
+        _cache.clear()
@@ -0,0 +1,297 @@
+"""
+Streaming column statistics for large tabular datasets in JupyterLite notebooks.
+
+The Pyodide heap cannot hold a multi-GB Galaxy tabular output, so
+`pd.read_csv(path)` followed by `df[2].mean()` fails long before the
+arithmetic starts. This module reads only the requested columns, in chunks
+with explicit dtypes, and folds every chunk into fixed-size summaries:
+
+- numeric columns: count, missing, sum, mean, std, min, max and a quantile
+  sketch (KLL-style; rank error well under 1% with the default size)
+- categorical columns: value counts, bounded to the most frequent values
+
+Memory stays constant however many rows the file has.
+
+Usage (put this file next to the notebook in the JupyterLite file browser):
+
+    import gxy
+    import tabular_stats
+
+    path = await gxy.get(13437)
+    stats = tabular_stats.scan(path, numeric=[2], categorical=[0])
+
+    stats[2].mean
+    stats[2].quantiles([0.05, 0.5, 0.95])
+    stats[0].most_common(10)
+    tabular_stats.describe(stats)      # one row per numeric column, like df.describe().T
+
+Columns are 0-based positions (header=None, the default, as for most Galaxy
+tabular outputs) or names when `header=0` is passed.
+"""
+
+import math
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+Column = Union[int, str]
+
+DEFAULT_CHUNKSIZE = 200_000
+DEFAULT_SKETCH_SIZE = 400
+DEFAULT_MAX_VALUES = 10_000
+
+
+# ── quantile sketch ──
+
+
+class QuantileSketch:
+    """
+    KLL quantile sketch: a stack of compactors of at most `k` items each
+
+    Level h holds items that each stand for 2**h inputs. When a level fills
+    up it is sorted and every other item (random offset) is promoted to the
+    next level, so memory is O(k log(n / k)) and the rank error is about
+    1.7 / k.
+    """
+
+    def __init__(self, k: int = DEFAULT_SKETCH_SIZE, seed: Optional[int] = None):
+        self.k = k
+        self.n = 0
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values: np.ndarray):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        self.n += len(values)
+        # feed large chunks in slices so level 0 never grows beyond a few k
+        for start in range(0, len(values), self.k):
+            self.levels[0] = np.concatenate([self.levels[0], values[start:start + self.k]])
+            self._compress()
+
+    def merge(self, other: "QuantileSketch"):
+        for h, items in enumerate(other.levels):
+            if h == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[h] = np.concatenate([self.levels[h], items])
+        self.n += other.n
+        self._compress()
+
+    def _compress(self):
+        for h in range(len(self.levels)):
+            items = self.levels[h]
+            if len(items) < self.k:
+                continue
+            items = np.sort(items)
+            if len(items) % 2:
+                # keep one item back so an even number is compacted
+                keep, items = items[-1:], items[:-1]
+            else:
+                keep = items[:0]
+            if h + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[h + 1] = np.concatenate([self.levels[h + 1], items[self._rng.integers(2)::2]])
+            self.levels[h] = keep
+
+    def quantiles(self, qs: Sequence[float]) -> List[float]:
+        """Approximate values at the given quantiles (0 ≤ q ≤ 1)"""
+        if self.n == 0:
+            return [math.nan] * len(qs)
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2 ** h) for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        items, cumulative = items[order], np.cumsum(weights[order])
+        ranks = np.asarray(qs, dtype=float) * cumulative[-1]
+        index = np.minimum(np.searchsorted(cumulative, ranks, side="left"), len(items) - 1)
+        return items[index].tolist()
+
+
+# ── column summaries ──
+
+
+class NumericStats:
+    """Count, sum, mean, std, min, max and quantile sketch of a numeric column"""
+
+    def __init__(self, sketch_size: int = DEFAULT_SKETCH_SIZE):
+        self.count = 0
+        self.missing = 0
+        self.invalid = 0
+        self.sum = 0.0
+        self.mean = math.nan
+        self._m2 = 0.0
+        self.min = math.nan
+        self.max = math.nan
+        self.sketch = QuantileSketch(sketch_size)
+
+    def update(self, values: Union[pd.Series, np.ndarray]):
+        values = np.asarray(values, dtype=float)
+        valid = values[~np.isnan(values)]
+        self.missing += len(values) - len(valid)
+        n = len(valid)
+        if n == 0:
+            return
+        chunk_mean = float(valid.mean())
+        chunk_m2 = float(((valid - chunk_mean) ** 2).sum())
+        if self.count == 0:
+            self.mean, self._m2 = chunk_mean, chunk_m2
+            self.min, self.max = float(valid.min()), float(valid.max())
+        else:
+            # Chan et al. pairwise combination of running mean / sum of squares
+            total = self.count + n
+            delta = chunk_mean - self.mean
+            self.mean += delta * n / total
+            self._m2 += chunk_m2 + delta * delta * self.count * n / total
+            self.min, self.max = min(self.min, float(valid.min())), max(self.max, float(valid.max()))
+        self.count += n
+        self.sum += float(valid.sum())
+        self.sketch.update(valid)
+
+    @property
+    def std(self) -> float:
+        """Sample standard deviation (ddof=1, as pandas)"""
+        return math.sqrt(self._m2 / (self.count - 1)) if self.count > 1 else math.nan
+
+    def quantiles(self, qs: Sequence[float]) -> List[float]:
+        return self.sketch.quantiles(qs)
+
+    @property
+    def median(self) -> float:
+        return self.quantiles([0.5])[0]
+
+    def to_dict(self) -> Dict[str, Any]:
+        q25, q50, q75 = self.quantiles([0.25, 0.5, 0.75])
+        return {"count": self.count, "missing": self.missing, "invalid": self.invalid, "mean": self.mean,
+                "std": self.std, "min": self.min, "25%": q25, "50%": q50, "75%": q75, "max": self.max,
+                "sum": self.sum}
+
+    def __repr__(self):
+        return f"NumericStats(count={self.count}, mean={self.mean:.6g}, min={self.min:.6g}, max={self.max:.6g})"
+
+
+class ValueCounts:
+    """
+    Value counts of a categorical column, bounded to `max_values` entries
+
+    Counts are exact while the column has at most `max_values` distinct
+    values. Beyond that the least frequent values are dropped after each
+    chunk (`truncated` is set), and a surviving count may be low by at most
+    `error`.
+    """
+
+    def __init__(self, max_values: int = DEFAULT_MAX_VALUES):
+        self.max_values = max_values
+        self.counts = pd.Series(dtype="int64")
+        self.total = 0
+        self.missing = 0
+        self.truncated = False
+        self.error = 0
+
+    def update(self, values: pd.Series):
+        chunk = values.value_counts(dropna=True)
+        self.missing += int(values.isna().sum())
+        self.total += int(chunk.sum())
+        self.counts = self.counts.add(chunk, fill_value=0).astype("int64")
+        if len(self.counts) > self.max_values:
+            self.counts = self.counts.sort_values(ascending=False, kind="stable")
+            self.error += int(self.counts.iloc[self.max_values])
+            self.counts = self.counts.iloc[:self.max_values]
+            self.truncated = True
+
+    def most_common(self, n: Optional[int] = None) -> List[Tuple[Any, int]]:
+        counts = self.counts.sort_values(ascending=False, kind="stable")
+        return list(counts.iloc[:n].items()) if n else list(counts.items())
+
+    def to_series(self) -> pd.Series:
+        return self.counts.sort_values(ascending=False, kind="stable")
+
+    def __repr__(self):
+        return f"ValueCounts(total={self.total}, distinct={len(self.counts)}, truncated={self.truncated})"
+
+
+# ── scanning ──
+
+
+def scan_chunks(chunks: Iterable[pd.DataFrame], numeric: Sequence[Column] = (),
+                categorical: Sequence[Column] = (), coerce: bool = False,
+                sketch_size: int = DEFAULT_SKETCH_SIZE,
+                max_values: int = DEFAULT_MAX_VALUES) -> Dict[Column, Union[NumericStats, ValueCounts]]:
+    """
+    Fold an iterable of DataFrames into per-column summaries
+
+    Args:
+        chunks: DataFrames with the same columns (e.g. a read_csv chunk iterator)
+        numeric: Columns summarized with NumericStats
+        categorical: Columns summarized with ValueCounts
+        coerce: Convert numeric columns with pd.to_numeric(errors="coerce"),
+                counting unparseable values as `invalid` (not `missing`)
+                instead of raising; count + missing + invalid is the row count
+        sketch_size: QuantileSketch size (larger = more accurate quantiles)
+        max_values: Distinct values kept per categorical column
+
+    Returns:
+        Dict of column -> NumericStats or ValueCounts
+    """
+    stats: Dict[Column, Union[NumericStats, ValueCounts]] = {}
+    for column in numeric:
+        stats[column] = NumericStats(sketch_size)
+    for column in categorical:
+        stats[column] = ValueCounts(max_values)
+    for chunk in chunks:
+        for column in numeric:
+            values = chunk[column]
+            if coerce:
+                parsed = pd.to_numeric(values, errors="coerce")
+                invalid = int((parsed.isna() & values.notna()).sum())
+                stats[column].invalid += invalid
+                stats[column].update(parsed)
+                # update() saw unparseable values as NaN; they are invalid, not missing
+                stats[column].missing -= invalid
+            else:
+                stats[column].update(values)
+        for column in categorical:
+            stats[column].update(chunk[column])
+    return stats
+
+
+def scan(path: str, numeric: Sequence[Column] = (), categorical: Sequence[Column] = (),
+         chunksize: int = DEFAULT_CHUNKSIZE, coerce: bool = False, sketch_size: int = DEFAULT_SKETCH_SIZE,
+         max_values: int = DEFAULT_MAX_VALUES, sep: str = "\t", header: Optional[int] = None,
+         **read_csv: Any) -> Dict[Column, Union[NumericStats, ValueCounts]]:
+    """
+    Summarize columns of a tabular file in one chunked pass
+
+    Only the requested columns are parsed (`usecols`), numeric columns as
+    float64 and categorical columns as strings, so memory is bounded by
+    `chunksize` rows of those columns.
+
+    Args:
+        path: File path (e.g. from gxy.get)
+        numeric: Columns summarized with NumericStats
+        categorical: Columns summarized with ValueCounts
+        chunksize: Rows read per chunk
+        coerce: Skip unparseable numeric values, counting them in `invalid`
+                (empty cells stay in `missing`) rather than failing; use
+                comment="#" for Galaxy header lines
+        sep, header, **read_csv: Passed to pd.read_csv (e.g. comment="#", skiprows=1)
+
+    Returns:
+        Dict of column -> NumericStats or ValueCounts
+    """
+    if not numeric and not categorical:
+        raise ValueError("Give at least one numeric or categorical column")
+    dtype = {column: str for column in categorical}
+    if not coerce:
+        dtype.update({column: "float64" for column in numeric})
+    else:
+        dtype.update({column: str for column in numeric})
+    reader = pd.read_csv(path, sep=sep, header=header, usecols=list(dict.fromkeys([*numeric, *categorical])),
+                         dtype=dtype, chunksize=chunksize, **read_csv)
+    with reader:
+        return scan_chunks(reader, numeric, categorical, coerce, sketch_size, max_values)
+
+
+def describe(stats: Dict[Column, Union[NumericStats, ValueCounts]]) -> pd.DataFrame:
+    """Numeric summaries as a DataFrame, one row per column (like df.describe().T)"""
+    rows = {column: s.to_dict() for column, s in stats.items() if isinstance(s, NumericStats)}
+    return pd.DataFrame.from_dict(rows, orient="index")
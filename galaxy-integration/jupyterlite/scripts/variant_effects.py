@@ -0,0 +1,295 @@
+"""
+Vectorized variant-effect annotation (synonymous / nonsynonymous / intergenic).
+
+Same results as the step-by-step functions in variant_annotation.ipynb
+(build_cds_lookup_table + annotate_variants_with_effects), but every CDS
+nucleotide is held in NumPy arrays instead of one dict per base, codons are
+translated through a precomputed 65-entry lookup per genetic code, and
+variants are annotated with array operations instead of iterrows(). Large
+variant tables can be annotated chunk by chunk.
+
+Usage (put this file next to the notebook in the JupyterLite file browser):
+
+    from Bio import SeqIO
+    from variant_effects import CDSIndex
+
+    index = CDSIndex.from_record(SeqIO.read(genbank_path, "genbank"))
+    annotated = index.annotate(variants)          # needs POS, REF, ALT columns
+    cds_table = index.to_frame()                  # per-nucleotide table for plots
+
+    # Chunked: never holds the whole variant table in memory
+    for chunk in index.annotate_file(variants_path, chunksize=100_000,
+                                     sep="\\t", header=None, names=[...],
+                                     prepare=add_pos_column):
+        chunk.to_csv("annotated.tsv", sep="\\t", mode="a", index=False)
+
+Requires numpy, pandas and biopython (Pyodide packages, loaded on import in
+JupyterLite; elsewhere `pip install numpy pandas biopython`).
+"""
+
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+INVALID_CODON = 64  # codon index when any base is not A/C/G/T
+
+# Bases are stored as uppercase ASCII bytes; these tables map them to
+# 0..3 (A C G T, 4 = anything else) and to their complement
+_CODE = np.full(256, 4, dtype=np.int16)
+_COMPLEMENT = np.arange(256, dtype=np.uint8)
+for _i, (_b, _c) in enumerate(zip("ACGT", "TGCA")):
+    _CODE[ord(_b)] = _i
+    _COMPLEMENT[ord(_b)] = ord(_c)
+_N = ord("N")
+
+
+def encode(seq: str) -> np.ndarray:
+    """Sequence -> uppercase ASCII byte array"""
+    return np.frombuffer(seq.upper().encode("ascii", "replace"), dtype=np.uint8).copy()
+
+
+def codon_index(codons: np.ndarray) -> np.ndarray:
+    """(n, 3) ASCII bases -> codon index 0..63, or 64 if any base is not A/C/G/T"""
+    codes = _CODE[codons]
+    index = codes[:, 0] * 16 + codes[:, 1] * 4 + codes[:, 2]
+    index[(codes == 4).any(axis=1)] = INVALID_CODON
+    return index
+
+
+def codon_strings(codons: np.ndarray) -> np.ndarray:
+    """(n, 3) ASCII bases -> array of 3-letter strings"""
+    return np.ascontiguousarray(codons).view("S3").ravel().astype(str)
+
+
+_TRANSLATION: Dict[int, np.ndarray] = {}
+
+
+def translation_table(table_id: int) -> np.ndarray:
+    """65-entry array codon index -> amino acid letter ('*' stop, '?' invalid)"""
+    if table_id not in _TRANSLATION:
+        from Bio.Data import CodonTable
+        table = CodonTable.unambiguous_dna_by_id.get(table_id, CodonTable.unambiguous_dna_by_id[1])
+        aa = np.full(65, "?", dtype="<U1")
+        for i in range(64):
+            codon = "ACGT"[i // 16] + "ACGT"[(i // 4) % 4] + "ACGT"[i % 4]
+            aa[i] = "*" if codon in table.stop_codons else table.forward_table.get(codon, "?")
+        _TRANSLATION[table_id] = aa
+    return _TRANSLATION[table_id]
+
+
+class CDSIndex:
+    """Every CDS nucleotide as parallel arrays, sorted for position lookups"""
+
+    def __init__(self, genome_pos, feature, base, codon_pos, codon_number, codons, genes, products, tables):
+        """
+        Args:
+            genome_pos: 1-based genome position per CDS nucleotide
+            feature: Index into genes/products/tables per nucleotide
+            base: ASCII base in coding orientation
+            codon_pos: 0, 1 or 2 within the codon
+            codon_number: 1-based codon number in the CDS
+            codons: (n, 3) ASCII bases of the containing codon in coding
+                orientation ("NNN" for incomplete codons)
+            genes, products, tables: Per-feature gene name, product, transl_table
+        """
+        # A trailing sentinel feature/nucleotide (never matched by a lookup)
+        # lets intergenic variants index every array without special cases
+        self.genes = np.asarray(list(genes) + [None], dtype=object)
+        self.products = np.asarray(list(products) + [None], dtype=object)
+        self.tables = np.asarray(list(tables) + [1], dtype=np.int16)
+
+        # Rows ordered by position, then gene/product: the row order of the
+        # notebook's left merge against its (gene, product, pos)-sorted table
+        gene_rank = np.unique(self.genes[:-1].astype(str), return_inverse=True)[1]
+        product_rank = np.unique(self.products[:-1].astype(str), return_inverse=True)[1]
+        order = np.lexsort((product_rank[feature], gene_rank[feature], genome_pos))
+        self._n = len(order)
+        self.genome_pos = np.append(genome_pos[order], np.iinfo(np.int64).max)
+        self.feature = np.append(feature[order], len(self.genes) - 1).astype(np.int32)
+        self.codon_pos = np.append(codon_pos[order], 0).astype(np.intp)
+        self.codon_number = np.append(codon_number[order], 0).astype(np.int32)
+        self.base = np.append(base[order], _N).astype(np.uint8)
+        self.codons = np.vstack([codons[order], np.full((1, 3), _N)]).astype(np.uint8)
+        self.aa = self._translate(self.codons, self.feature)
+
+    def _translate(self, codons: np.ndarray, feature: np.ndarray) -> np.ndarray:
+        """Amino acid per row, using each row's feature genetic code"""
+        index = codon_index(codons)
+        tables = self.tables[feature]
+        aa = np.full(len(index), "?", dtype="<U1")
+        for table_id in np.unique(tables):
+            rows = tables == table_id
+            aa[rows] = translation_table(int(table_id))[index[rows]]
+        return aa
+
+    @classmethod
+    def from_record(cls, record) -> "CDSIndex":
+        """Build from a Biopython SeqRecord with CDS features"""
+        positions, features, bases, codon_pos, codon_number, codons = [], [], [], [], [], []
+        genes, products, tables = [], [], []
+        for feature in record.features:
+            if feature.type != "CDS":
+                continue
+            q = feature.qualifiers
+            genes.append((q.get("gene") or q.get("locus_tag") or [""])[0])
+            products.append((q.get("product") or [""])[0])
+            tables.append(int((q.get("transl_table") or ["1"])[0]))
+            frame_offset = int((q.get("codon_start") or ["1"])[0]) - 1
+
+            seq = encode(str(feature.extract(record.seq)))
+            n = len(seq)
+            strand = feature.location.strand or 1
+            parts = [np.arange(int(p.start) + 1, int(p.end) + 1) if strand >= 0
+                     else np.arange(int(p.end), int(p.start), -1)
+                     for p in feature.location.parts]
+            pos = np.concatenate(parts)[:n] if parts else np.zeros(0, dtype=np.int64)
+
+            in_frame = np.arange(n) + frame_offset
+            cpos = in_frame % 3
+            start = np.arange(n) - cpos
+            complete = (start >= 0) & (start + 2 < n)
+            # Incomplete codons point at an appended N, giving "NNN"
+            idx = np.where(complete[:, None], start[:, None] + np.arange(3), n)
+
+            positions.append(pos)
+            features.append(np.full(n, len(genes) - 1, dtype=np.int32))
+            bases.append(seq)
+            codon_pos.append(cpos)
+            codon_number.append(in_frame // 3 + 1)
+            codons.append(np.append(seq, _N)[idx])
+
+        if not genes:
+            empty = np.zeros(0, dtype=np.int64)
+            return cls(empty, empty, empty, empty, empty, np.zeros((0, 3), dtype=np.uint8), [], [], [])
+        return cls(*(np.concatenate(a) for a in (positions, features, bases, codon_pos, codon_number, codons)),
+                   genes, products, tables)
+
+    def __len__(self) -> int:
+        return self._n
+
+    def to_frame(self) -> pd.DataFrame:
+        """Per-nucleotide table with the columns of the notebook's cds_table"""
+        n = self._n
+        return pd.DataFrame({
+            "genome_pos": self.genome_pos[:n],
+            "gene": self.genes[self.feature[:n]],
+            "product": self.products[self.feature[:n]],
+            "base": self.base[:n].view("S1").astype(str),
+            "codon": codon_strings(self.codons[:n]),
+            "codon_pos": self.codon_pos[:n] + 1,
+            "codon_number": self.codon_number[:n],
+            "aa": self.aa[:n],
+        })
+
+    def annotate(self, variants: pd.DataFrame, pos: str = "POS", ref: str = "REF", alt: str = "ALT") -> pd.DataFrame:
+        """
+        Annotate variants with codon context, strand, new codon/amino acid and effect
+
+        A variant inside overlapping CDS features yields one row per feature,
+        as with the notebook's merge. Strand is inferred from REF against
+        the coding base ('+' equal, '-' complementary, '?' neither).
+
+        Returns:
+            variants columns + gene, product, genome_pos, base, codon,
+            codon_pos, codon_number, aa, strand, new_codon, new_aa, effect
+        """
+        variant_pos = variants[pos].to_numpy(dtype=np.int64)
+        lo = np.searchsorted(self.genome_pos, variant_pos, side="left")
+        hits = np.searchsorted(self.genome_pos, variant_pos, side="right") - lo
+        repeat = np.maximum(hits, 1)
+        row = np.repeat(np.arange(len(variants)), repeat)
+        coding = np.repeat(hits > 0, repeat)
+        # CDS row for every output row (lo, lo+1, ... within each variant's run; sentinel if intergenic)
+        offset = np.arange(len(row)) - np.repeat(np.cumsum(repeat) - repeat, repeat)
+        cds = np.where(coding, np.repeat(lo, repeat) + offset, self._n)
+        n = len(row)
+
+        ref_allele = variants[ref].astype(str).str.upper().to_numpy(dtype=object)[row]
+        alt_allele = variants[alt].astype(str).str.upper().to_numpy(dtype=object)[row]
+        single_ref = np.fromiter((len(a) == 1 for a in ref_allele), bool, n)
+        single_alt = np.fromiter((len(a) == 1 for a in alt_allele), bool, n)
+        ref_byte = np.full(n, 0, dtype=np.uint8)
+        alt_byte = np.full(n, 0, dtype=np.uint8)
+        if single_ref.any():
+            ref_byte[single_ref] = encode("".join(ref_allele[single_ref]))
+        if single_alt.any():
+            alt_byte[single_alt] = encode("".join(alt_allele[single_alt]))
+
+        base = self.base[cds]
+        plus = coding & single_ref & (ref_byte == base)
+        minus = coding & ~plus & single_ref & (_COMPLEMENT[ref_byte] == base)
+        matched = plus | minus
+
+        codons = self.codons[cds]
+        codon_pos = self.codon_pos[cds]
+        feature = self.feature[cds]
+        old_aa = self.aa[cds]
+
+        # Single-base ALT: substitute in the byte array and translate
+        new_codons = codons.copy()
+        coding_alt = np.where(plus, alt_byte, _COMPLEMENT[alt_byte])
+        new_codons[np.arange(n), codon_pos] = np.where(single_alt, coding_alt, _N)
+        new_aa = self._translate(new_codons, feature)
+        new_codon = codon_strings(new_codons).astype(object)
+        # Multi-base ALT never forms a codon; spell it out as the notebook does
+        multi = matched & ~single_alt
+        for i in np.flatnonzero(multi):
+            c = codon_strings(codons[i:i + 1])[0]
+            new_codon[i] = c[:codon_pos[i]] + alt_allele[i] + c[codon_pos[i] + 1:]
+        new_aa[multi] = "?"
+
+        effect = np.where(~coding, "intergenic",
+                 np.where(~matched | (old_aa == "?") | (new_aa == "?"), "unknown",
+                 np.where(new_aa == old_aa, "synonymous", "nonsynonymous")))
+
+        def where(values, mask):
+            return pd.Series(values, dtype=object).where(mask, None)
+
+        out = variants.iloc[row].reset_index(drop=True)
+        out["gene"] = where(self.genes[feature], coding)
+        out["product"] = where(self.products[feature], coding)
+        out["genome_pos"] = pd.Series(self.genome_pos[cds]).where(coding)
+        out["base"] = where(base.view("S1").astype(str), coding)
+        out["codon"] = where(codon_strings(codons), coding)
+        out["codon_pos"] = pd.Series(codon_pos + 1).where(coding)
+        out["codon_number"] = pd.Series(self.codon_number[cds]).where(coding)
+        out["aa"] = where(old_aa, coding)
+        out["strand"] = where(np.where(plus, "+", np.where(minus, "-", "?")), coding)
+        out["new_codon"] = where(new_codon, matched)
+        out["new_aa"] = where(new_aa, matched)
+        out["effect"] = effect
+        return out
+
+    def annotate_chunks(self, chunks: Iterable[pd.DataFrame],
+                        prepare: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None,
+                        **columns) -> Iterator[pd.DataFrame]:
+        """Annotate an iterable of variant DataFrames one at a time"""
+        for chunk in chunks:
+            if prepare is not None:
+                chunk = prepare(chunk)
+            yield self.annotate(chunk, **columns)
+
+    def annotate_file(self, path: str, chunksize: int = 100_000,
+                      prepare: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None,
+                      columns: Optional[Dict[str, str]] = None, **read_csv) -> Iterator[pd.DataFrame]:
+        """
+        Stream a variant table from disk and yield annotated chunks
+
+        Args:
+            path: Variant table
+            chunksize: Rows per chunk
+            prepare: Optional function applied to each raw chunk (e.g. to add POS)
+            columns: Column names for pos/ref/alt if not POS/REF/ALT
+            **read_csv: Passed to pandas.read_csv (sep, header, names, ...)
+        """
+        reader = pd.read_csv(path, chunksize=chunksize, **read_csv)
+        yield from self.annotate_chunks(reader, prepare, **(columns or {}))
+
+
+def summarize(chunks: Iterable[pd.DataFrame], by: str = "effect") -> pd.Series:
+    """Total value counts of `by` across annotated chunks"""
+    total: List[pd.Series] = [chunk[by].value_counts() for chunk in chunks]
+    if not total:
+        return pd.Series(dtype=np.int64)
+    return pd.concat(total).groupby(level=0).sum().sort_values(ascending=False)
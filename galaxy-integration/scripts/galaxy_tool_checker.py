@@ -20,9 +20,23 @@ Usage:
     python galaxy_tool_checker.py --url https://usegalaxy.org --api-key KEY --tool-list tools.txt
 
     WORKFLOW VALIDATION:
-    # Validate .ga workflow (check all tools exist)
+    # Validate .ga workflow (check all tools exist, and that every input_connections
+    # edge carries a datatype the receiving input accepts)
     python galaxy_tool_checker.py --url https://usegalaxy.org --api-key KEY --workflow workflow.ga
 
+    # Tool I/O definitions are stored per (tool_id, version) in
+    # ~/.cache/galaxy-skills/tool_io.sqlite (or $GALAXY_TOOL_IO_STORE), so repeat
+    # validations need no tool requests. Availability is re-checked after a day;
+    # re-check it on the server now:
+    python galaxy_tool_checker.py --url https://usegalaxy.org --api-key KEY --workflow workflow.ga --refresh
+
+    RATE LIMITING:
+    # All checker processes on a machine share one request budget per Galaxy host
+    # (~/.cache/galaxy-skills/governor, or $GALAXY_GOVERNOR_DIR), honour Retry-After
+    # and back off with jitter. Tools that could not be checked because Galaxy was
+    # unavailable are reported as such, never as "not found".
+    python galaxy_tool_checker.py --url https://usegalaxy.org --api-key KEY --tool-list tools.txt --rate 2
+
     WORKFLOW TESTING:
     # Test workflow execution (import and run)
     python galaxy_tool_checker.py --url https://usegalaxy.org --api-key KEY --workflow workflow.ga --test --wait
@@ -35,10 +49,23 @@ Usage:
 import argparse
 import json
 import os
+import random
+import re
+import sqlite3
 import sys
+import threading
 import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: the request budget is shared between threads, not processes
+    fcntl = None
 
 # Try to load .env file if it exists
 try:
@@ -56,6 +83,8 @@ except ImportError:
     pass
 
 try:
+    import requests
+    from bioblend import ConnectionError as BioblendConnectionError
     from bioblend.galaxy import GalaxyInstance
     from bioblend.galaxy.tools import ToolClient
 except ImportError:
@@ -63,26 +92,525 @@ except ImportError:
     sys.exit(1)
 
 
+DEFAULT_TOOL_IO_STORE = Path(os.environ.get(
+    "GALAXY_TOOL_IO_STORE",
+    Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "galaxy-skills" / "tool_io.sqlite"))
+
+# Datatype hierarchy changes only when the server is upgraded
+DATATYPES_MAX_AGE = 7 * 24 * 3600
+# Tools are installed, upgraded and removed without notice, so availability is re-checked daily
+AVAILABILITY_MAX_AGE = 24 * 3600
+
+DEFAULT_GOVERNOR_DIR = Path(os.environ.get(
+    "GALAXY_GOVERNOR_DIR",
+    Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "galaxy-skills" / "governor"))
+DEFAULT_RATE = 5.0          # requests per second per host, before the server says otherwise
+DEFAULT_MAX_RETRIES = 5
+MIN_RATE = 0.2
+RETRY_STATUSES = {502, 503, 504}
+BREAKER_THRESHOLD = 5       # consecutive failures that open the circuit
+BREAKER_COOLDOWN = 60.0     # seconds before a trial request is let through
+
+TOOL_IO_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tool_io (
+    tool_id TEXT, version TEXT, name TEXT, io TEXT, fetched_at REAL,
+    PRIMARY KEY (tool_id, version)
+);
+CREATE TABLE IF NOT EXISTS availability (
+    server TEXT, tool_id TEXT, requested_version TEXT, version TEXT, checked_at REAL,
+    PRIMARY KEY (server, tool_id, requested_version)
+);
+CREATE TABLE IF NOT EXISTS datatypes (
+    server TEXT PRIMARY KEY, mapping TEXT, fetched_at REAL
+);
+"""
+
+
+def flatten_tool_io(tool: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Reduce a show_tool(io_details=True) response to what connection checks need
+
+    Inputs are keyed by their `input_connections` path (`cond|param`,
+    `section|param`, `repeat|param`); repeat paths are listed separately so
+    `repeat_0|param` keys can be normalized.
+
+    Returns:
+        {"inputs": {path: {"type", "extensions", "multiple"}}, "repeats": [...],
+         "outputs": {name: {"type", "format", "format_source", "collection_type"}}}
+    """
+    inputs: Dict[str, Dict[str, Any]] = {}
+    repeats: List[str] = []
+
+    def walk(params: List[Dict[str, Any]], prefix: str):
+        for param in params:
+            path = f"{prefix}{param.get('name')}"
+            kind = param.get("type")
+            if kind == "conditional":
+                if param.get("test_param"):
+                    walk([param["test_param"]], f"{path}|")
+                for case in param.get("cases", []):
+                    walk(case.get("inputs", []), f"{path}|")
+            elif kind in ("repeat", "section"):
+                if kind == "repeat":
+                    repeats.append(path)
+                walk(param.get("inputs", []), f"{path}|")
+            else:
+                inputs[path] = {"type": kind, "extensions": param.get("extensions") or [],
+                                "multiple": bool(param.get("multiple"))}
+
+    walk(tool.get("inputs", []), "")
+    outputs = {}
+    for output in tool.get("outputs", []):
+        outputs[output.get("name")] = {
+            "type": output.get("output_type", "data"),
+            "format": output.get("format") or output.get("default_format"),
+            "format_source": output.get("format_source"),
+            "collection_type": output.get("collection_type") or (output.get("structure") or {}).get("collection_type"),
+        }
+    return {"inputs": inputs, "repeats": repeats, "outputs": outputs}
+
+
+class ToolIOStore:
+    """
+    Local store of tool I/O definitions per (tool_id, version)
+
+    A tool's inputs and outputs never change for a fixed version, so entries
+    are kept indefinitely and shared between Galaxy servers. Which version a
+    server resolves a (tool_id, requested version) to is recorded per server
+    for AVAILABILITY_MAX_AGE, as is the server's datatype hierarchy for
+    DATATYPES_MAX_AGE.
+    """
+
+    def __init__(self, db_path: Optional[Path] = DEFAULT_TOOL_IO_STORE):
+        """
+        Args:
+            db_path: SQLite file, or None for an in-memory store
+        """
+        if db_path:
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(db_path) if db_path else ":memory:")
+        self.conn.executescript(TOOL_IO_SCHEMA)
+
+    def get(self, tool_id: str, version: str) -> Optional[Dict[str, Any]]:
+        row = self.conn.execute("SELECT name, io FROM tool_io WHERE tool_id = ? AND version = ?",
+                                (tool_id, version)).fetchone()
+        if not row:
+            return None
+        return {"name": row[0], "version": version, **json.loads(row[1])}
+
+    def put(self, tool_id: str, version: str, name: str, io: Dict[str, Any]):
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO tool_io VALUES (?, ?, ?, ?, ?)",
+                              (tool_id, version, name, json.dumps(io), time.time()))
+
+    def resolved_version(self, server: str, tool_id: str, requested: Optional[str]) -> Optional[str]:
+        row = self.conn.execute(
+            "SELECT version, checked_at FROM availability WHERE server = ? AND tool_id = ? AND requested_version = ?",
+            (server, tool_id, requested or "")).fetchone()
+        if not row or time.time() - row[1] > AVAILABILITY_MAX_AGE:
+            return None
+        return row[0]
+
+    def set_available(self, server: str, tool_id: str, requested: Optional[str], version: str):
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO availability VALUES (?, ?, ?, ?, ?)",
+                              (server, tool_id, requested or "", version, time.time()))
+
+    def forget_server(self, server: str):
+        with self.conn:
+            self.conn.execute("DELETE FROM availability WHERE server = ?", (server,))
+            self.conn.execute("DELETE FROM datatypes WHERE server = ?", (server,))
+
+    def datatypes(self, server: str) -> Optional[Dict[str, Any]]:
+        row = self.conn.execute("SELECT mapping, fetched_at FROM datatypes WHERE server = ?", (server,)).fetchone()
+        if not row or time.time() - row[1] > DATATYPES_MAX_AGE:
+            return None
+        return json.loads(row[0])
+
+    def set_datatypes(self, server: str, mapping: Dict[str, Any]):
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO datatypes VALUES (?, ?, ?)",
+                              (server, json.dumps(mapping), time.time()))
+
+
+class GalaxyUnavailableError(RuntimeError):
+    """Galaxy did not answer usably (circuit open, or retries exhausted); says nothing about the tool"""
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RequestGovernor:
+    """
+    Rate-limit-aware request budget for one Galaxy host, shared by all checker processes
+
+    State lives in a small JSON file per host under `state_dir`, read and
+    written under an flock, so parallel CI jobs on one machine draw from a
+    single token bucket instead of each assuming the whole budget:
+
+    - token bucket: `rate` requests/second with bursts of `burst`; the rate
+      is halved on 429 and creeps back up to the configured ceiling on success
+    - Retry-After (429/503) blocks every process until the given time
+    - idempotent requests are retried on 429, 502-504 and connection errors,
+      with full-jitter exponential backoff; others only on 429
+    - circuit breaker: after BREAKER_THRESHOLD consecutive failures requests
+      fail fast with GalaxyUnavailableError for BREAKER_COOLDOWN seconds, then
+      one trial request (still subject to Retry-After and the bucket) decides
+      whether the circuit closes again
+    """
+
+    def __init__(self, url: str, rate: float = DEFAULT_RATE, burst: Optional[int] = None,
+                 max_retries: int = DEFAULT_MAX_RETRIES, state_dir: Path = DEFAULT_GOVERNOR_DIR):
+        """
+        Args:
+            url: Galaxy URL; the budget is per host
+            rate: Ceiling for requests per second
+            burst: Bucket size (default: 2 x rate)
+            max_retries: Retries per request after the first attempt
+            state_dir: Directory for the shared state and lock files
+        """
+        self.host = urlparse(url).netloc or url
+        self.rate = rate
+        self.burst = burst or max(1, int(2 * rate))
+        self.max_retries = max_retries
+        key = re.sub(r"[^\w.-]", "_", self.host)
+        Path(state_dir).mkdir(parents=True, exist_ok=True)
+        self.state_path = Path(state_dir) / f"{key}.json"
+        self.lock_path = Path(state_dir) / f"{key}.lock"
+        self._thread_lock = threading.Lock()
+        self.stats = {"requests": 0, "retries": 0, "throttled_seconds": 0.0}
+
+    @contextmanager
+    def _state(self) -> Iterator[Dict[str, Any]]:
+        with self._thread_lock, open(self.lock_path, "a") as lock:
+            if fcntl:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                try:
+                    state = json.loads(self.state_path.read_text())
+                except (OSError, ValueError):
+                    state = {}
+                now = time.time()
+                state.setdefault("rate", self.rate)
+                state["rate"] = min(state["rate"], self.rate)
+                state.setdefault("tokens", float(self.burst))
+                state.setdefault("updated", now)
+                for key in ("blocked_until", "open_until"):
+                    state.setdefault(key, 0.0)
+                state.setdefault("failures", 0)
+                # refill for the time since any process last touched the bucket
+                elapsed = max(0.0, now - state["updated"])
+                state["tokens"] = min(float(self.burst), state["tokens"] + elapsed * state["rate"])
+                state["updated"] = now
+                yield state
+                tmp = self.state_path.with_name(f"{self.state_path.name}.{os.getpid()}")
+                tmp.write_text(json.dumps(state))
+                os.replace(tmp, self.state_path)
+            finally:
+                if fcntl:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def acquire(self):
+        """Block until a request may be sent; raise GalaxyUnavailableError while the circuit is open"""
+        while True:
+            with self._state() as state:
+                now = time.time()
+                if state["failures"] >= BREAKER_THRESHOLD:
+                    if now < state["open_until"]:
+                        raise GalaxyUnavailableError(
+                            f"{self.host}: {state['failures']} consecutive failures, not retrying for "
+                            f"{state['open_until'] - now:.0f}s")
+                wait = state["blocked_until"] - now
+                if wait <= 0 and state["tokens"] >= 1:
+                    state["tokens"] -= 1
+                    if state["failures"] >= BREAKER_THRESHOLD:
+                        # half-open: this request is the trial, everyone else keeps failing fast
+                        state["open_until"] = now + BREAKER_COOLDOWN
+                    return
+                wait = max(wait, (1 - state["tokens"]) / state["rate"])
+            # small jitter so waiting processes do not wake in lockstep
+            wait += random.uniform(0, 0.1 * wait)
+            self.stats["throttled_seconds"] += wait
+            time.sleep(wait)
+
+    def record(self, status: Optional[int], retry_after: Optional[float] = None):
+        """
+        Feed a request's outcome back into the shared state
+
+        Args:
+            status: HTTP status, or None for a connection error / timeout
+            retry_after: Parsed Retry-After header, if any
+        """
+        self.stats["requests"] += 1
+        with self._state() as state:
+            now = time.time()
+            if retry_after is not None:
+                state["blocked_until"] = max(state["blocked_until"], now + retry_after)
+            if status == 429:
+                state["rate"] = max(MIN_RATE, state["rate"] / 2)
+                state["tokens"] = 0.0
+            elif status is None or status in RETRY_STATUSES:
+                state["failures"] += 1
+                if state["failures"] >= BREAKER_THRESHOLD:
+                    state["open_until"] = now + BREAKER_COOLDOWN
+            else:
+                state["failures"] = 0
+                state["rate"] = min(self.rate, state["rate"] + self.rate / 50)
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff: uniform in [0, min(30, 0.5 * 2**attempt)]"""
+        return random.uniform(0, min(30.0, 0.5 * 2 ** attempt))
+
+    def send(self, request: Callable[[], "requests.Response"], idempotent: bool = True) -> "requests.Response":
+        """
+        Send a request that returns a Response (bioblend make_get_request / make_delete_request)
+
+        Returns:
+            The final Response; a 429/5xx is returned once retries are exhausted
+
+        Raises:
+            GalaxyUnavailableError: Circuit open, or connection failed on every attempt
+        """
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self.stats["retries"] += 1
+            self.acquire()
+            try:
+                response = request()
+            except requests.RequestException as e:
+                self.record(None)
+                if not idempotent or attempt == self.max_retries:
+                    raise GalaxyUnavailableError(f"{self.host}: {e}") from e
+                time.sleep(self.backoff(attempt))
+                continue
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            self.record(response.status_code, retry_after)
+            retryable = response.status_code == 429 or (idempotent and response.status_code in RETRY_STATUSES)
+            if not retryable or attempt == self.max_retries:
+                return response
+            if retry_after is None:
+                time.sleep(self.backoff(attempt))
+            # with Retry-After, acquire() waits until the shared blocked_until
+        return response
+
+    def call(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Throttle a bioblend write request (make_post/put/patch_request), which raises on HTTP errors
+
+        Writes are not idempotent, so only 429 (rejected before processing) is retried.
+        """
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self.stats["retries"] += 1
+            self.acquire()
+            try:
+                result = func(*args, **kwargs)
+            except BioblendConnectionError as e:
+                self.record(e.status_code)
+                if e.status_code != 429 or attempt == self.max_retries:
+                    raise
+                time.sleep(self.backoff(attempt))
+                continue
+            except requests.RequestException:
+                self.record(None)
+                raise
+            self.record(200)
+            return result
+
+    def install(self, gi: GalaxyInstance):
+        """Route all of a GalaxyInstance's HTTP requests through this governor"""
+        get, delete = gi.make_get_request, gi.make_delete_request
+        gi.make_get_request = lambda url, **kwargs: self.send(lambda: get(url, **kwargs))
+        gi.make_delete_request = lambda url, **kwargs: self.send(lambda: delete(url, **kwargs), idempotent=False)
+        for name in ("make_post_request", "make_put_request", "make_patch_request"):
+            method = getattr(gi, name)
+            setattr(gi, name, lambda *args, _method=method, **kwargs: self.call(_method, *args, **kwargs))
+        # retries happen here, with backoff shared across processes
+        gi.max_get_attempts = 1
+
+
+def _tool_state(step: Dict[str, Any]) -> Dict[str, Any]:
+    state = step.get("tool_state") or {}
+    if isinstance(state, str):
+        try:
+            state = json.loads(state)
+        except ValueError:
+            return {}
+    return state if isinstance(state, dict) else {}
+
+
+def _connections(step: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    return {name: conns if isinstance(conns, list) else [conns]
+            for name, conns in (step.get("input_connections") or {}).items()}
+
+
+def normalize_input_name(name: str, repeats: List[str]) -> str:
+    """Map an input_connections key like `queries_0|input2` to its schema path `queries|input2`"""
+    parts: List[str] = []
+    for part in name.split("|"):
+        match = re.match(r"^(.*)_\d+$", part)
+        if match and "|".join(parts + [match.group(1)]) in repeats:
+            part = match.group(1)
+        parts.append(part)
+    return "|".join(parts)
+
+
+def output_formats(steps: Dict[str, Any], tool_io: Dict[str, Dict[str, Any]], step_id: str,
+                   output_name: str, depth: int = 0) -> Optional[List[str]]:
+    """
+    Datatypes a step output can carry, or None when not known statically
+
+    Follows ChangeDatatypeAction post-job actions, workflow input `format`
+    restrictions and tool outputs with `format_source` (the format of an input).
+    """
+    step = steps.get(str(step_id))
+    if not step or depth > 10:
+        return None
+    action = (step.get("post_job_actions") or {}).get(f"ChangeDatatypeAction{output_name}")
+    if action and (action.get("action_arguments") or {}).get("newtype"):
+        return [action["action_arguments"]["newtype"]]
+    if step.get("type") in ("data_input", "data_collection_input"):
+        formats = _tool_state(step).get("format")
+        if isinstance(formats, str):
+            formats = [f for f in formats.split(",") if f]
+        return list(formats) if formats else None
+    io = tool_io.get(str(step_id))
+    output = io["outputs"].get(output_name) if io else None
+    if not output:
+        return None
+    if output.get("format_source"):
+        source = normalize_input_name(output["format_source"], io["repeats"])
+        formats: List[str] = []
+        for name, conns in _connections(step).items():
+            if normalize_input_name(name, io["repeats"]) == source:
+                for conn in conns:
+                    upstream = output_formats(steps, tool_io, conn["id"], conn.get("output_name"), depth + 1)
+                    if upstream is None:
+                        return None
+                    formats.extend(upstream)
+        return formats or None
+    if output.get("format") in (None, "input", "auto"):
+        return None
+    return [output["format"]]
+
+
+def format_accepted(fmt: str, accepted: List[str], datatypes: Dict[str, Any]) -> Optional[bool]:
+    """
+    Whether a dataset of `fmt` can feed an input accepting `accepted`
+
+    Subclasses are accepted (fastqsanger.gz feeds a fastqsanger.gz,fastq.gz
+    input; tabular feeds txt), using the server's datatype hierarchy.
+
+    Returns:
+        True/False, or None when it cannot be told: `fmt` is unknown to the
+        server, or there is no hierarchy and the match is not exact
+    """
+    if not accepted or "data" in accepted or fmt in accepted:
+        return True
+    ext_to_class = datatypes.get("ext_to_class_name", {})
+    class_to_classes = datatypes.get("class_to_classes", {})
+    if not ext_to_class:
+        return None
+    cls = ext_to_class.get(fmt)
+    if cls is None:
+        return None
+    superclasses = class_to_classes.get(cls, {cls: True})
+    return any(ext_to_class.get(a) in superclasses for a in accepted)
+
+
+def check_workflow_connections(steps: Dict[str, Any], tool_io: Dict[str, Dict[str, Any]],
+                               datatypes: Dict[str, Any]) -> Tuple[List[str], List[str], int]:
+    """
+    Check every input_connections edge into a tool step against the tool's inputs
+
+    Args:
+        steps: The workflow's `steps`
+        tool_io: Step id -> get_tool_io() result for tool steps
+        datatypes: get_datatype_classes() result ({}: only exact matches are
+                   known, other connections are warnings)
+
+    Returns:
+        (errors, warnings, number of edges with statically known formats)
+    """
+    errors: List[str] = []
+    warnings: List[str] = []
+    checked = 0
+    for step_id, step in steps.items():
+        io = tool_io.get(str(step_id))
+        if not io:
+            continue
+        label = step.get("label") or step.get("name")
+        for name, conns in _connections(step).items():
+            if name == "when":
+                continue
+            param = io["inputs"].get(normalize_input_name(name, io["repeats"]))
+            if param is None:
+                warnings.append(f"Step {step_id} ({label}): input_connections key '{name}' "
+                                f"is not an input of {step.get('tool_id')} {io['version']}")
+                continue
+            if param["type"] not in ("data", "data_collection"):
+                continue
+            for conn in conns:
+                formats = output_formats(steps, tool_io, conn["id"], conn.get("output_name"))
+                if not formats:
+                    continue
+                checked += 1
+                verdicts = [format_accepted(fmt, param["extensions"], datatypes) for fmt in formats]
+                source = f"step {conn['id']} output '{conn.get('output_name')}'"
+                if not any(verdicts) and False in verdicts:
+                    errors.append(f"Step {step_id} ({label}): input '{name}' accepts "
+                                  f"{', '.join(param['extensions'])} but {source} is {', '.join(formats)}")
+                elif None in verdicts:
+                    unknown = [f for f, v in zip(formats, verdicts) if v is None]
+                    if datatypes.get("ext_to_class_name"):
+                        warnings.append(f"Step {step_id} ({label}): {source} has datatype "
+                                        f"{', '.join(unknown)} unknown to this server")
+                    else:
+                        warnings.append(f"Step {step_id} ({label}): cannot tell whether input '{name}' "
+                                        f"({', '.join(param['extensions'])}) accepts {source} "
+                                        f"({', '.join(unknown)}) without the datatype hierarchy")
+    return errors, warnings, checked
+
+
 class GalaxyToolChecker:
     """Check tool availability on a Galaxy instance"""
 
-    def __init__(self, url: str, api_key: str):
+    def __init__(self, url: str, api_key: str, store: Optional[ToolIOStore] = None,
+                 governor: Optional[RequestGovernor] = None):
         """
         Initialize Galaxy connection
 
         Args:
             url: Galaxy instance URL
             api_key: Galaxy API key
+            store: Tool I/O store (default: ToolIOStore at DEFAULT_TOOL_IO_STORE)
+            governor: Shared request budget (default: RequestGovernor for the URL's host)
         """
         self.url = url if url.endswith('/') else f"{url}/"
         self.api_key = api_key
         self.gi = None
+        self.store = store or ToolIOStore()
+        self.governor = governor or RequestGovernor(self.url)
+        self.requests = 0
+        self._tools: Optional[List[Dict[str, Any]]] = None
         self._connect()
 
     def _connect(self):
         """Establish connection to Galaxy"""
         try:
             self.gi = GalaxyInstance(url=self.url, key=self.api_key)
+            self.governor.install(self.gi)
             # Test connection
             self.gi.users.get_current_user()
         except Exception as e:
@@ -98,10 +626,15 @@ class GalaxyToolChecker:
 
         Returns:
             List of matching tools with id, name, version
+
+        Raises:
+            GalaxyUnavailableError: The tool list could not be fetched
         """
         try:
-            # Get all tools
-            tools = self.gi.tools.get_tools()
+            # Get all tools (once per checker; the list is the same for every name)
+            if self._tools is None:
+                self._tools = self.gi.tools.get_tools()
+            tools = self._tools
 
             # Filter by name
             matches = []
@@ -125,23 +658,61 @@ class GalaxyToolChecker:
 
             return matches
 
+        except GalaxyUnavailableError:
+            raise
         except Exception as e:
-            raise RuntimeError(f"Failed to search for tool '{tool_name}': {e}")
+            # an empty search returns []; any failure means the server was not asked successfully
+            raise GalaxyUnavailableError(f"Failed to search for tool '{tool_name}': {e}")
 
-    def get_tool_details(self, tool_id: str) -> Dict[str, Any]:
+    def get_tool_io(self, tool_id: str, version: Optional[str] = None) -> Dict[str, Any]:
         """
-        Get detailed information about a tool
+        Tool name, version and flattened I/O for a tool, from the store when possible
+
+        Only the first lookup of a (tool_id, version) on a server makes a
+        request; later lookups are answered from the local store.
 
         Args:
             tool_id: Galaxy tool ID
+            version: Requested version (the workflow step's tool_version); the
+                     server may resolve it to a different installed version
 
         Returns:
-            Tool details including inputs, outputs, version
+            {"name", "version", "inputs", "repeats", "outputs"} (see flatten_tool_io)
         """
+        resolved = self.store.resolved_version(self.url, tool_id, version)
+        if resolved:
+            cached = self.store.get(tool_id, resolved)
+            if cached:
+                return cached
+
+        params = {"io_details": True}
+        if version:
+            params["tool_version"] = version
+        self.requests += 1
+        response = self.gi.make_get_request(f"{self.gi.url}/tools/{tool_id}", params=params)
+        if response.status_code == 429 or response.status_code >= 500:
+            raise GalaxyUnavailableError(f"Failed to get details for tool '{tool_id}': "
+                                         f"HTTP {response.status_code} after {self.governor.max_retries} retries")
         try:
-            return self.gi.tools.show_tool(tool_id, io_details=True)
+            response.raise_for_status()
+            tool = response.json()
         except Exception as e:
             raise RuntimeError(f"Failed to get details for tool '{tool_id}': {e}")
+        io = flatten_tool_io(tool)
+        self.store.put(tool_id, tool.get("version"), tool.get("name"), io)
+        self.store.set_available(self.url, tool_id, version, tool.get("version"))
+        return {"name": tool.get("name"), "version": tool.get("version"), **io}
+
+    def get_datatype_classes(self) -> Dict[str, Any]:
+        """The server's datatype hierarchy: ext_to_class_name and class_to_classes"""
+        mapping = self.store.datatypes(self.url)
+        if mapping is None:
+            self.requests += 1
+            response = self.gi.make_get_request(f"{self.gi.url}/datatypes/types_and_mapping")
+            response.raise_for_status()
+            mapping = response.json().get("datatypes_mapping", {})
+            self.store.set_datatypes(self.url, mapping)
+        return mapping
 
     def check_tools_batch(self, tool_names: List[str]) -> Dict[str, Any]:
         """
@@ -176,28 +747,34 @@ class GalaxyToolChecker:
                     ]
                 }
             except Exception as e:
+                # unknown, not missing: reporting False here would be a false negative
                 results["tools"][tool_name] = {
-                    "found": False,
+                    "found": None,
                     "error": str(e)
                 }
 
         # Add summary
         found_count = sum(1 for t in results["tools"].values() if t.get("found", False))
+        unchecked_count = sum(1 for t in results["tools"].values() if t.get("found") is None)
+        checked_count = len(tool_names) - unchecked_count
         results["summary"] = {
             "total_tools": len(tool_names),
             "found": found_count,
-            "not_found": len(tool_names) - found_count,
-            "success_rate": f"{(found_count / len(tool_names) * 100):.1f}%" if tool_names else "0%"
+            "not_found": len(tool_names) - found_count - unchecked_count,
+            "unchecked": unchecked_count,
+            # over the tools that could be checked; unchecked ones are neither found nor missing
+            "success_rate": f"{(found_count / checked_count * 100):.1f}%" if checked_count else "0%"
         }
 
         return results
 
-    def validate_workflow(self, workflow_path: str) -> Dict[str, Any]:
+    def validate_workflow(self, workflow_path: str, check_connections: bool = True) -> Dict[str, Any]:
         """
         Validate a Galaxy workflow file (.ga) by checking all tools exist
 
         Args:
             workflow_path: Path to .ga workflow file
+            check_connections: Also check input_connections datatypes (see check_workflow_connections)
 
         Returns:
             Validation results
@@ -223,6 +800,7 @@ class GalaxyToolChecker:
 
         # Check each step
         steps = workflow.get("steps", {})
+        tool_io: Dict[str, Dict[str, Any]] = {}
         for step_id, step in steps.items():
             step_type = step.get("type")
             tool_id = step.get("tool_id")
@@ -232,7 +810,8 @@ class GalaxyToolChecker:
 
                 try:
                     # Try to get tool details
-                    tool_details = self.get_tool_details(tool_id)
+                    tool_details = self.get_tool_io(tool_id, step.get("tool_version"))
+                    tool_io[step_id] = tool_details
                     results["steps"][step_id] = {
                         "name": step.get("name", "Unknown"),
                         "tool_id": tool_id,
@@ -240,6 +819,23 @@ class GalaxyToolChecker:
                         "tool_name": tool_details.get("name"),
                         "tool_version": tool_details.get("version")
                     }
+                    if step.get("tool_version") and tool_details.get("version") != step["tool_version"]:
+                        results["validation"]["warnings"].append(
+                            f"Step {step_id} ({step.get('name')}): workflow uses version {step['tool_version']}, "
+                            f"server resolves it to {tool_details.get('version')}"
+                        )
+                except GalaxyUnavailableError as e:
+                    results["steps"][step_id] = {
+                        "name": step.get("name", "Unknown"),
+                        "tool_id": tool_id,
+                        "status": "unchecked",
+                        "error": str(e)
+                    }
+                    results["validation"]["valid"] = False
+                    results["validation"]["errors"].append(
+                        f"Step {step_id} ({step.get('name')}): Tool '{tool_id}' could not be checked "
+                        f"(Galaxy unavailable, re-run later)"
+                    )
                 except Exception as e:
                     results["steps"][step_id] = {
                         "name": step.get("name", "Unknown"),
@@ -252,7 +848,24 @@ class GalaxyToolChecker:
                         f"Step {step_id} ({step.get('name')}): Tool '{tool_id}' not found or not accessible"
                     )
 
+        if check_connections:
+            try:
+                datatypes = self.get_datatype_classes()
+            except Exception as e:
+                datatypes = {}
+                results["validation"]["warnings"].append(
+                    f"Datatype hierarchy unavailable ({e}); connections that are not exact "
+                    f"format matches are reported as warnings")
+            errors, warnings, checked = check_workflow_connections(steps, tool_io, datatypes)
+            results["validation"]["errors"].extend(errors)
+            results["validation"]["warnings"].extend(warnings)
+            results["validation"]["connections_checked"] = checked
+            if errors:
+                results["validation"]["valid"] = False
+
         results["tools_checked"] = list(results["tools_checked"])
+        results["validation"]["api_requests"] = self.requests
+        results["validation"]["http"] = dict(self.governor.stats)
         results["validation"]["total_steps"] = len(steps)
         results["validation"]["tool_steps"] = len([s for s in steps.values() if s.get("type") == "tool"])
         results["validation"]["valid_tools"] = len([s for s in results["steps"].values() if s.get("status") == "ok"])
@@ -260,7 +873,8 @@ class GalaxyToolChecker:
         return results
 
     def test_workflow(self, workflow_path: str, history_name: Optional[str] = None,
-                     inputs: Optional[Dict[str, str]] = None, wait: bool = False) -> Dict[str, Any]:
+                     inputs: Optional[Dict[str, str]] = None, wait: bool = False,
+                     check_connections: bool = True) -> Dict[str, Any]:
         """
         Test a workflow by importing and optionally running it
 
@@ -269,12 +883,13 @@ class GalaxyToolChecker:
             history_name: Name for test history (optional)
             inputs: Input dataset mappings (optional)
             wait: Wait for workflow completion (optional)
+            check_connections: Also check input_connections datatypes before importing
 
         Returns:
             Test results
         """
         # First validate the workflow
-        validation = self.validate_workflow(workflow_path)
+        validation = self.validate_workflow(workflow_path, check_connections=check_connections)
 
         if not validation["validation"]["valid"]:
             return {
@@ -368,6 +983,19 @@ def main():
     parser.add_argument("--test", action="store_true", help="Actually test workflow (import and run)")
     parser.add_argument("--history", help="History name for workflow test")
     parser.add_argument("--wait", action="store_true", help="Wait for workflow completion")
+    parser.add_argument("--skip-connections", action="store_true",
+                        help="Do not check input_connections datatypes")
+    parser.add_argument("--tool-store", type=Path, default=DEFAULT_TOOL_IO_STORE,
+                        help=f"Tool I/O store (default: {DEFAULT_TOOL_IO_STORE})")
+    parser.add_argument("--refresh", action="store_true",
+                        help="Re-check tool availability and datatypes on the server now instead of after "
+                             "a day / a week (I/O definitions are kept)")
+
+    # Rate limiting (shared by all checker processes on this machine via GALAXY_GOVERNOR_DIR)
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE,
+                        help=f"Maximum requests per second to the Galaxy host (default: {DEFAULT_RATE})")
+    parser.add_argument("--max-retries", type=int, default=DEFAULT_MAX_RETRIES,
+                        help=f"Retries per request on 429/5xx/connection errors (default: {DEFAULT_MAX_RETRIES})")
 
     # Output arguments
     parser.add_argument("--output", type=Path, help="Output file for JSON results")
@@ -400,7 +1028,10 @@ def main():
 
     # Initialize checker
     try:
-        checker = GalaxyToolChecker(url, api_key)
+        governor = RequestGovernor(url, rate=args.rate, max_retries=args.max_retries)
+        checker = GalaxyToolChecker(url, api_key, ToolIOStore(args.tool_store), governor)
+        if args.refresh:
+            checker.store.forget_server(checker.url)
         if args.verbose:
             print(f"Connected to Galaxy at {url}")
     except Exception as e:
@@ -440,14 +1071,18 @@ def main():
                         for match in result["matches"]:
                             print(f"   - {match['name']} ({match['version']})")
                             print(f"     ID: {match['id']}")
+                elif result.get("found") is None:
+                    print(f"⚠️  {tool_name}: Could not be checked")
+                    print(f"   Error: {result['error']}")
                 else:
                     print(f"❌ {tool_name}: Not found")
-                    if result.get("error"):
-                        print(f"   Error: {result['error']}")
 
             print(f"\n{'='*60}")
-            print(f"Summary: {results['summary']['found']}/{results['summary']['total_tools']} tools found "
-                  f"({results['summary']['success_rate']})")
+            summary = results["summary"]
+            print(f"Summary: {summary['found']}/{summary['total_tools'] - summary['unchecked']} checked tools found "
+                  f"({summary['success_rate']})")
+            if summary["unchecked"]:
+                print(f"         {summary['unchecked']} could not be checked (Galaxy unavailable)")
             print(f"{'='*60}\n")
 
     # Validate/test workflow
@@ -456,10 +1091,11 @@ def main():
             results = checker.test_workflow(
                 str(args.workflow),
                 history_name=args.history,
-                wait=args.wait
+                wait=args.wait,
+                check_connections=not args.skip_connections
             )
         else:
-            results = checker.validate_workflow(str(args.workflow))
+            results = checker.validate_workflow(str(args.workflow), check_connections=not args.skip_connections)
 
         if not args.quiet:
             print(f"\n{'='*60}")
@@ -476,6 +1112,11 @@ def main():
                 print(f"❌ Workflow validation failed")
                 for error in validation.get("errors", []):
                     print(f"   - {error}")
+            if "connections_checked" in validation:
+                print(f"   - {validation['connections_checked']} connection(s) datatype-checked, "
+                      f"{validation.get('api_requests', 0)} API request(s)")
+            for warning in validation.get("warnings", []):
+                print(f"⚠️  {warning}")
 
             if args.test and results.get("success"):
                 print(f"\n✅ Workflow imported successfully")
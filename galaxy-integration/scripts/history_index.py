@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Stream Galaxy history contents page by page and keep a local lookup index.
+
+Finding a dataset by HID or name in a history with 10k+ items means paging
+through all of it, and finding a history from a URL slug means listing
+every history. This module streams contents and histories with keyset
+pagination (`hid-gt` / `update_time-ge`, bounded memory, stable while the
+history or the history list changes) and keeps a SQLite index of hid -> id,
+name -> ids and slug -> history id. The index is refreshed incrementally:
+only items and histories whose `update_time` is newer than the last sync
+are fetched again. Name lookups always refresh first; HID lookups only on
+a miss, since a HID never moves to another item.
+
+Usage:
+    # Dataset id for HID 13437 (first use indexes the history, later uses
+    # only fetch what changed)
+    python history_index.py hid HISTORY_ID 13437
+
+    # Dataset ids by exact name
+    python history_index.py name HISTORY_ID "Trimmed reads"
+
+    # History id from a URL like usegalaxy.org/u/user/h/my-analysis-run
+    python history_index.py slug my-analysis-run
+
+    # Stream all contents as JSON lines without indexing
+    python history_index.py stream HISTORY_ID > contents.jsonl
+
+    # Refresh the index explicitly
+    python history_index.py refresh HISTORY_ID [HISTORY_ID ...]
+
+As a module:
+    from history_index import HistoryIndex
+    index = HistoryIndex(url, api_key)
+    for item in index.iter_contents(history_id):
+        ...
+    dataset_id = index.by_hid(history_id, 13437)
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+import urllib.error
+import urllib.parse
+import urllib.request
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+DEFAULT_DB = Path(os.environ.get(
+    "GALAXY_HISTORY_INDEX",
+    Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "galaxy-skills" / "history_index.sqlite"))
+DEFAULT_PAGE_SIZE = 500
+
+CONTENT_KEYS = "id,hid,name,history_content_type,state,deleted,visible,update_time"
+HISTORY_KEYS = "id,name,slug,update_time"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS histories (
+    server TEXT, id TEXT, name TEXT, slug TEXT, update_time TEXT,
+    PRIMARY KEY (server, id)
+);
+CREATE TABLE IF NOT EXISTS contents (
+    server TEXT, history_id TEXT, id TEXT, hid INTEGER, name TEXT, type TEXT,
+    state TEXT, deleted INTEGER, visible INTEGER, update_time TEXT,
+    PRIMARY KEY (server, history_id, type, id)
+);
+CREATE TABLE IF NOT EXISTS sync (
+    server TEXT, scope TEXT, update_time TEXT,
+    PRIMARY KEY (server, scope)
+);
+CREATE INDEX IF NOT EXISTS contents_hid ON contents (server, history_id, hid);
+CREATE INDEX IF NOT EXISTS contents_name ON contents (server, history_id, name);
+CREATE INDEX IF NOT EXISTS histories_slug ON histories (server, slug);
+"""
+
+
+def slugify(name: str) -> str:
+    """Galaxy-style slug of a history name: 'My Analysis Run' -> 'my-analysis-run'"""
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+
+
+class HistoryIndex:
+    """Stream history contents and serve HID/name/slug lookups from a local index"""
+
+    def __init__(self, url: str, api_key: str, db_path: Optional[Path] = DEFAULT_DB,
+                 page_size: int = DEFAULT_PAGE_SIZE, timeout: float = 60):
+        """
+        Args:
+            url: Galaxy instance URL
+            api_key: Galaxy API key
+            db_path: SQLite index file, or None for an in-memory index
+            page_size: Items per contents request
+            timeout: Per-request timeout in seconds
+        """
+        self.url = url.rstrip("/")
+        self.api_key = api_key
+        self.page_size = page_size
+        self.timeout = timeout
+        if db_path:
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(db_path) if db_path else ":memory:")
+        self.conn.executescript(SCHEMA)
+
+    # ── HTTP ──
+
+    def _get(self, path: str, params: List[tuple]) -> Any:
+        url = f"{self.url}/api/{path}?{urllib.parse.urlencode(params)}"
+        req = urllib.request.Request(url, headers={"x-api-key": self.api_key})
+        with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+            return json.load(resp)
+
+    # ── streaming ──
+
+    def iter_contents(self, history_id: str, since: Optional[str] = None,
+                      include_deleted: bool = True, include_hidden: bool = True) -> Iterator[Dict[str, Any]]:
+        """
+        Yield every item of a history, oldest HID first, one page in memory at a time
+
+        Pages are requested with `hid-gt` (keyset) rather than offsets, so
+        items added while streaming neither shift nor repeat pages.
+
+        Args:
+            history_id: History to stream
+            since: Only items with update_time after this ISO timestamp
+            include_deleted: Include deleted items
+            include_hidden: Include hidden items
+        """
+        last_hid = 0
+        while True:
+            params = [("v", "dev"), ("keys", CONTENT_KEYS), ("order", "hid-asc"), ("limit", self.page_size),
+                      ("q", "hid-gt"), ("qv", last_hid)]
+            if since:
+                params += [("q", "update_time-gt"), ("qv", since)]
+            if not include_deleted:
+                params += [("q", "deleted"), ("qv", "false")]
+            if not include_hidden:
+                params += [("q", "visible"), ("qv", "true")]
+            page = self._get(f"histories/{history_id}/contents", params)
+            yield from page
+            if len(page) < self.page_size:
+                return
+            last_hid = page[-1]["hid"]
+
+    def iter_histories(self, since: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Yield the user's histories (id, name, slug, update_time), oldest update first
+
+        Pages are keyed on update_time (`update_time-ge` the last one seen,
+        skipping the histories already yielded at exactly that time) rather
+        than offsets, so histories updated while streaming cannot shift a
+        page and be skipped; such a history is yielded again, later, with
+        its new update_time.
+        """
+        last_time, at_last_time = since, 0
+        while True:
+            params = [("keys", HISTORY_KEYS), ("order", "update_time-asc"), ("limit", self.page_size)]
+            if last_time:
+                op = "ge" if at_last_time else "gt"
+                params += [("q", f"update_time-{op}"), ("qv", last_time), ("offset", at_last_time)]
+            page = self._get("histories", params)
+            yield from page
+            if len(page) < self.page_size:
+                return
+            newest = page[-1]["update_time"]
+            tied = sum(1 for history in page if history["update_time"] == newest)
+            at_last_time = at_last_time + tied if newest == last_time else tied
+            last_time = newest
+
+    # ── index ──
+
+    def _synced(self, scope: str) -> Optional[str]:
+        row = self.conn.execute("SELECT update_time FROM sync WHERE server = ? AND scope = ?",
+                                (self.url, scope)).fetchone()
+        return row[0] if row else None
+
+    def _mark_synced(self, scope: str, update_time: Optional[str]):
+        if update_time:
+            self.conn.execute("INSERT OR REPLACE INTO sync VALUES (?, ?, ?)", (self.url, scope, update_time))
+
+    def refresh_history(self, history_id: str) -> int:
+        """
+        Bring the index of one history up to date
+
+        The first call streams the whole history; later calls only fetch
+        items updated since the newest update_time already indexed.
+
+        Returns:
+            Number of items fetched
+        """
+        scope = f"history:{history_id}"
+        since = self._synced(scope)
+        newest, count = since, 0
+        batch = []
+        for item in self.iter_contents(history_id, since=since):
+            batch.append((self.url, history_id, item["id"], item["hid"], item.get("name"),
+                          item.get("history_content_type", "dataset"), item.get("state"),
+                          int(bool(item.get("deleted"))), int(bool(item.get("visible", True))),
+                          item.get("update_time")))
+            if item.get("update_time") and (newest is None or item["update_time"] > newest):
+                newest = item["update_time"]
+            if len(batch) >= self.page_size:
+                count += self._store_contents(batch)
+        count += self._store_contents(batch)
+        self._mark_synced(scope, newest)
+        self.conn.commit()
+        return count
+
+    def _store_contents(self, batch: List[tuple]) -> int:
+        self.conn.executemany("INSERT OR REPLACE INTO contents VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", batch)
+        n = len(batch)
+        batch.clear()
+        return n
+
+    def refresh_histories(self) -> int:
+        """Bring the slug/name -> history id index up to date; returns histories fetched"""
+        since = self._synced("histories")
+        newest, rows = since, []
+        for history in self.iter_histories(since=since):
+            rows.append((self.url, history["id"], history.get("name"),
+                         history.get("slug") or slugify(history.get("name") or ""), history.get("update_time")))
+            if history.get("update_time") and (newest is None or history["update_time"] > newest):
+                newest = history["update_time"]
+        self.conn.executemany("INSERT OR REPLACE INTO histories VALUES (?, ?, ?, ?, ?)", rows)
+        self._mark_synced("histories", newest)
+        self.conn.commit()
+        return len(rows)
+
+    # ── lookups ──
+
+    def _lookup(self, refresh, query: str, params: tuple, fresh: bool = False) -> List[tuple]:
+        """
+        Answer from the index; on a miss refresh incrementally once and retry
+
+        With `fresh`, always refresh first (one request when nothing changed),
+        for answers a newer or since-deleted item could change.
+        """
+        if fresh:
+            refresh()
+        rows = self.conn.execute(query, params).fetchall()
+        if not rows and not fresh:
+            refresh()
+            rows = self.conn.execute(query, params).fetchall()
+        return rows
+
+    def by_hid(self, history_id: str, hid: int, content_type: str = "dataset") -> Optional[str]:
+        """Id of the dataset (or dataset_collection) with this HID, or None"""
+        rows = self._lookup(
+            lambda: self.refresh_history(history_id),
+            "SELECT id FROM contents WHERE server = ? AND history_id = ? AND hid = ? AND type = ?",
+            (self.url, history_id, int(hid), content_type))
+        return rows[0][0] if rows else None
+
+    def by_name(self, history_id: str, name: str, include_deleted: bool = False) -> List[Dict[str, Any]]:
+        """
+        Items with this exact name, newest HID first
+
+        The history is refreshed incrementally before answering: unlike a
+        HID, a name can gain newer items or lose deleted ones at any time.
+        """
+        query = ("SELECT id, hid, type, state, deleted, visible FROM contents "
+                 "WHERE server = ? AND history_id = ? AND name = ?")
+        if not include_deleted:
+            query += " AND deleted = 0"
+        rows = self._lookup(lambda: self.refresh_history(history_id), query + " ORDER BY hid DESC",
+                            (self.url, history_id, name), fresh=True)
+        return [{"id": r[0], "hid": r[1], "history_content_type": r[2], "state": r[3],
+                 "deleted": bool(r[4]), "visible": bool(r[5])} for r in rows]
+
+    def history_by_slug(self, slug: str) -> List[Dict[str, Any]]:
+        """Histories whose slug (or slugified name) matches a URL slug"""
+        rows = self._lookup(
+            self.refresh_histories,
+            "SELECT id, name, slug FROM histories WHERE server = ? AND slug = ? ORDER BY update_time DESC",
+            (self.url, slugify(slug)))
+        return [{"id": r[0], "name": r[1], "slug": r[2]} for r in rows]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Stream Galaxy history contents and look up datasets by HID, name or slug",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument("--url", help="Galaxy instance URL (or set GALAXY_URL env var)")
+    parser.add_argument("--api-key", help="Galaxy API key (or set GALAXY_API_KEY env var)")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB, help=f"Index database (default: {DEFAULT_DB})")
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE, help="Items per request (default: 500)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("hid", help="Dataset id for a HID")
+    p.add_argument("history_id")
+    p.add_argument("hid", type=int)
+    p.add_argument("--collection", action="store_true", help="Look up a dataset collection HID")
+    p = sub.add_parser("name", help="Item ids for an exact name")
+    p.add_argument("history_id")
+    p.add_argument("name")
+    p.add_argument("--deleted", action="store_true", help="Include deleted items")
+    p = sub.add_parser("slug", help="History id for a URL slug")
+    p.add_argument("slug")
+    p = sub.add_parser("stream", help="Write all contents as JSON lines (no indexing)")
+    p.add_argument("history_id")
+    p = sub.add_parser("refresh", help="Refresh the index for histories")
+    p.add_argument("history_id", nargs="*", help="Histories to refresh (default: only the history list)")
+    args = parser.parse_args()
+
+    url = args.url or os.environ.get("GALAXY_URL")
+    api_key = args.api_key or os.environ.get("GALAXY_API_KEY")
+    if not url or not api_key:
+        print("Error: Galaxy URL and API key required (--url/--api-key or GALAXY_URL/GALAXY_API_KEY)",
+              file=sys.stderr)
+        sys.exit(1)
+
+    index = HistoryIndex(url, api_key, args.db, args.page_size)
+    try:
+        if args.command == "hid":
+            dataset_id = index.by_hid(args.history_id, args.hid,
+                                      "dataset_collection" if args.collection else "dataset")
+            if not dataset_id:
+                print(f"❌ No item with HID {args.hid} in history {args.history_id}", file=sys.stderr)
+                sys.exit(1)
+            print(dataset_id)
+        elif args.command == "name":
+            matches = index.by_name(args.history_id, args.name, args.deleted)
+            if not matches:
+                print(f"❌ No item named {args.name!r} in history {args.history_id}", file=sys.stderr)
+                sys.exit(1)
+            for m in matches:
+                print(f"{m['id']}\thid={m['hid']}\t{m['history_content_type']}\t{m['state']}")
+        elif args.command == "slug":
+            matches = index.history_by_slug(args.slug)
+            if not matches:
+                print(f"❌ No history matches slug {args.slug!r}", file=sys.stderr)
+                sys.exit(1)
+            for m in matches:
+                print(f"{m['id']}\t{m['name']}")
+        elif args.command == "stream":
+            for item in index.iter_contents(args.history_id):
+                print(json.dumps(item))
+        elif args.command == "refresh":
+            print(f"Histories: {index.refresh_histories()} fetched")
+            for history_id in args.history_id:
+                print(f"{history_id}: {index.refresh_history(history_id)} items fetched")
+    except urllib.error.HTTPError as e:
+        print(f"Error: Galaxy API request failed: HTTP {e.code} {e.reason}", file=sys.stderr)
+        sys.exit(1)
+    except urllib.error.URLError as e:
+        print(f"Error: cannot reach {url}: {e.reason}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,7 @@ set -e
 
 TOOL_NAME=$1
 LOCAL_IUC=${2:-""}
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 
 # Common locations to check for local tools-iuc
 COMMON_PATHS=(
@@ -55,8 +56,13 @@ if [ $FOUND_LOCAL -eq 1 ]; then
     echo -e "\nSearching for tool directories..."
     find "$LOCAL_PATH/tools" -type d -iname "*${TOOL_NAME}*" 2>/dev/null || echo "No matching directories found"
     
-    echo -e "\nSearching for tool XML files..."
-    find "$LOCAL_PATH/tools" -type f -name "*.xml" -exec grep -l "$TOOL_NAME" {} \; 2>/dev/null | head -5 || echo "No matching XML files found"
+    echo -e "\nSearching indexed tools (id, name, bioconda package)..."
+    if command -v python3 >/dev/null 2>&1; then
+        # Persistent SQLite index, refreshed incrementally (only changed XMLs are re-parsed)
+        python3 "$SCRIPT_DIR/tool_index.py" query "$TOOL_NAME" --update "$LOCAL_PATH" --limit 10
+    else
+        grep -rl --include="*.xml" "$TOOL_NAME" "$LOCAL_PATH/tools" 2>/dev/null | head -5 || echo "No matching XML files found"
+    fi
     
     echo -e "\nResult: Check paths above"
 else
@@ -82,6 +88,14 @@ echo "  https://github.com/galaxyproject/tools-iuc/tree/main/tools/${TOOL_NAME}"
 # 3. Known repositories
 echo -e "\n3. KNOWN GALAXY TOOL REPOSITORIES"
 echo "----------------------------------------"
+if command -v python3 >/dev/null 2>&1; then
+    # Index any local clones of the known repositories (in parallel) and search them all at once
+    if python3 "$SCRIPT_DIR/tool_index.py" update --discover -q 2>/dev/null; then
+        echo "Local clones (ranked across all indexed sources):"
+        python3 "$SCRIPT_DIR/tool_index.py" query "$TOOL_NAME" --limit 10
+        echo ""
+    fi
+fi
 echo "GenOuest (genomics, annotation):"
 echo "  https://github.com/genouest/galaxy-tools/search?q=${TOOL_NAME}"
 echo ""
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Bulk-map Nextflow (nf-core) modules to existing Galaxy tools via their requirements.
+
+Walks a `modules/` tree in parallel, extracts each process's container and
+conda declarations (main.nf and environment.yml), normalizes them to
+(bioconda package, version) as described in container-mapping.md, and joins
+them against the requirements of known Galaxy tools. The tool side comes
+from the local tool index (tool_index.py) or a tool-panel snapshot.
+
+Usage:
+    # Against local clones indexed with tool_index.py
+    python module_mapper.py path/to/pipeline/modules
+
+    # Against a tool-panel snapshot (JSON list of tools with requirements)
+    python module_mapper.py path/to/pipeline/modules --snapshot usegalaxy_tools.json
+
+    # Machine-readable report
+    python module_mapper.py path/to/pipeline/modules --json mapping.json
+
+Snapshot format (e.g. collected from /api/tools/{id} for each panel tool):
+    [{"id": "...", "name": "...", "version": "...",
+      "requirements": [{"name": "fastp", "version": "0.23.4", "type": "package"}]}]
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from tool_index import DEFAULT_DB, KNOWN_SOURCES, source_label  # noqa: E402
+
+PROCESS_RE = re.compile(r"^\s*process\s+([A-Za-z0-9_]+)\s*\{", re.MULTILINE)
+# biocontainers/<package>:<version>--<build>, docker or singularity (depot) form
+CONTAINER_RE = re.compile(
+    r"(?:quay\.io/biocontainers|depot\.galaxyproject\.org/singularity|biocontainers)/"
+    r"([A-Za-z0-9_.\-]+):([A-Za-z0-9_.\-]+)")
+# conda "bioconda::fastp=0.23.4 conda-forge::pigz=2.8" in main.nf
+CONDA_INLINE_RE = re.compile(r"(?:[\w-]+::)?([A-Za-z0-9_.\-]+)=+([A-Za-z0-9_.\-]+)")
+CONDA_DIRECTIVE_RE = re.compile(r"^\s*conda\s+[\"']([^\"']+)[\"']", re.MULTILINE)
+# "  - bioconda::fastp=0.23.4" in environment.yml
+ENV_DEP_RE = re.compile(r"^\s*-\s*(?:[\w-]+::)?([A-Za-z0-9_.\-]+)\s*(?:=+\s*([A-Za-z0-9_.\-*]+))?", re.MULTILINE)
+
+# Packages nf-core modules routinely pull in that never identify the tool
+HELPER_PACKAGES = {"pigz", "gzip", "tar", "sed", "gawk", "coreutils", "grep", "bzip2", "python", "pip",
+                   "htslib", "libdeflate", "zlib", "xz", "zstd"}
+# Namespace directories above the tool directory in a modules/ tree
+MODULE_NAMESPACES = {"nf-core", "local"}
+
+
+def normalize_version(version: Optional[str]) -> Optional[str]:
+    """Drop conda build strings and wildcards: '0.23.4--h5f740d0_0' -> '0.23.4'"""
+    if not version:
+        return None
+    version = version.split("--")[0].split("=")[0].rstrip("*").rstrip(".")
+    return version or None
+
+
+def parse_module(module_dir: str, modules_root: str) -> Dict[str, Any]:
+    """
+    Extract process names and (package, version) requirements for one module
+
+    Conda declarations win over the container because they list every
+    package explicitly; mulled-v2 multi-package containers cannot be decoded
+    without them.
+    """
+    main_nf = Path(module_dir) / "main.nf"
+    text = main_nf.read_text(errors="replace")
+    processes = PROCESS_RE.findall(text)
+
+    conda: List[Tuple[str, Optional[str]]] = []
+    env_yml = Path(module_dir) / "environment.yml"
+    if env_yml.is_file():
+        in_deps = False
+        for line in env_yml.read_text(errors="replace").splitlines():
+            if re.match(r"^\S", line):
+                in_deps = line.startswith("dependencies:")
+                continue
+            m = ENV_DEP_RE.match(line) if in_deps else None
+            if m:
+                conda.append((m.group(1).lower(), normalize_version(m.group(2))))
+    for directive in CONDA_DIRECTIVE_RE.findall(text):
+        if "environment.yml" not in directive:
+            conda.extend((p.lower(), normalize_version(v)) for p, v in CONDA_INLINE_RE.findall(directive))
+
+    containers = []
+    for package, tag in CONTAINER_RE.findall(text):
+        if package.startswith("mulled-v2"):
+            continue
+        containers.append((package.lower(), normalize_version(tag)))
+
+    requirements = list(dict.fromkeys(conda or containers))
+    module = os.path.relpath(module_dir, modules_root)
+    tool_dir = next((part for part in Path(module).parts if part not in MODULE_NAMESPACES), None)
+    package = primary_package([p for p, _ in requirements], tool_dir)
+    primary = next((r for r in requirements if r[0] == package), None)
+    return {
+        "module": module,
+        "processes": processes,
+        "requirements": [{"package": p, "version": v} for p, v in requirements],
+        "primary": {"package": primary[0], "version": primary[1]} if primary else None,
+        "source": "conda" if conda else ("container" if containers else None),
+    }
+
+
+def find_modules(modules_root: Path) -> List[str]:
+    dirs = []
+    for dirpath, dirnames, filenames in os.walk(modules_root):
+        dirnames[:] = [d for d in dirnames if not d.startswith(".") and d not in ("tests", "templates")]
+        if "main.nf" in filenames:
+            dirs.append(dirpath)
+    return sorted(dirs)
+
+
+# ── Galaxy tool requirement index ─────────────────────────────────────────
+
+ToolsByPackage = Dict[str, List[Dict[str, Any]]]
+
+
+def _bare(name: str) -> str:
+    return re.sub(r"[^a-z0-9]", "", name.lower())
+
+
+def primary_package(packages: List[str], name: Optional[str] = None) -> Optional[str]:
+    """
+    The package that identifies a tool
+
+    Args:
+        packages: Requirement package names, in declaration order
+        name: Tool name to prefer a package for, e.g. a module's top-level
+              directory ('samtools' for samtools/sort); environment.yml lists
+              dependencies alphabetically, so order alone would pick htslib
+
+    Returns:
+        The package named like the tool, else the first non-helper requirement
+    """
+    if name:
+        named = next((p for p in packages if _bare(p) == _bare(name)), None)
+        if named:
+            return named
+    return next((p for p in packages if p not in HELPER_PACKAGES), packages[0] if packages else None)
+
+
+def add_tool(by_package: ToolsByPackage, tool: Dict[str, Any], requirements: List[Tuple[str, Optional[str]]]):
+    """Register one tool under every package it requires"""
+    primary = primary_package([p for p, _ in requirements])
+    for package, version in requirements:
+        by_package[package].append(dict(tool, requirement_version=version, primary=package == primary))
+
+
+def load_index_db(db_path: Path) -> ToolsByPackage:
+    """package -> tools requiring it, from the tool_index.py SQLite index"""
+    by_package: ToolsByPackage = defaultdict(list)
+    conn = sqlite3.connect(str(db_path))
+    rows = conn.execute(
+        "SELECT t.repo, t.path, t.tool_id, t.name, t.version, lower(r.package), r.version "
+        "FROM requirements r JOIN tools t ON r.repo = t.repo AND r.path = t.path "
+        "WHERE r.type = 'package' ORDER BY t.repo, t.path, r.rowid")
+    tools: Dict[Tuple[str, str], Tuple[Dict[str, Any], List[Tuple[str, Optional[str]]]]] = {}
+    for repo, path, tool_id, name, version, package, req_version in rows:
+        tool, requirements = tools.setdefault(
+            (repo, path), ({"id": tool_id, "name": name, "version": version, "source": source_label(repo)}, []))
+        requirements.append((package, req_version))
+    conn.close()
+    for tool, requirements in tools.values():
+        add_tool(by_package, tool, requirements)
+    return by_package
+
+
+def load_snapshot(path: Path) -> ToolsByPackage:
+    """package -> tools requiring it, from a tool-panel JSON snapshot"""
+    with open(path) as f:
+        tools = json.load(f)
+    by_package: ToolsByPackage = defaultdict(list)
+    for tool in tools:
+        requirements = [((req.get("name") or req.get("package") or "").lower(), req.get("version"))
+                        for req in tool.get("requirements") or [] if req.get("type", "package") == "package"]
+        add_tool(by_package, {"id": tool.get("id"), "name": tool.get("name"),
+                              "version": tool.get("version"), "source": path.name}, requirements)
+    return by_package
+
+
+def _source_rank(tool: Dict[str, Any]) -> int:
+    """Position of the tool's source in KNOWN_SOURCES (snapshots and unknown clones last)"""
+    labels = [label for label, _, _ in KNOWN_SOURCES]
+    return labels.index(tool["source"]) if tool.get("source") in labels else len(labels)
+
+
+def match_module(module: Dict[str, Any], by_package: ToolsByPackage) -> Dict[str, Any]:
+    """
+    Attach Galaxy tool candidates and a status to one parsed module
+
+    Only tools whose own primary requirement is the module's package count
+    as a mapping; tools that merely depend on it (e.g. bwa_mem on samtools)
+    are reported as "indirect".
+    """
+    primary = module["primary"]
+    if primary is None:
+        return dict(module, status="no-requirements", tools=[])
+    candidates = by_package.get(primary["package"], [])
+    direct = [t for t in candidates if t["primary"]]
+    exact = [t for t in direct if primary["version"] and t["requirement_version"] == primary["version"]]
+    if exact:
+        status = "exact"
+    elif direct:
+        status = "version-differs"
+    elif candidates:
+        status = "indirect"
+    else:
+        status = "missing"
+    candidates = direct or candidates
+    # exact matches first, each group in source preference order (sorted() is stable)
+    ordered = (sorted(exact, key=_source_rank)
+               + sorted((t for t in candidates if t not in exact), key=_source_rank))
+    return dict(module, status=status, tools=ordered)
+
+
+def map_modules(modules_root: Path, by_package: ToolsByPackage,
+                workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Parse every module under `modules_root` in parallel and join against Galaxy tools
+
+    Returns:
+        One mapping dict per module, sorted by module path
+    """
+    dirs = find_modules(modules_root)
+    root = str(modules_root)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        parsed = list(pool.map(parse_module, dirs, [root] * len(dirs), chunksize=32))
+    return [match_module(m, by_package) for m in parsed]
+
+
+STATUS_ICONS = {"exact": "✅", "version-differs": "⚠️", "indirect": "🔗", "missing": "❌", "no-requirements": "❔"}
+
+
+def markdown_report(mappings: List[Dict[str, Any]], max_tools: int = 3) -> str:
+    counts = defaultdict(int)
+    for m in mappings:
+        counts[m["status"]] += 1
+    lines = [
+        "| Module | Process | Package | Version | Galaxy tool(s) | Status |",
+        "|--------|---------|---------|---------|----------------|--------|",
+    ]
+    for m in mappings:
+        primary = m["primary"] or {}
+        tools = ", ".join(
+            f"`{t['id']}` ({t['requirement_version'] or '?'}, {t['source']})" for t in m["tools"][:max_tools])
+        if len(m["tools"]) > max_tools:
+            tools += f" +{len(m['tools']) - max_tools} more"
+        lines.append(f"| {m['module']} | {', '.join(m['processes'])} | {primary.get('package', '')} | "
+                     f"{primary.get('version') or ''} | {tools} | {STATUS_ICONS[m['status']]} {m['status']} |")
+    lines.append("")
+    lines.append(f"{len(mappings)} modules: {counts['exact']} exact, {counts['version-differs']} version differs, "
+                 f"{counts['indirect']} indirect, {counts['missing']} missing, {counts['no-requirements']} without requirements")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Map nf-core modules to Galaxy tools by bioconda requirements",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument("modules", type=Path, help="Pipeline modules/ directory")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB, help=f"tool_index.py database (default: {DEFAULT_DB})")
+    parser.add_argument("--snapshot", type=Path, action="append",
+                        help="Tool-panel JSON snapshot to use instead of the index (repeat to combine snapshots)")
+    parser.add_argument("--json", type=Path, help="Write the full mapping as JSON")
+    parser.add_argument("--workers", type=int, help="Parser processes (default: CPU count)")
+    args = parser.parse_args()
+
+    if not args.modules.is_dir():
+        print(f"Error: {args.modules} is not a directory", file=sys.stderr)
+        sys.exit(1)
+
+    by_package: ToolsByPackage = defaultdict(list)
+    sources = args.snapshot or []
+    if not sources and not args.db.exists():
+        print(f"Error: no tool index at {args.db}; run tool_index.py update first or pass --snapshot",
+              file=sys.stderr)
+        sys.exit(1)
+    for snapshot in sources:
+        for package, tools in load_snapshot(snapshot).items():
+            by_package[package].extend(tools)
+    if not sources:
+        by_package = load_index_db(args.db)
+
+    mappings = map_modules(args.modules, by_package, args.workers)
+    print(markdown_report(mappings))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(mappings, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
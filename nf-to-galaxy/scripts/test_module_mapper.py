@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Tests for module_mapper.py against a small modules/ tree and tool-panel snapshot.
+
+Usage:
+    python -m unittest test_module_mapper      # from this directory
+    python -m pytest test_module_mapper.py
+"""
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from module_mapper import load_snapshot, map_modules, parse_module, primary_package
+
+# module path -> (main.nf process, environment.yml dependencies as nf-core writes them: alphabetical)
+MODULES = {
+    "nf-core/samtools/sort": ("SAMTOOLS_SORT", ["bioconda::htslib=1.21", "bioconda::samtools=1.21"]),
+    "nf-core/star/align": ("STAR_ALIGN", ["bioconda::htslib=1.21", "bioconda::samtools=1.21", "bioconda::star=2.7.11b"]),
+    "nf-core/fastp": ("FASTP", ["bioconda::fastp=0.23.4"]),
+    "local/trimgalore": ("TRIMGALORE", ["bioconda::cutadapt=4.9", "bioconda::trim-galore=0.6.10"]),
+}
+
+SNAPSHOT = [
+    {"id": "samtools_sort", "name": "Samtools sort", "version": "2.0.5",
+     "requirements": [{"name": "samtools", "version": "1.21", "type": "package"}]},
+    {"id": "rna_star", "name": "RNA STAR", "version": "2.7.11b+galaxy0",
+     "requirements": [{"name": "htslib", "version": "1.21", "type": "package"},
+                      {"name": "star", "version": "2.7.11b", "type": "package"}]},
+    {"id": "bwa_mem", "name": "BWA-MEM", "version": "0.7.18",
+     "requirements": [{"name": "bwa", "version": "0.7.18", "type": "package"},
+                      {"name": "samtools", "version": "1.21", "type": "package"}]},
+]
+
+
+class ModuleMapperTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name) / "modules"
+        for module, (process, dependencies) in MODULES.items():
+            module_dir = self.root / module
+            module_dir.mkdir(parents=True)
+            (module_dir / "main.nf").write_text(
+                f"process {process} {{\n    conda \"${{moduleDir}}/environment.yml\"\n}}\n")
+            (module_dir / "environment.yml").write_text(
+                "channels:\n  - conda-forge\n  - bioconda\ndependencies:\n"
+                + "".join(f"  - {dep}\n" for dep in dependencies))
+        self.snapshot = Path(self.tmp.name) / "tools.json"
+        self.snapshot.write_text(json.dumps(SNAPSHOT))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_primary_package_prefers_tool_name(self):
+        self.assertEqual(primary_package(["htslib", "samtools"], "samtools"), "samtools")
+        self.assertEqual(primary_package(["cutadapt", "trim-galore"], "trimgalore"), "trim-galore")
+        # without a matching name: first package that is not a helper library
+        self.assertEqual(primary_package(["htslib", "samtools"]), "samtools")
+        self.assertEqual(primary_package(["pigz"]), "pigz")
+
+    def test_samtools_module_primary_package(self):
+        module = parse_module(str(self.root / "nf-core/samtools/sort"), str(self.root))
+        self.assertEqual(module["processes"], ["SAMTOOLS_SORT"])
+        self.assertEqual(module["primary"], {"package": "samtools", "version": "1.21"})
+
+    def test_map_modules(self):
+        mappings = {m["module"]: m for m in map_modules(self.root, load_snapshot(self.snapshot), workers=1)}
+        samtools = mappings["nf-core/samtools/sort"]
+        self.assertEqual(samtools["status"], "exact")
+        # bwa_mem merely depends on samtools
+        self.assertEqual([t["id"] for t in samtools["tools"]], ["samtools_sort"])
+        self.assertEqual(mappings["nf-core/star/align"]["status"], "exact")
+        self.assertEqual(mappings["nf-core/star/align"]["tools"][0]["id"], "rna_star")
+        self.assertEqual(mappings["nf-core/fastp"]["status"], "missing")
+        self.assertEqual(mappings["local/trimgalore"]["primary"]["package"], "trim-galore")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,540 @@
+#!/usr/bin/env python3
+"""
+Persistent SQLite index of local Galaxy tool repository clones (tools-iuc,
+GenOuest, bgruening, ARTbio, tools-devteam, or any other clone)
+
+Parses every tool XML once, with macros and tokens expanded, and stores
+tool id, name, version, bioconda requirements and path. Later updates only
+re-parse files whose mtime/size and content hash changed (plus tools that
+import a changed macros file), so queries answer in milliseconds instead of
+grepping every XML.
+
+Usage:
+    # Build or refresh the index for one or more clones
+    python tool_index.py update ~/tools-iuc
+
+    # Look up by tool id, display name or bioconda package (default: all three)
+    python tool_index.py query hyphy
+    python tool_index.py query samtools --by package
+
+    # Refresh and query in one step (what check_tool.sh does)
+    python tool_index.py query iqtree --update ~/tools-iuc
+
+    # Index every known tool repository clone in parallel, one worker each
+    python tool_index.py update ~/tools-iuc ~/galaxytools ~/tools-artbio --discover
+
+    # Check a whole pipeline's tool list in one pass, ranked across sources
+    python tool_index.py query --tool-list tools.txt --limit 3
+
+The index lives in ~/.cache/galaxy-skills/tool_index.sqlite (override with
+--db or GALAXY_TOOL_INDEX).
+"""
+
+import argparse
+import copy
+import hashlib
+import os
+import sqlite3
+import sys
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_DB = Path(os.environ.get(
+    "GALAXY_TOOL_INDEX",
+    Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "galaxy-skills" / "tool_index.sqlite",
+))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    repo TEXT, path TEXT, mtime REAL, size INTEGER, sha1 TEXT, kind TEXT,
+    PRIMARY KEY (repo, path)
+);
+CREATE TABLE IF NOT EXISTS tools (
+    repo TEXT, path TEXT, tool_id TEXT, name TEXT, version TEXT, description TEXT,
+    PRIMARY KEY (repo, path)
+);
+CREATE TABLE IF NOT EXISTS requirements (
+    repo TEXT, path TEXT, package TEXT, version TEXT, type TEXT
+);
+CREATE TABLE IF NOT EXISTS macro_deps (
+    repo TEXT, path TEXT, dep TEXT
+);
+CREATE INDEX IF NOT EXISTS tools_id ON tools (tool_id COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS tools_name ON tools (name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS req_package ON requirements (package COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS req_tool ON requirements (repo, path);
+CREATE INDEX IF NOT EXISTS deps_dep ON macro_deps (repo, dep);
+CREATE INDEX IF NOT EXISTS deps_tool ON macro_deps (repo, path);
+"""
+
+MAX_EXPAND_PASSES = 20
+
+
+# ── Macro expansion ───────────────────────────────────────────────────────
+
+class Macros:
+    """Tokens and xml macros visible to one tool, following <import> chains"""
+
+    def __init__(self):
+        self.tokens: Dict[str, str] = {}
+        self.xml: Dict[str, ET.Element] = {}
+        self.files: List[str] = []
+
+    def load(self, macros_el: ET.Element, base_dir: Path, seen=None):
+        seen = seen if seen is not None else set()
+        for child in macros_el:
+            if child.tag == "import" and child.text:
+                path = (base_dir / child.text.strip()).resolve()
+                if path in seen or not path.is_file():
+                    continue
+                seen.add(path)
+                self.files.append(str(path))
+                try:
+                    imported = ET.parse(path).getroot()
+                except ET.ParseError:
+                    continue
+                self.load(imported, path.parent, seen)
+            elif child.tag == "token" and child.get("name"):
+                self.tokens[child.get("name")] = (child.text or "").strip()
+            elif child.tag == "xml" and child.get("name"):
+                self.xml[child.get("name")] = child
+
+    def substitute(self, text: Optional[str], extra: Optional[Dict[str, str]] = None) -> Optional[str]:
+        if not text or "@" not in text:
+            return text
+        tokens = dict(self.tokens, **(extra or {}))
+        for _ in range(MAX_EXPAND_PASSES):
+            before = text
+            for name, value in tokens.items():
+                if name in text:
+                    text = text.replace(name, value)
+            if text == before or "@" not in text:
+                break
+        return text
+
+    def expand(self, expand_el: ET.Element) -> List[ET.Element]:
+        """Elements replacing one <expand macro="..."/>, with macro parameters applied"""
+        macro = self.xml.get(expand_el.get("macro", ""))
+        if macro is None:
+            return []
+        params = {}
+        for token in (macro.get("tokens") or "").split(","):
+            token = token.strip()
+            if token:
+                value = expand_el.get(token, macro.get(f"token_{token}", ""))
+                params[f"@{token.upper()}@"] = value
+        # Wrap so a top-level <yield/> has a parent like any nested one
+        body = ET.Element("body")
+        body.extend(copy.deepcopy(list(macro)))
+        for el in body.iter():
+            el.text = self.substitute(el.text, params)
+            for key, value in el.attrib.items():
+                el.set(key, self.substitute(value, params))
+        for parent in list(body.iter()):
+            children = list(parent)
+            if any(c.tag == "yield" for c in children):
+                parent[:] = []
+                for child in children:
+                    parent.extend(copy.deepcopy(list(expand_el)) if child.tag == "yield" else [child])
+        return list(body)
+
+
+def _expand_children(parent: ET.Element, macros: Macros, tags: Tuple[str, ...]):
+    """Expand <expand> children of `parent` (repeatedly, macros may nest)"""
+    for _ in range(MAX_EXPAND_PASSES):
+        children = list(parent)
+        if not any(c.tag == "expand" for c in children):
+            break
+        parent[:] = []
+        for child in children:
+            parent.extend(macros.expand(child) if child.tag == "expand" else [child])
+    for child in parent:
+        if child.tag in tags:
+            _expand_children(child, macros, ())
+
+
+def parse_tool(path: Path) -> Optional[Dict[str, Any]]:
+    """
+    Parse a tool XML
+
+    Returns:
+        Dict with id, name, version, description, requirements and macro
+        files it depends on; None if the file is not a <tool>
+    """
+    try:
+        root = ET.parse(path).getroot()
+    except ET.ParseError:
+        return None
+    if root.tag != "tool":
+        return None
+
+    macros = Macros()
+    macros_el = root.find("macros")
+    if macros_el is not None:
+        macros.load(macros_el, path.parent)
+    # Only the parts we index need expanding: top-level requirement macros
+    # and <expand> inside <requirements>
+    _expand_children(root, macros, ("requirements",))
+
+    requirements = []
+    for req in root.findall("requirements/requirement"):
+        requirements.append({
+            "package": macros.substitute((req.text or "").strip()),
+            "version": macros.substitute(req.get("version")),
+            "type": req.get("type", "package"),
+        })
+    desc = root.find("description")
+    return {
+        "id": macros.substitute(root.get("id")),
+        "name": macros.substitute(root.get("name")),
+        "version": macros.substitute(root.get("version")),
+        "description": macros.substitute((desc.text or "").strip()) if desc is not None else "",
+        "requirements": requirements,
+        "macro_files": macros.files,
+    }
+
+
+# ── Index ─────────────────────────────────────────────────────────────────
+
+def _sha1(path: Path) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def scan_xml_files(repo: Path) -> Iterable[Path]:
+    """Every *.xml under the clone's tools/ directory (or the clone itself)"""
+    top = repo / "tools" if (repo / "tools").is_dir() else repo
+    for dirpath, dirnames, filenames in os.walk(top):
+        dirnames[:] = [d for d in dirnames if not d.startswith(".") and d != "test-data"]
+        for filename in filenames:
+            if filename.endswith(".xml"):
+                yield Path(dirpath) / filename
+
+
+# Known Galaxy tool repositories, in the preference order of tool-sources.md.
+# (label, GitHub repo, usual clone directory names)
+KNOWN_SOURCES = [
+    ("tools-iuc", "galaxyproject/tools-iuc", ("tools-iuc",)),
+    ("genouest", "genouest/galaxy-tools", ("galaxy-tools", "genouest-galaxy-tools")),
+    ("bgruening", "bgruening/galaxytools", ("galaxytools", "bgruening-galaxytools")),
+    ("artbio", "ARTbio/tools-artbio", ("tools-artbio",)),
+    ("tools-devteam", "galaxyproject/tools-devteam", ("tools-devteam",)),
+]
+
+# Where check_tool.sh looks for clones; --discover checks these parents for
+# every known source
+CLONE_PARENTS = [
+    "~/Documents/brc-analytics",
+    "~/galaxy",
+    "~",
+    ".",
+    "..",
+]
+
+
+def source_label(repo: str) -> str:
+    """Short name of the tool source a clone belongs to"""
+    name = os.path.basename(repo.rstrip("/"))
+    for label, _, dirnames in KNOWN_SOURCES:
+        if name in dirnames:
+            return label
+    return name
+
+
+def source_rank(repo: str) -> int:
+    labels = [label for label, _, _ in KNOWN_SOURCES]
+    label = source_label(repo)
+    return labels.index(label) if label in labels else len(labels)
+
+
+def discover_clones() -> List[Path]:
+    found = []
+    for parent in CLONE_PARENTS:
+        for _, _, dirnames in KNOWN_SOURCES:
+            for dirname in dirnames:
+                path = Path(parent).expanduser() / dirname
+                if path.is_dir() and path.resolve() not in found:
+                    found.append(path.resolve())
+    return found
+
+
+def scan_repo(repo_key: str, known: Dict[str, Tuple[float, int, str]],
+              deps: Dict[str, List[str]]) -> Dict[str, Any]:
+    """
+    Work out what changed in one clone and parse it (runs in a worker process)
+
+    Args:
+        repo_key: Absolute clone path
+        known: path -> (mtime, size, sha1) already in the index
+        deps: macros file path -> tool paths importing it
+
+    Returns:
+        Dict with touched, removed and changed file rows and parsed tools
+    """
+    seen = set()
+    changed = []
+    touched = []
+    for path in scan_xml_files(Path(repo_key)):
+        rel = str(path)
+        seen.add(rel)
+        try:
+            st = path.stat()
+        except OSError:
+            continue
+        old = known.get(rel)
+        if old and old[0] == st.st_mtime and old[1] == st.st_size:
+            continue
+        digest = _sha1(path)
+        if old and old[2] == digest:
+            touched.append((st.st_mtime, st.st_size, repo_key, rel))
+            continue
+        changed.append((rel, st.st_mtime, st.st_size, digest))
+    removed = [p for p in known if p not in seen]
+
+    # Tools importing a changed or removed macros file must be re-parsed too
+    to_parse = {rel for rel, _, _, _ in changed}
+    for dep in [rel for rel, _, _, _ in changed] + removed:
+        to_parse.update(t for t in deps.get(dep, []) if t in seen)
+
+    return {
+        "scanned": len(seen),
+        "touched": touched,
+        "removed": removed,
+        "changed": changed,
+        "parsed": {rel: parse_tool(Path(rel)) for rel in sorted(to_parse)},
+    }
+
+
+class ToolIndex:
+    """SQLite-backed index of tool XMLs across local repository clones"""
+
+    def __init__(self, db_path: Path = DEFAULT_DB):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def repos(self) -> List[str]:
+        return [r[0] for r in self.conn.execute("SELECT DISTINCT repo FROM files ORDER BY repo")]
+
+    def _scan_args(self, repo_key: str):
+        known = {row[0]: row[1:] for row in self.conn.execute(
+            "SELECT path, mtime, size, sha1 FROM files WHERE repo = ?", (repo_key,))}
+        deps: Dict[str, List[str]] = {}
+        for tool_path, dep in self.conn.execute(
+                "SELECT path, dep FROM macro_deps WHERE repo = ?", (repo_key,)):
+            deps.setdefault(dep, []).append(tool_path)
+        return repo_key, known, deps
+
+    def update(self, repo: Path) -> Dict[str, int]:
+        """
+        Bring the index for one clone up to date
+
+        Args:
+            repo: Path to a local tool repository clone
+
+        Returns:
+            Counts of scanned, parsed and removed files
+        """
+        return self.update_many([repo])[0]
+
+    def update_many(self, repos: List[Path], workers: Optional[int] = None) -> List[Dict[str, int]]:
+        """
+        Refresh several clones concurrently, one worker process per clone
+
+        Workers only read the filesystem and parse XML; all writes happen here
+        in a single transaction per clone.
+
+        Returns:
+            Per-clone counts of scanned, parsed and removed files, in order
+        """
+        keys = [str(Path(r).expanduser().resolve()) for r in repos]
+        jobs = [self._scan_args(k) for k in keys]
+        if len(jobs) == 1:
+            results = [scan_repo(*jobs[0])]
+        else:
+            with ProcessPoolExecutor(max_workers=workers or len(jobs)) as pool:
+                results = list(pool.map(scan_repo, *zip(*jobs)))
+        for key, result in zip(keys, results):
+            self._store(key, result)
+        return [{"scanned": r["scanned"], "parsed": len(r["parsed"]), "removed": len(r["removed"])}
+                for r in results]
+
+    def _store(self, repo_key: str, result: Dict[str, Any]):
+        cur = self.conn.cursor()
+        cur.executemany("UPDATE files SET mtime = ?, size = ? WHERE repo = ? AND path = ?", result["touched"])
+        for rel in result["removed"]:
+            self._forget(cur, repo_key, rel)
+            cur.execute("DELETE FROM files WHERE repo = ? AND path = ?", (repo_key, rel))
+        cur.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, 'xml')",
+                        [(repo_key, rel, mtime, size, digest) for rel, mtime, size, digest in result["changed"]])
+        for rel, tool in result["parsed"].items():
+            self._forget(cur, repo_key, rel)
+            cur.execute("UPDATE files SET kind = ? WHERE repo = ? AND path = ?",
+                        ("tool" if tool else "other", repo_key, rel))
+            if tool is None:
+                continue
+            cur.execute("INSERT INTO tools VALUES (?, ?, ?, ?, ?, ?)",
+                        (repo_key, rel, tool["id"], tool["name"], tool["version"], tool["description"]))
+            cur.executemany("INSERT INTO requirements VALUES (?, ?, ?, ?, ?)",
+                            [(repo_key, rel, r["package"], r["version"], r["type"])
+                             for r in tool["requirements"]])
+            cur.executemany("INSERT INTO macro_deps VALUES (?, ?, ?)",
+                            [(repo_key, rel, dep) for dep in tool["macro_files"]])
+        self.conn.commit()
+
+    @staticmethod
+    def _forget(cur, repo_key: str, rel: str):
+        for table in ("tools", "requirements", "macro_deps"):
+            cur.execute(f"DELETE FROM {table} WHERE repo = ? AND path = ?", (repo_key, rel))
+
+    def query(self, term: str, by: str = "any", limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Find tools by id, display name and/or bioconda package across all clones
+
+        Hits are ranked by match quality (exact id or package, then prefix,
+        then substring), then by source preference (tools-iuc first).
+
+        Returns:
+            Tool dicts with repo, source, path, id, name, version,
+            requirements and score
+        """
+        like = f"%{term}%"
+        clauses = []
+        params: List[Any] = []
+        if by in ("any", "id"):
+            clauses.append("t.tool_id LIKE ?")
+            params.append(like)
+        if by in ("any", "name"):
+            clauses.append("t.name LIKE ?")
+            params.append(like)
+        if by in ("any", "package"):
+            clauses.append("EXISTS (SELECT 1 FROM requirements r WHERE r.repo = t.repo AND r.path = t.path "
+                           "AND r.package LIKE ?)")
+            params.append(like if by == "any" else term)
+        sql = ("SELECT t.repo, t.path, t.tool_id, t.name, t.version, t.description FROM tools t "
+               f"WHERE {' OR '.join(clauses)}")
+        results = []
+        for repo, path, tool_id, name, version, description in self.conn.execute(sql, params).fetchall():
+            reqs = self.conn.execute(
+                "SELECT package, version FROM requirements WHERE repo = ? AND path = ? AND type = 'package'",
+                (repo, path)).fetchall()
+            hit = {
+                "repo": repo, "source": source_label(repo), "path": path,
+                "id": tool_id, "name": name, "version": version, "description": description,
+                "requirements": [{"package": p, "version": v} for p, v in reqs],
+            }
+            hit["score"] = match_score(term, hit)
+            results.append(hit)
+        results.sort(key=lambda h: (-h["score"], source_rank(h["repo"]), h["id"] or ""))
+        return results[:limit]
+
+
+def match_score(term: str, hit: Dict[str, Any]) -> int:
+    """Relevance of one hit: exact > prefix > substring; id > package > name"""
+    term = term.lower()
+    score = 0
+    for value, exact, prefix, substring in (
+            ((hit["id"] or "").lower(), 100, 60, 30),
+            *(((r["package"] or "").lower(), 90, 50, 20) for r in hit["requirements"]),
+            ((hit["name"] or "").lower(), 80, 40, 10)):
+        if value == term:
+            score = max(score, exact)
+        elif value.startswith(term):
+            score = max(score, prefix)
+        elif term in value:
+            score = max(score, substring)
+    return score
+
+
+def print_results(term: str, results: List[Dict[str, Any]]):
+    if not results:
+        print(f"No indexed tools match '{term}'")
+        return
+    for r in results:
+        reqs = ", ".join(f"{q['package']}={q['version']}" if q["version"] else q["package"]
+                         for q in r["requirements"])
+        print(f"{r['id']} {r['version']}  ({r['name']})  [{r['source']}]")
+        print(f"    {os.path.relpath(r['path'], r['repo'])}")
+        if reqs:
+            print(f"    requires: {reqs}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Index local Galaxy tool repository clones and query them",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB, help=f"Index database (default: {DEFAULT_DB})")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_update = sub.add_parser("update", help="Index or refresh local clones")
+    p_update.add_argument("repos", nargs="*", type=Path, help="Clone paths (default: all already indexed)")
+    p_update.add_argument("--discover", action="store_true",
+                          help="Also index clones of known tool repositories found in the usual locations")
+    p_update.add_argument("-q", "--quiet", action="store_true", help="No progress output")
+
+    p_query = sub.add_parser("query", help="Look up tools")
+    p_query.add_argument("terms", nargs="*", help="Tool ids, names or bioconda packages")
+    p_query.add_argument("--tool-list", type=Path, help="File with one term per line (e.g. a pipeline's tools)")
+    p_query.add_argument("--by", choices=["any", "id", "name", "package"], default="any")
+    p_query.add_argument("--update", nargs="+", type=Path, metavar="REPO", help="Refresh these clones first")
+    p_query.add_argument("--limit", type=int, default=50, help="Hits per term (default: 50)")
+
+    args = parser.parse_args()
+    index = ToolIndex(args.db)
+
+    if args.command == "update":
+        repos = list(args.repos) or [Path(r) for r in index.repos()]
+        if args.discover:
+            repos += [r for r in discover_clones() if r not in [Path(x).expanduser().resolve() for x in repos]]
+        if not repos:
+            parser.error("No clones given, none indexed yet and none discovered")
+        for repo in repos:
+            if not Path(repo).expanduser().is_dir():
+                print(f"Error: {repo} is not a directory", file=sys.stderr)
+                sys.exit(1)
+        start = time.time()
+        stats = index.update_many(repos)
+        if not args.quiet:
+            for repo, st in zip(repos, stats):
+                print(f"{repo} [{source_label(str(Path(repo).expanduser().resolve()))}]: "
+                      f"{st['scanned']} XML files, {st['parsed']} parsed, {st['removed']} removed")
+            print(f"Indexed {len(repos)} clone(s) in {time.time() - start:.2f}s")
+    else:
+        terms = list(args.terms)
+        if args.tool_list:
+            with open(args.tool_list) as f:
+                terms.extend(line.strip() for line in f if line.strip() and not line.startswith("#"))
+        if not terms:
+            parser.error("Provide terms or --tool-list")
+        repos = [r for r in args.update or [] if Path(r).expanduser().is_dir()]
+        if repos:
+            index.update_many(repos)
+        missing = []
+        for term in terms:
+            results = index.query(term, args.by, args.limit)
+            if len(terms) > 1:
+                print(f"\n=== {term} ===")
+            print_results(term, results)
+            if not results:
+                missing.append(term)
+        if len(terms) > 1:
+            print(f"\n{len(terms) - len(missing)}/{len(terms)} found locally"
+                  + (f"; not found: {', '.join(missing)}" if missing else ""))
+
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
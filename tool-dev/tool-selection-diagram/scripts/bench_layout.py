@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark the tool selection diagram layout on large synthetic trees.
+
+Builds N-level definitions with a fixed branching factor, then times
+build_tree() and layout() separately. No image is rendered, so trees far
+wider than any real PNG can be measured.
+
+Usage:
+    python3 bench_layout.py [--depth 4] [--fanout 10] [--repeat 3]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from PIL import Image, ImageDraw  # noqa: E402
+
+from render_tool_diagram import build_tree, collect_nodes, layout  # noqa: E402
+
+
+def synthetic_definition(depth, fanout):
+    """Definition with `depth` branch levels below the start and `fanout` children each."""
+    def branch(prefix, level):
+        if level == depth:
+            return [{"name": f"tool {prefix}.{i}", "description": "synthetic"}
+                    for i in range(fanout)]
+        return [{"label": f"node {prefix}.{i}", "children": branch(f"{prefix}.{i}", level + 1)}
+                for i in range(fanout)]
+
+    return {
+        "title": f"Synthetic tree (depth {depth}, fanout {fanout})",
+        "start_question": "Benchmark root",
+        "children": branch("0", 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--depth", type=int, default=4, help="Branch levels below the start (default: 4)")
+    parser.add_argument("--fanout", type=int, default=10, help="Children per branch node (default: 10)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per size (default: 3)")
+    args = parser.parse_args()
+
+    draw = ImageDraw.Draw(Image.new("RGB", (1, 1)))
+
+    for depth in range(2, args.depth + 1):
+        definition = synthetic_definition(depth, args.fanout)
+        best_build = best_layout = float("inf")
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            root = build_tree(definition)
+            t1 = time.perf_counter()
+            canvas_w, canvas_h, _ = layout(draw, root)
+            t2 = time.perf_counter()
+            best_build = min(best_build, t1 - t0)
+            best_layout = min(best_layout, t2 - t1)
+        node_count = len(collect_nodes(root))
+        print(f"depth={depth} nodes={node_count:>8}  build={best_build * 1000:8.1f} ms  "
+              f"layout={best_layout * 1000:8.1f} ms  "
+              f"({best_layout / node_count * 1e6:.2f} us/node, canvas {canvas_w}x{canvas_h})")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,17 +3,20 @@
 Render a tool selection flowchart diagram from a JSON definition.
 
 Produces a PNG image using Galaxy's color palette (from gxy-colors.svg):
-  Start question -> Analysis goals -> Decision criteria -> Galaxy tools
+  Start question -> Analysis goals -> Decision criteria (any depth) -> Galaxy tools
 
 Color palette:  gxy-colors.svg "Paired" colormap + Galaxy logo colors
 Font:           Atkinson Hyperlegible ($font-family-base)
 
 Usage:
     python3 render_tool_diagram.py --input definition.json --output diagram.png [--dpi 150]
+    python3 render_tool_diagram.py --input definition.json --output diagram.png --tiles goal
+    python3 render_tool_diagram.py --input definition.json --output diagram.png --incremental
 """
 
 import argparse
 import collections
+import hashlib
 import json
 import math
 import os
@@ -201,119 +204,134 @@ class Node:
         hh = self.h / 2
         return (self.x - hw, self.y - hh, self.x + hw, self.y + hh)
 
-    def leaf_count(self):
-        if self.tier == "tool":
-            return 1
-        if not self.children:
-            return 1
-        return sum(c.leaf_count() for c in self.children)
-
 
 # ── Tree construction ─────────────────────────────────────────────────────
 
+def _child_defs(node_def):
+    """Child definitions of a branch node, in any supported spelling.
+
+    ``children`` is the generic N-level form; ``criteria`` and ``tools`` are
+    the original goal/criterion keys and may be combined on one node.
+    """
+    return (node_def.get("children", [])
+            + node_def.get("criteria", [])
+            + node_def.get("tools", []))
+
+
 def build_tree(definition):
+    """Build the node tree from a definition of arbitrary depth.
+
+    Depth 0 is the start question, depth 1 are goals, deeper branch nodes
+    are criteria and any entry with a ``name`` is a tool leaf.
+    """
     root = Node(definition["start_question"], "start")
-    for goal_def in definition["goals"]:
-        goal = Node(goal_def["label"], "goal")
-        goal.parent = root
-        root.children.append(goal)
-        if "criteria" in goal_def:
-            for crit_def in goal_def["criteria"]:
-                crit = Node(crit_def["label"], "criterion")
-                crit.parent = goal
-                goal.children.append(crit)
-                for tool_def in crit_def["tools"]:
-                    tool = Node(tool_def["name"], "tool", tool_def.get("description"))
-                    tool.parent = crit
-                    crit.children.append(tool)
-        elif "tools" in goal_def:
-            for tool_def in goal_def["tools"]:
-                tool = Node(tool_def["name"], "tool", tool_def.get("description"))
-                tool.parent = goal
-                goal.children.append(tool)
+    top_defs = definition.get("goals", []) + definition.get("children", [])
+    stack = [(root, goal_def, 1) for goal_def in reversed(top_defs)]
+    while stack:
+        parent, node_def, depth = stack.pop()
+        if "name" in node_def:
+            node = Node(node_def["name"], "tool", node_def.get("description"))
+        else:
+            node = Node(node_def["label"], "goal" if depth == 1 else "criterion")
+            stack.extend((node, d, depth + 1) for d in reversed(_child_defs(node_def)))
+        node.parent = parent
+        parent.children.append(node)
     return root
 
 
 # ── Layout ────────────────────────────────────────────────────────────────
 
-def compute_widths(draw, root):
+def compute_widths(draw, root, known=None):
+    """Measure node widths; `known` maps id(node) to a width to reuse."""
+    fonts = {}
     stack = [root]
     while stack:
         node = stack.pop()
-        style = TIER_STYLES[node.tier]
-        font = load_font(style["font"], style["size"])
+        if known and id(node) in known:
+            node.w = known[id(node)]
+            stack.extend(node.children)
+            continue
+        font = fonts.get(node.tier)
+        if font is None:
+            style = TIER_STYLES[node.tier]
+            font = fonts[node.tier] = load_font(style["font"], style["size"])
         max_w = 9999 if node.tier == "start" else NODE_MAX_WIDTH
         node.w = node_width_for_text(draw, node.label, font, max_width=max_w)
         stack.extend(node.children)
 
 
-def compute_spans(node):
-    if node.tier == "tool":
-        node.span = node.w
-        return
-    for child in node.children:
-        compute_spans(child)
-    if not node.children:
-        node.span = node.w
-        return
-    children_span = sum(c.span for c in node.children)
-    gaps = TOOL_H_GAP * (len(node.children) - 1) if node.tier == "criterion" else \
-           CLUSTER_GAP * (len(node.children) - 1)
-    node.span = max(node.w, children_span + gaps)
-
-
-def position_subtree(node, center_x):
-    node.x = center_x
-    if not node.children:
-        return
-    gap = TOOL_H_GAP if node.tier == "criterion" else CLUSTER_GAP
-    total_child_span = sum(c.span for c in node.children)
-    total_gaps = gap * (len(node.children) - 1)
-    used = total_child_span + total_gaps
-    left = center_x - used / 2
-    for child in node.children:
-        child_center = left + child.span / 2
-        position_subtree(child, child_center)
-        left += child.span + gap
-
-
-def has_criteria(root):
+def _child_gap(node):
+    return TOOL_H_GAP if node.tier == "criterion" else CLUSTER_GAP
+
+
+def _post_order(root):
+    """Nodes ordered so every child precedes its parent."""
+    order = collect_nodes(root)
+    order.reverse()
+    return order
+
+
+def compute_spans(root):
+    for node in _post_order(root):
+        if node.tier == "tool" or not node.children:
+            node.span = node.w
+            continue
+        children_span = sum(c.span for c in node.children)
+        gaps = _child_gap(node) * (len(node.children) - 1)
+        node.span = max(node.w, children_span + gaps)
+
+
+def position_subtree(root, center_x):
+    root.x = center_x
     stack = [root]
     while stack:
         node = stack.pop()
-        if node.tier == "criterion":
-            return True
+        if not node.children:
+            continue
+        gap = _child_gap(node)
+        used = sum(c.span for c in node.children) + gap * (len(node.children) - 1)
+        left = node.x - used / 2
+        for child in node.children:
+            child.x = left + child.span / 2
+            left += child.span + gap
         stack.extend(node.children)
-    return False
 
 
 def assign_y(root):
+    """Place branch nodes one row per depth and all tools on the bottom row.
+
+    Returns a map of row names to y coordinates: ``start`` and ``goal`` for
+    the two top rows, ``tool`` for the bottom row, and ``criterion`` for the
+    first criterion row.  ``rows`` lists every row from top to bottom.
+    The tool row is the deepest row, so a tree that stops at its goals
+    (such as a tiling overview) has no empty row reserved below them.
+    """
     top = MARGIN_TOP + NODE_HEIGHT / 2
-    use_criteria_row = has_criteria(root)
-    if use_criteria_row:
-        y_map = {
-            "start":     top,
-            "goal":      top + ROW_SPACING,
-            "criterion": top + ROW_SPACING * 2,
-            "tool":      top + ROW_SPACING * 3,
-        }
-    else:
-        y_map = {
-            "start":     top,
-            "goal":      top + ROW_SPACING,
-            "criterion": top + ROW_SPACING * 2,
-            "tool":      top + ROW_SPACING * 2,
-        }
+    depth_of = {id(root): 0}
+    max_depth = 0
+    for node in collect_nodes(root)[1:]:
+        depth = depth_of[id(node)] = depth_of[id(node.parent)] + 1
+        max_depth = max(max_depth, depth)
+    tool_depth = max_depth
+
     stack = [root]
     while stack:
         node = stack.pop()
-        node.y = y_map[node.tier]
+        depth = tool_depth if node.tier == "tool" else depth_of[id(node)]
+        node.y = top + ROW_SPACING * depth
         stack.extend(node.children)
-    return y_map
+
+    return {
+        "start":     top,
+        "goal":      top + ROW_SPACING,
+        "criterion": top + ROW_SPACING * 2,
+        "tool":      top + ROW_SPACING * tool_depth,
+        "rows":      [top + ROW_SPACING * d for d in range(tool_depth + 1)],
+    }
 
 
-def layout(draw, root):
-    compute_widths(draw, root)
+def layout(draw, root, known_widths=None):
+    compute_widths(draw, root, known_widths)
     compute_spans(root)
     canvas_width = root.span + MARGIN_X * 2
     canvas_width = max(canvas_width, 600)
@@ -339,53 +357,63 @@ def collect_nodes(root):
     return nodes
 
 
-def render(definition, output_path, dpi=150):
-    root = build_tree(definition)
+def collect_edges(nodes):
+    return [(node, child) for node in nodes for child in node.children]
 
-    tmp = Image.new("RGB", (1, 1))
-    tmp_draw = ImageDraw.Draw(tmp)
-    canvas_w, canvas_h, y_map = layout(tmp_draw, root)
 
-    img = Image.new("RGB", (canvas_w, canvas_h), BG_COLOR)
-    draw = ImageDraw.Draw(img)
-    all_nodes = collect_nodes(root)
+def draw_diagram(draw, nodes, edges, y_map, canvas_w, title, x_offset=0):
+    """Draw arrows, nodes, legend and title onto `draw`.
+
+    `x_offset` is the layout x coordinate of the canvas' left edge, so a
+    tile can draw just its slice of a larger layout.
+    """
+    draw_tree(draw, nodes, edges, x_offset=x_offset)
+    draw_legend(draw, y_map, canvas_w, title)
 
+
+def draw_tree(draw, nodes, edges, x_offset=0):
+    """Draw arrows, then nodes, shifted left by `x_offset`."""
     # Draw arrows (behind nodes)
-    for node in all_nodes:
-        for child in node.children:
-            bx, by = node.bottom_center()
-            tx, ty = child.top_center()
-            draw_arrow(draw, bx, by, tx, ty)
+    for node, child in edges:
+        bx, by = node.bottom_center()
+        tx, ty = child.top_center()
+        draw_arrow(draw, bx - x_offset, by, tx - x_offset, ty)
 
     # Draw nodes
     desc_font = load_font(FONT_ITALIC, DESC_FONT_SIZE)
+    fonts = {}
 
-    for node in all_nodes:
+    for node in nodes:
         style = TIER_STYLES[node.tier]
-        font = load_font(style["font"], style["size"])
+        font = fonts.get(node.tier)
+        if font is None:
+            font = fonts[node.tier] = load_font(style["font"], style["size"])
         x0, y0, x1, y1 = node.bbox()
+        x = node.x - x_offset
 
         draw.rounded_rectangle(
-            (x0, y0, x1, y1),
+            (x0 - x_offset, y0, x1 - x_offset, y1),
             radius=NODE_CORNER_RADIUS,
             fill=hex_to_rgb(style["bg"]),
         )
 
         # Text centered with anchor="mm" (middle-middle) for proper vertical centering
         draw.text(
-            (node.x, node.y), node.label,
+            (x, node.y), node.label,
             fill=hex_to_rgb(style["fg"]), font=font, anchor="mm",
         )
 
-        # Description below tool nodes
-        if node.tier == "tool" and node.description:
+        # Description below leaf nodes (tools, or goals on an overview)
+        if node.description:
             dy = y1 + DESC_OFFSET_Y
             draw.text(
-                (node.x, dy), node.description,
+                (x, dy), node.description,
                 fill=hex_to_rgb(GXY_DARK), font=desc_font, anchor="mt",
             )
 
-    # Draw legend
+
+def draw_legend(draw, y_map, canvas_w, title):
+    """Draw the tier legend and the title caption below the tool row."""
     legend_font = load_font(FONT_REGULAR, LEGEND_FONT_SIZE)
     legend_items = [
         ("Start", TIER_STYLES["start"]["bg"]),
@@ -420,7 +448,6 @@ def render(definition, output_path, dpi=150):
         lx += LEGEND_SWATCH_SIZE + LEGEND_LABEL_GAP + lw + LEGEND_ITEM_GAP
 
     # Draw title
-    title = definition.get("title", "")
     if title:
         title_font = load_font(FONT_REGULAR, TITLE_FONT_SIZE)
         title_y = legend_y + LEGEND_SWATCH_SIZE + TITLE_MARGIN_TOP
@@ -429,8 +456,411 @@ def render(definition, output_path, dpi=150):
             fill=hex_to_rgb(GXY_DARK), font=title_font, anchor="mt",
         )
 
+
+def _measure_draw():
+    return ImageDraw.Draw(Image.new("RGB", (1, 1)))
+
+
+def render_tree(root, title, output_path, dpi=150):
+    canvas_w, canvas_h, y_map = layout(_measure_draw(), root)
+
+    img = Image.new("RGB", (canvas_w, canvas_h), BG_COLOR)
+    draw = ImageDraw.Draw(img)
+    all_nodes = collect_nodes(root)
+    draw_diagram(draw, all_nodes, collect_edges(all_nodes), y_map, canvas_w, title)
+
     img.save(output_path, dpi=(dpi, dpi))
     print(f"Saved {output_path}  ({canvas_w}x{canvas_h} px, {dpi} DPI)")
+    return canvas_w, canvas_h
+
+
+def render(definition, output_path, dpi=150):
+    render_tree(build_tree(definition), definition.get("title", ""), output_path, dpi)
+
+
+# ── Incremental re-render ─────────────────────────────────────────────────
+
+LAYOUT_CACHE_VERSION = 1
+# Arrowhead and line width bleed around an arrow's endpoint bbox
+_ARROW_PAD = ARROWHEAD_HALF_WIDTH + ARROW_WIDTH + 2
+
+
+def layout_cache_path(output_path):
+    return os.path.splitext(output_path)[0] + ".layout.json"
+
+
+def _style_fingerprint():
+    """Anything besides the definition that changes how nodes are measured or drawn."""
+    blob = json.dumps([TIER_STYLES, FONT_BOLD, FONT_REGULAR, FONT_ITALIC, DESC_FONT_SIZE,
+                       NODE_HEIGHT, NODE_H_PAD, NODE_MIN_WIDTH, NODE_MAX_WIDTH,
+                       ROW_SPACING, TOOL_H_GAP, CLUSTER_GAP, LAYOUT_CACHE_VERSION],
+                      sort_keys=True)
+    return hashlib.sha1(blob.encode()).hexdigest()
+
+
+def _own_hash(node):
+    return hashlib.sha1(json.dumps([node.tier, node.label, node.description]).encode()).hexdigest()
+
+
+def subtree_hashes(root):
+    """Map id(node) to a hash of the node's own content and all descendants."""
+    hashes = {}
+    for node in _post_order(root):
+        h = hashlib.sha1(_own_hash(node).encode())
+        for child in node.children:
+            h.update(hashes[id(child)].encode())
+        hashes[id(node)] = h.hexdigest()
+    return hashes
+
+
+def node_paths(root):
+    """Map id(node) to its position in the tree, e.g. "" (root), "2", "2.0"."""
+    paths = {id(root): ""}
+    for node in collect_nodes(root):
+        prefix = paths[id(node)]
+        for i, child in enumerate(node.children):
+            paths[id(child)] = f"{prefix}.{i}" if prefix else str(i)
+    return paths
+
+
+def _node_rect(node, draw, desc_font):
+    x0, y0, x1, y1 = node.bbox()
+    if node.description:
+        ex0, ex1 = _node_extent(node, desc_font, draw)
+        x0, x1 = min(x0, ex0), max(x1, ex1)
+        y1 += DESC_OFFSET_Y + DESC_FONT_SIZE * 2
+    return [x0 - 2, y0 - 2, x1 + 2, y1 + 2]
+
+
+def _arrow_rect(px, py, cx, cy):
+    """Bbox of the arrow from a parent's bottom centre to a child's top centre."""
+    y0, y1 = py + NODE_HEIGHT / 2, cy - NODE_HEIGHT / 2
+    return [min(px, cx) - _ARROW_PAD, min(y0, y1) - _ARROW_PAD,
+            max(px, cx) + _ARROW_PAD, max(y0, y1) + _ARROW_PAD]
+
+
+def _file_hash(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _load_layout_cache(cache_path, output_path):
+    if not (os.path.isfile(cache_path) and os.path.isfile(output_path)):
+        return None
+    try:
+        with open(cache_path) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cache.get("style") != _style_fingerprint():
+        return None
+    # The PNG may have been rewritten since (e.g. by a run without
+    # --incremental); its pixels can then only be reused if they are the
+    # ones this cache describes.
+    cache["png_matches"] = cache.get("png") == _file_hash(output_path)
+    return cache
+
+
+def render_incremental(definition, output_path, dpi=150):
+    """Render, reusing the layout and image from the previous run where possible.
+
+    The layout is persisted next to the output as ``<stem>.layout.json`` with
+    one record per node (by tree path) carrying its subtree hash, own-content
+    hash, position, width and drawn extent, plus a hash of the PNG written.
+    On the next run, nodes from unchanged subtrees (or with unchanged text)
+    reuse their width instead of being re-measured. If the canvas size and
+    title are also unchanged and the PNG is still the one last written here,
+    only the rectangles touched by changed nodes and their arrows are
+    repainted onto it; unchanged subtrees in place are skipped as a whole.
+    """
+    cache_path = layout_cache_path(output_path)
+    cache = _load_layout_cache(cache_path, output_path)
+    old_nodes = cache["nodes"] if cache else {}
+    # Width depends only on a node's own tier and label, so any node whose
+    # own hash was seen before (in particular every node of an unchanged
+    # subtree) keeps its measured width.
+    old_widths = {rec["own"]: rec["w"] for rec in old_nodes.values()}
+
+    draw = _measure_draw()
+    root = build_tree(definition)
+    hashes = subtree_hashes(root)
+    paths = node_paths(root)
+    known = {}
+    for node in collect_nodes(root):
+        w = old_widths.get(_own_hash(node))
+        if w is not None:
+            known[id(node)] = w
+    canvas_w, canvas_h, y_map = layout(draw, root, known)
+
+    title = definition.get("title", "")
+    all_nodes = collect_nodes(root)
+    edges = collect_edges(all_nodes)
+    desc_font = load_font(FONT_ITALIC, DESC_FONT_SIZE)
+    records = {}
+    for node in all_nodes:
+        records[paths[id(node)]] = {
+            "hash": hashes[id(node)],
+            "own": _own_hash(node),
+            "x": node.x, "y": node.y, "w": node.w,
+            "rect": _node_rect(node, draw, desc_font),
+        }
+
+    reuse_image = (cache is not None
+                   and cache["png_matches"]
+                   and cache.get("canvas") == [canvas_w, canvas_h]
+                   and cache.get("title") == title)
+    dirty = _dirty_rects(old_nodes, records) if reuse_image else None
+
+    if dirty is None or _area(dirty) > canvas_w * canvas_h / 2:
+        img = Image.new("RGB", (canvas_w, canvas_h), BG_COLOR)
+        draw_diagram(ImageDraw.Draw(img), all_nodes, edges, y_map, canvas_w, title)
+        summary = f"full render, {len(known)}/{len(all_nodes)} widths reused"
+    else:
+        img = Image.open(output_path).convert("RGB")
+        _repaint(img, dirty, all_nodes, edges, records, paths)
+        summary = f"{len(dirty)} region(s) redrawn"
+
+    img.save(output_path, dpi=(dpi, dpi))
+    with open(cache_path, "w") as f:
+        json.dump({"version": LAYOUT_CACHE_VERSION, "style": _style_fingerprint(),
+                   "canvas": [canvas_w, canvas_h], "title": title, "png": _file_hash(output_path),
+                   "nodes": records}, f)
+    print(f"Saved {output_path}  ({canvas_w}x{canvas_h} px, {dpi} DPI; {summary})")
+
+
+def _dirty_rects(old_nodes, new_nodes):
+    """Canvas rectangles whose pixels differ between two layouts.
+
+    The tree is walked from the root. A subtree whose hash and root position
+    are unchanged is laid out and drawn identically (positions below a node
+    depend only on its subtree, and the tool row on the canvas height, which
+    the caller has checked), so it is skipped without visiting its nodes.
+    Otherwise a node is dirty when it appeared, disappeared, moved, resized
+    or its own content changed. Its old and new extents are dirty, and so
+    are the arrows into and out of it, in both layouts.
+    """
+    def own_state(rec):
+        return rec["own"], rec["x"], rec["y"], rec["w"], rec["rect"]
+
+    def children(nodes, path):
+        prefix = f"{path}." if path else ""
+        i = 0
+        while f"{prefix}{i}" in nodes:
+            yield f"{prefix}{i}"
+            i += 1
+
+    def arrows(nodes, path):
+        rec = nodes[path]
+        out = []
+        if path:
+            parent = nodes.get(path.rpartition(".")[0])
+            if parent is not None:
+                out.append(_arrow_rect(parent["x"], parent["y"], rec["x"], rec["y"]))
+        for child_path in children(nodes, path):
+            child = nodes[child_path]
+            out.append(_arrow_rect(rec["x"], rec["y"], child["x"], child["y"]))
+        return out
+
+    rects = []
+    stack = [""]
+    while stack:
+        path = stack.pop()
+        old, new = old_nodes.get(path), new_nodes.get(path)
+        if old and new and (old["hash"], old["x"], old["y"]) == (new["hash"], new["x"], new["y"]):
+            continue
+        if not (old and new and own_state(old) == own_state(new)):
+            for nodes in (old_nodes, new_nodes):
+                if path in nodes:
+                    rects.append(nodes[path]["rect"])
+                    rects.extend(arrows(nodes, path))
+        stack.extend(dict.fromkeys([*children(old_nodes, path), *children(new_nodes, path)]))
+    return rects
+
+
+def _area(rects):
+    return sum((r[2] - r[0]) * (r[3] - r[1]) for r in rects)
+
+
+def _intersects(a, b):
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+def _repaint(img, rects, nodes, edges, records, paths):
+    """Redraw everything intersecting `rects` and paste those regions into `img`.
+
+    Items are drawn untranslated on a scratch canvas so every pixel matches
+    a full render; only nodes and arrows touching a dirty rectangle are drawn.
+    """
+    boxes = []
+    for rect in rects:
+        x0, y0 = max(0, math.floor(rect[0])), max(0, math.floor(rect[1]))
+        x1, y1 = min(img.width, math.ceil(rect[2])), min(img.height, math.ceil(rect[3]))
+        if x1 > x0 and y1 > y0:
+            boxes.append((x0, y0, x1, y1))
+
+    def touched(rect):
+        return any(_intersects(rect, box) for box in boxes)
+
+    scratch = Image.new("RGB", img.size, BG_COLOR)
+    draw_tree(ImageDraw.Draw(scratch),
+              [n for n in nodes if touched(records[paths[id(n)]]["rect"])],
+              [(p, c) for p, c in edges if touched(_arrow_rect(p.x, p.y, c.x, c.y))])
+    for box in boxes:
+        img.paste(scratch.crop(box), box[:2])
+
+
+# ── Tiling ────────────────────────────────────────────────────────────────
+
+def _tile_path(output_path, suffix):
+    stem, ext = os.path.splitext(output_path)
+    return f"{stem}_{suffix}{ext or '.png'}"
+
+
+def _node_extent(node, desc_font, draw):
+    x0, _, x1, _ = node.bbox()
+    if node.description:
+        half = text_width(draw, node.description, desc_font) / 2
+        x0, x1 = min(x0, node.x - half), max(x1, node.x + half)
+    return x0, x1
+
+
+def _slice_tree(root, title, dpi, tile_width, tile_path):
+    """Lay out `root` once and draw it as columns at most `tile_width` px wide.
+
+    Nodes and arrows are bucketed by the columns their x-extent touches, so
+    each column only allocates and draws its own bounded canvas.
+    `tile_path(t, n_tiles)` names column `t` (0-based).  Returns
+    ``(tile_paths, columns)``, where ``columns`` maps id() of each child of
+    `root` to the sorted 0-based columns its subtree appears in.
+    """
+    draw = _measure_draw()
+    canvas_w, canvas_h, y_map = layout(draw, root)
+    n_tiles = max(1, math.ceil(canvas_w / tile_width))
+    desc_font = load_font(FONT_ITALIC, DESC_FONT_SIZE)
+
+    def tiles_for(x0, x1):
+        first = max(0, int(x0 // tile_width))
+        last = min(n_tiles - 1, int(x1 // tile_width))
+        return range(first, last + 1)
+
+    tile_nodes = [[] for _ in range(n_tiles)]
+    tile_edges = [[] for _ in range(n_tiles)]
+    for node in collect_nodes(root):
+        for t in tiles_for(*_node_extent(node, desc_font, draw)):
+            tile_nodes[t].append(node)
+        for child in node.children:
+            x0 = min(node.x, child.x) - ARROWHEAD_HALF_WIDTH
+            x1 = max(node.x, child.x) + ARROWHEAD_HALF_WIDTH
+            for t in tiles_for(x0, x1):
+                tile_edges[t].append((node, child))
+
+    columns = {}
+    for top in root.children:
+        seen = columns[id(top)] = set()
+        stack = [top]
+        while stack:
+            node = stack.pop()
+            seen.update(tiles_for(*_node_extent(node, desc_font, draw)))
+            stack.extend(node.children)
+
+    paths = []
+    for t in range(n_tiles):
+        x_offset = t * tile_width
+        width = int(min(tile_width, canvas_w - x_offset))
+        img = Image.new("RGB", (width, canvas_h), BG_COLOR)
+        tile_draw = ImageDraw.Draw(img)
+        caption = f"{title} ({t + 1}/{n_tiles})" if n_tiles > 1 else title
+        draw_diagram(tile_draw, tile_nodes[t], tile_edges[t], y_map, width, caption, x_offset=x_offset)
+        path = tile_path(t, n_tiles)
+        img.save(path, dpi=(dpi, dpi))
+        print(f"Saved {path}  ({width}x{canvas_h} px, {dpi} DPI)")
+        paths.append(path)
+        del img, tile_draw
+    return paths, {key: sorted(seen) for key, seen in columns.items()}
+
+
+def _render_goal_tiles(definition, output_path, dpi, tile_width):
+    """One independently laid-out image per goal subtree.
+
+    A goal wider than `tile_width` is itself sliced into several parts.
+    Returns ``(tile_paths, pages_per_goal)``.
+    """
+    title = definition.get("title", "")
+    goal_defs = definition.get("goals", []) + definition.get("children", [])
+    paths = []
+    pages = []
+    for i, goal_def in enumerate(goal_defs, start=1):
+        sub = {"start_question": definition["start_question"], "children": [goal_def]}
+        label = goal_def.get("label") or goal_def.get("name")
+        first = len(paths)
+        goal_paths, _ = _slice_tree(
+            build_tree(sub), f"{title} ({i}/{len(goal_defs)}: {label})", dpi, tile_width,
+            lambda t, n: _tile_path(output_path, f"part{first + t + 1:02d}"))
+        paths.extend(goal_paths)
+        pages.append(list(range(first + 1, len(paths) + 1)))
+    return paths, pages
+
+
+def _render_viewport_tiles(definition, output_path, dpi, tile_width):
+    """Slice one full layout into fixed-width viewports.
+
+    Returns ``(tile_paths, pages_per_goal)``.
+    """
+    root = build_tree(definition)
+    paths, columns = _slice_tree(root, definition.get("title", ""), dpi, tile_width,
+                                 lambda t, n: _tile_path(output_path, f"part{t + 1:02d}"))
+    return paths, [[t + 1 for t in columns[id(goal)]] for goal in root.children]
+
+
+def _pages_label(pages):
+    if not pages:
+        return ""
+    if len(pages) == 1:
+        return f"Part {pages[0]}"
+    return f"Parts {pages[0]}-{pages[-1]}"
+
+
+def render_tiled(definition, output_path, dpi=150, mode="goal", tile_width=4000):
+    """Render the diagram as bounded-size tiles plus an overview and index.
+
+    mode="goal" renders each goal subtree as its own image, slicing goals
+    wider than `tile_width`; mode="viewport" lays out the whole tree once and
+    slices it into `tile_width` px columns.  The overview shows the start
+    question and goals, each annotated with the part(s) it appears in, and is
+    sliced the same way when there are too many goals for one tile.  A
+    Markdown index links overview and tiles.
+    """
+    if mode == "goal":
+        paths, pages = _render_goal_tiles(definition, output_path, dpi, tile_width)
+    elif mode == "viewport":
+        paths, pages = _render_viewport_tiles(definition, output_path, dpi, tile_width)
+    else:
+        raise ValueError(f"Unknown tiling mode: {mode}")
+
+    title = definition.get("title", "")
+    overview = build_tree(definition)
+    for goal, goal_pages in zip(overview.children, pages):
+        goal.children = []
+        goal.description = _pages_label(goal_pages)
+    overview_paths, _ = _slice_tree(
+        overview, f"{title} (overview)" if title else "Overview", dpi, tile_width,
+        lambda t, n: _tile_path(output_path, "overview" if n == 1 else f"overview{t + 1:02d}"))
+
+    index_path = os.path.splitext(output_path)[0] + "_index.md"
+    base = os.path.dirname(index_path)
+    lines = [f"# {title or 'Tool selection diagram'}", ""]
+    for path in overview_paths:
+        lines += [f"![Overview]({os.path.relpath(path, base)})", ""]
+    for i, path in enumerate(paths, start=1):
+        goals = [g.label for g, p in zip(overview.children, pages) if i in p]
+        lines.append(f"- [Part {i}]({os.path.relpath(path, base)}): {', '.join(goals)}")
+    with open(index_path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+    print(f"Saved {index_path}  ({len(paths)} parts)")
+    return paths
 
 
 # ── CLI ───────────────────────────────────────────────────────────────────
@@ -442,12 +872,23 @@ def main():
     parser.add_argument("--input", required=True, help="JSON definition file")
     parser.add_argument("--output", required=True, help="Output PNG path")
     parser.add_argument("--dpi", type=int, default=150, help="Output DPI (default: 150)")
+    parser.add_argument("--tiles", choices=["goal", "viewport"],
+                        help="Split into per-goal or fixed-width tiles with an overview and index")
+    parser.add_argument("--tile-width", type=int, default=4000,
+                        help="Maximum tile width in px for --tiles (default: 4000)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Cache the layout next to the output and redraw only changed subtrees")
     args = parser.parse_args()
 
     with open(args.input) as f:
         definition = json.load(f)
 
-    render(definition, args.output, args.dpi)
+    if args.tiles:
+        render_tiled(definition, args.output, args.dpi, mode=args.tiles, tile_width=args.tile_width)
+    elif args.incremental:
+        render_incremental(definition, args.output, args.dpi)
+    else:
+        render(definition, args.output, args.dpi)
 
 
 if __name__ == "__main__":
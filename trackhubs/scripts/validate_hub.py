@@ -0,0 +1,628 @@
+#!/usr/bin/env python3
+"""
+Validate a local UCSC track hub / assembly hub bundle before publishing.
+
+Streams hub.txt, genomes.txt and every trackDb.txt (following `include`
+lines) into an index of genomes, tracks, parents and referenced files, then
+checks the rules from this skill in one pass:
+
+- hub.txt / genomes.txt required fields, one blank line between genome records
+- defaultPos is a real `contig:start-end` on a contig of the assembly's .2bit
+- unique track names, known track types (`chain` -> `bigChain`, `maf` -> `bigMaf`, ...)
+- parents exist, are composite/superTrack/view containers and come first
+- one `type` per composite, bigWig-only multiWig containers
+- every data track has bigDataUrl; bigChain has linkDataUrl
+- companions: vcfTabix .tbi (not .csi), bam .bai, cram .crai, bigMaf .bb.bai
+- referenced files exist, are non-empty and start with the right magic bytes
+  (bigBed / bigWig / 2bit / gzip)
+
+File checks (stat + first bytes) run in a thread pool, so hubs with
+thousands of tracks are checked in seconds. Remote URLs (http://, https://,
+...) are listed but not fetched; use hubCheck for the published hub.
+
+Usage:
+    python validate_hub.py path/to/hub/hub.txt
+    python validate_hub.py path/to/hub/              # looks for hub.txt
+    python validate_hub.py hub.txt --strict          # warnings also fail (exit 1)
+    python validate_hub.py hub.txt --json index.json # tracks, files and findings
+
+Exit codes:
+    0  no errors (warnings allowed unless --strict)
+    1  errors found, or warnings with --strict
+"""
+
+import argparse
+import json
+import os
+import re
+import struct
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# ── rules ──
+
+HUB_REQUIRED = ["hub", "shortLabel", "longLabel", "genomesFile", "email"]
+ASSEMBLY_REQUIRED = ["groups", "description", "organism", "defaultPos", "scientificName"]
+
+BIGBED_TYPES = {"bigBed", "bigChain", "bigMaf", "bigGenePred", "bigNarrowPeak", "bigPsl", "bigBarChart",
+                "bigInteract", "bigLolly", "bigDbSnp", "bigRmsk", "bigMethyl"}
+TRACK_TYPES = BIGBED_TYPES | {"bigWig", "bam", "cram", "vcfTabix", "vcfPhasedTrio", "hic", "halSnake"}
+
+# Types that are valid elsewhere in UCSC (or invented) but not in hubs
+TYPE_SUGGESTIONS = {"chain": "bigChain", "maf": "bigMaf", "bed": "bigBed", "bedGraph": "bigWig",
+                    "wig": "bigWig", "genePred": "bigGenePred", "psl": "bigPsl",
+                    "narrowPeak": "bigNarrowPeak", "vcf": "vcfTabix", "bigwig": "bigWig",
+                    "bigbed": "bigBed"}
+
+# Index file next to bigDataUrl (unless bigDataIndex is given): (suffix, level)
+COMPANIONS = {"vcfTabix": (".tbi", "error"), "vcfPhasedTrio": (".tbi", "error"), "bam": (".bai", "error"),
+              "cram": (".crai", "error"), "bigMaf": (".bai", "warning")}
+
+# First four bytes, either byte order
+MAGIC = {
+    "bigBed": {bytes.fromhex("ebf28987"), bytes.fromhex("8789f2eb")},
+    "bigWig": {bytes.fromhex("26fc8f88"), bytes.fromhex("888ffc26")},
+    "2bit": {bytes.fromhex("4327411a"), bytes.fromhex("1a412743")},
+}
+GZIP_MAGIC = b"\x1f\x8b"
+
+DEFAULT_POS_RE = re.compile(r"^(\S+):(\d+)-(\d+)$")
+URL_RE = re.compile(r"^[a-zA-Z][a-zA-Z0-9+.-]*://")
+
+
+# ── parsing ──
+
+
+def iter_stanzas(path: str, start_key: Optional[str] = None,
+                 seen: Optional[set] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Stream `key value` stanzas from a UCSC .ra-style file
+
+    Stanzas are separated by blank lines; indentation and `#` comments are
+    ignored and a trailing backslash continues a line. `include other.txt`
+    lines are followed (relative to the including file) wherever they are;
+    one directly after a stanza's fields ends that stanza and is reported
+    with an {"include_inline": True} record, since UCSC would read it as a
+    field of the stanza.
+
+    Args:
+        path: File to read
+        start_key: Key that starts a new stanza even without a blank line
+            (e.g. "track"); the stanza gets "merged": True
+        seen: Included files already read (guards against include loops)
+
+    Yields:
+        {"fields": {key: value}, "lines": {key: line_no}, "file": path, "line": first line_no}
+    """
+    seen = seen if seen is not None else set()
+    seen.add(os.path.abspath(path))
+    stanza: Optional[Dict[str, Any]] = None
+    pending = ""
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line_no, raw in enumerate(f, 1):
+            line = pending + raw.strip()
+            if line.endswith("\\"):
+                pending = line[:-1] + " "
+                continue
+            pending = ""
+            if not line or line.startswith("#"):
+                if not line and stanza:
+                    yield stanza
+                    stanza = None
+                continue
+            key, _, value = line.partition(" ")
+            value = value.strip()
+            if key == "include":
+                if stanza:
+                    yield stanza
+                    stanza = None
+                    yield {"fields": {}, "lines": {}, "file": path, "line": line_no, "include_inline": True}
+                included = os.path.join(os.path.dirname(path), value.split()[0])
+                if os.path.abspath(included) not in seen and os.path.exists(included):
+                    yield from iter_stanzas(included, start_key, seen)
+                else:
+                    yield {"fields": {}, "lines": {}, "file": path, "line": line_no, "include_error": included}
+                continue
+            if stanza and key == start_key:
+                yield stanza
+                stanza = {"fields": {}, "lines": {}, "file": path, "line": line_no, "merged": True}
+            if stanza is None:
+                stanza = {"fields": {}, "lines": {}, "file": path, "line": line_no}
+            stanza["fields"][key] = value
+            stanza["lines"][key] = line_no
+    if stanza:
+        yield stanza
+
+
+def read_2bit_index(path: str, contig: Optional[str] = None) -> Dict[str, Optional[int]]:
+    """
+    Contig names of a .2bit file, reading only its index
+
+    Args:
+        path: .2bit file
+        contig: Also read this contig's length (one seek) if present
+
+    Returns:
+        {name: None} for every contig, with the length filled in for `contig`
+    """
+    with open(path, "rb") as f:
+        header = f.read(16)
+        order = "<" if header[:4] == bytes.fromhex("4327411a") else ">"
+        _, version, count, _ = struct.unpack(order + "IIII", header)
+        offset_format = order + ("Q" if version == 1 else "I")
+        offset_size = struct.calcsize(offset_format)
+        contigs: Dict[str, Optional[int]] = {}
+        wanted_offset = None
+        for _ in range(count):
+            name = f.read(f.read(1)[0]).decode()
+            offset = struct.unpack(offset_format, f.read(offset_size))[0]
+            contigs[name] = None
+            if name == contig:
+                wanted_offset = offset
+        if wanted_offset is not None:
+            f.seek(wanted_offset)
+            contigs[contig] = struct.unpack(order + "I", f.read(4))[0]
+    return contigs
+
+
+def probe(path: str) -> Dict[str, Any]:
+    """Existence, size and first bytes of a local file"""
+    try:
+        with open(path, "rb") as f:
+            head = f.read(4)
+            size = os.fstat(f.fileno()).st_size
+    except FileNotFoundError:
+        return {"exists": False}
+    except OSError as e:
+        return {"exists": True, "size": None, "head": b"", "error": str(e)}
+    return {"exists": True, "size": size, "head": head}
+
+
+# ── model ──
+
+
+class HubValidator:
+    """Index a hub bundle and check it against the trackhubs skill rules"""
+
+    def __init__(self, hub_txt: str, workers: int = 32):
+        """
+        Args:
+            hub_txt: Path to hub.txt
+            workers: Threads for file stat/magic checks
+        """
+        self.hub_txt = hub_txt
+        self.workers = workers
+        self.hub: Dict[str, str] = {}
+        self.genomes: List[Dict[str, Any]] = []
+        self.findings: List[Dict[str, Any]] = []
+        # path -> list of references {"genome", "track", "field", "expect", "file", "line"}
+        self.refs: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self.probes: Dict[str, Dict[str, Any]] = {}
+        self.remote: List[str] = []
+        self.contigs: Dict[str, Optional[Dict[str, Optional[int]]]] = {}
+
+    def report(self, level: str, message: str, file: Optional[str] = None, line: Optional[int] = None,
+               genome: Optional[str] = None, track: Optional[str] = None):
+        self.findings.append({"level": level, "message": message, "file": file, "line": line,
+                              "genome": genome, "track": track})
+
+    def _ref(self, base_dir: str, value: str, **ref: Any) -> Optional[str]:
+        """Register a file reference, returning its local path (None for URLs)"""
+        if URL_RE.match(value):
+            self.remote.append(value)
+            return None
+        path = os.path.normpath(os.path.join(base_dir, value))
+        self.refs[path].append(ref)
+        return path
+
+    # ── hub.txt / genomes.txt ──
+
+    def load(self):
+        stanzas = iter_stanzas(self.hub_txt, start_key="track")
+        first = next(stanzas, None)
+        self.hub = first["fields"] if first else {}
+        one_file = self.hub.get("useOneFile", "").startswith("on")
+        required = [f for f in HUB_REQUIRED if not (one_file and f == "genomesFile")]
+        for field in required:
+            if not self.hub.get(field):
+                self.report("error", f"hub.txt: required field '{field}' missing or empty", self.hub_txt)
+
+        if one_file:
+            # hub.txt holds the genome stanza followed by its tracks
+            rest = list(stanzas)
+            genome = next((s for s in rest if "genome" in s["fields"]), None)
+            if genome is None:
+                self.report("error", "useOneFile hub has no genome stanza", self.hub_txt)
+                return
+            tracks = [s for s in rest if s is not genome]
+            self._load_genome(genome, os.path.dirname(self.hub_txt), tracks=tracks)
+            return
+
+        genomes_file = self.hub.get("genomesFile")
+        if not genomes_file:
+            return
+        genomes_path = os.path.join(os.path.dirname(self.hub_txt), genomes_file)
+        if not os.path.exists(genomes_path):
+            self.report("error", f"Can't find genomesFile {genomes_file}", self.hub_txt)
+            return
+        names: Dict[str, Tuple[str, int]] = {}
+        for stanza in iter_stanzas(genomes_path, start_key="genome"):
+            if self._directive(stanza):
+                continue
+            name = stanza["fields"].get("genome")
+            if stanza.get("merged"):
+                self.report("error", "missing blank line before this genome record", stanza["file"],
+                            stanza["line"], genome=name)
+            if name in names:
+                self.report("error", f"duplicate genome '{name}' (first at line {names[name][1]})",
+                            stanza["file"], stanza["line"], genome=name)
+            names.setdefault(name, (stanza["file"], stanza["line"]))
+            self._load_genome(stanza, os.path.dirname(genomes_path))
+
+    def _load_genome(self, stanza: Dict[str, Any], base_dir: str, tracks: Optional[List[Dict]] = None):
+        fields = stanza["fields"]
+        name = fields.get("genome") or "?"
+        where = {"file": stanza["file"], "genome": name}
+        genome = {"name": name, "fields": fields, "lines": stanza["lines"], "file": stanza["file"],
+                  "line": stanza["line"],
+                  "twobit": None, "tracks": {}, "order": []}
+        self.genomes.append(genome)
+
+        required = ["genome"] + (["trackDb"] if tracks is None else [])
+        if "twoBitPath" in fields:
+            required += ASSEMBLY_REQUIRED
+        for field in required:
+            if not fields.get(field):
+                self.report("error", f"required field '{field}' missing or empty", line=stanza["line"], **where)
+
+        if "twoBitPath" in fields:
+            if not fields.get("htmlPath"):
+                self.report("warning", "assembly hub has no htmlPath (blank assembly description)",
+                            line=stanza["line"], **where)
+            if " " in fields.get("organism", ""):
+                self.report("warning", "organism contains spaces; use underscores",
+                            line=stanza["lines"]["organism"], **where)
+        default_pos = fields.get("defaultPos")
+        if default_pos:
+            match = DEFAULT_POS_RE.match(default_pos)
+            if not match:
+                self.report("error", f"defaultPos '{default_pos}' is not contig:start-end",
+                            line=stanza["lines"]["defaultPos"], **where)
+            elif int(match.group(2)) >= int(match.group(3)):
+                self.report("error", f"defaultPos '{default_pos}' has start >= end",
+                            line=stanza["lines"]["defaultPos"], **where)
+
+        for field, expect, level in (("twoBitPath", "2bit", "error"), ("groups", None, "error"),
+                                     ("htmlPath", None, "warning")):
+            if fields.get(field):
+                path = self._ref(base_dir, fields[field], genome=name, track=None, field=field, expect=expect,
+                                 level=level, file=stanza["file"], line=stanza["lines"][field])
+                if field == "twoBitPath":
+                    genome["twobit"] = path
+
+        if tracks is None:
+            if not fields.get("trackDb"):
+                return
+            trackdb = os.path.join(base_dir, fields["trackDb"])
+            if not os.path.exists(trackdb):
+                self.report("error", f"trackDb {fields['trackDb']} not found", line=stanza["lines"]["trackDb"],
+                            **where)
+                return
+            tracks = iter_stanzas(trackdb, start_key="track")
+            base_dir = os.path.dirname(trackdb)
+        self._load_tracks(genome, tracks, base_dir)
+
+    def _directive(self, stanza: Dict[str, Any], genome: Optional[str] = None) -> bool:
+        """Report an include record from iter_stanzas; False for an ordinary stanza"""
+        if "include_error" in stanza:
+            self.report("error", f"include {stanza['include_error']} not found (or included twice)",
+                        stanza["file"], stanza["line"], genome)
+        elif stanza.get("include_inline"):
+            self.report("error", "missing blank line before include (UCSC reads it as a field of the "
+                                 "previous stanza and never loads the file)", stanza["file"], stanza["line"], genome)
+        else:
+            return False
+        return True
+
+    # ── trackDb ──
+
+    def _load_tracks(self, genome: Dict[str, Any], stanzas, base_dir: str):
+        tracks = genome["tracks"]
+        for stanza in stanzas:
+            if self._directive(stanza, genome["name"]):
+                continue
+            fields = stanza["fields"]
+            name = fields.get("track")
+            if not name:
+                self.report("error", "stanza without a 'track' line", stanza["file"], stanza["line"],
+                            genome["name"])
+                continue
+            if stanza.get("merged"):
+                self.report("warning", "missing blank line before this track stanza", stanza["file"],
+                            stanza["line"], genome["name"], name)
+            if name in tracks:
+                first = tracks[name]
+                self.report("error", f"duplicate track name (first at {first['file']}:{first['line']})",
+                            stanza["file"], stanza["line"], genome["name"], name)
+                continue
+            parent = fields.get("parent", "").split()
+            track = {"name": name, "fields": fields, "lines": stanza["lines"], "file": stanza["file"],
+                     "line": stanza["line"], "index": len(genome["order"]),
+                     "parent": parent[0] if parent else None, "type": fields.get("type", "").split(),
+                     "container": self._container(fields), "files": {}}
+            tracks[name] = track
+            genome["order"].append(name)
+            for field, expect in (("bigDataUrl", self._expected_format(track)),
+                                  ("linkDataUrl", "bigBed"), ("bigDataIndex", None), ("html", None)):
+                if fields.get(field):
+                    level = "warning" if field == "html" else "error"
+                    track["files"][field] = self._ref(
+                        base_dir, fields[field], genome=genome["name"], track=name, field=field, expect=expect,
+                        level=level, file=stanza["file"], line=stanza["lines"][field])
+            self._companions(genome, track, base_dir)
+
+    @staticmethod
+    def _container(fields: Dict[str, str]) -> Optional[str]:
+        if fields.get("compositeTrack", "").startswith("on"):
+            return "composite"
+        if fields.get("superTrack", "").startswith("on"):
+            return "superTrack"
+        if fields.get("container") == "multiWig" or fields.get("multiWig", "").startswith("on"):
+            return "multiWig"
+        if "view" in fields:
+            return "view"
+        return None
+
+    @staticmethod
+    def _expected_format(track: Dict[str, Any]) -> Optional[str]:
+        kind = track["type"][0] if track["type"] else None
+        if kind in BIGBED_TYPES:
+            return "bigBed"
+        if kind == "bigWig":
+            return "bigWig"
+        if kind in ("vcfTabix", "vcfPhasedTrio", "bam"):
+            return "gzip"
+        return None
+
+    def _companions(self, genome: Dict[str, Any], track: Dict[str, Any], base_dir: str):
+        kind = track["type"][0] if track["type"] else None
+        data = track["files"].get("bigDataUrl")
+        if kind not in COMPANIONS or not data or track["fields"].get("bigDataIndex"):
+            return
+        suffix, level = COMPANIONS[kind]
+        common = {"genome": genome["name"], "track": track["name"], "expect": None, "level": level,
+                  "file": track["file"], "line": track["lines"]["bigDataUrl"]}
+        self.refs[data + suffix].append({"field": f"{kind} index ({suffix})", "companion": True, **common})
+        if suffix == ".tbi":
+            # probed so a .csi-only index gets a specific message
+            self.refs[data + ".csi"].append({"field": "csi", "probe_only": True, **common})
+
+    def check_tracks(self, genome: Dict[str, Any]):
+        tracks = genome["tracks"]
+        children: Dict[str, List[str]] = defaultdict(list)
+        for name in genome["order"]:
+            track = tracks[name]
+            where = {"file": track["file"], "line": track["line"], "genome": genome["name"], "track": name}
+            fields, kind = track["fields"], track["type"][0] if track["type"] else None
+
+            if track["container"] != "superTrack" and track["container"] != "view":
+                if not kind:
+                    self.report("error", "no 'type' line", **where)
+                elif kind not in TRACK_TYPES:
+                    hint = f" (use {TYPE_SUGGESTIONS[kind]})" if kind in TYPE_SUGGESTIONS else ""
+                    self.report("error", f"unknown track type '{kind}'{hint}", **where)
+            for label in ("shortLabel", "longLabel"):
+                if not fields.get(label):
+                    self.report("warning", f"track has no {label}", **where)
+
+            if track["parent"]:
+                parent = tracks.get(track["parent"])
+                if parent is None:
+                    self.report("error", f"parent track '{track['parent']}' not found", **where)
+                elif not parent["container"]:
+                    self.report("error", f"parent '{parent['name']}' is not a composite/superTrack/view", **where)
+                else:
+                    children[parent["name"]].append(name)
+                    if parent["index"] > track["index"]:
+                        self.report("error", f"parent '{parent['name']}' must be declared before its sub-tracks",
+                                    **where)
+
+            if not track["container"]:
+                if not fields.get("bigDataUrl"):
+                    self.report("error", "data track has no bigDataUrl", **where)
+                if kind == "bigChain" and not fields.get("linkDataUrl"):
+                    self.report("error", "bigChain has no linkDataUrl (track loads but draws nothing)", **where)
+            elif track["container"] == "composite" and len(track["type"]) > 1 and kind == "bigChain":
+                self.report("warning", "composite parent should be plain 'type bigChain'; the target assembly "
+                                       "goes on the sub-tracks", **where)
+
+        for name, track in tracks.items():
+            if track["container"] == "composite":
+                self._check_composite(genome, track, children)
+            elif track["container"] == "multiWig":
+                for leaf in self._leaves(name, tracks, children):
+                    if tracks[leaf]["type"][:1] != ["bigWig"]:
+                        self.report("error", f"multiWig '{name}' contains non-bigWig track",
+                                    tracks[leaf]["file"], tracks[leaf]["line"], genome["name"], leaf)
+
+    def _leaves(self, name: str, tracks: Dict[str, Dict], children: Dict[str, List[str]]) -> List[str]:
+        """Data tracks under a container, through views but not into nested superTracks"""
+        leaves = []
+        for child in children.get(name, []):
+            container = tracks[child]["container"]
+            if container == "view":
+                leaves.extend(self._leaves(child, tracks, children))
+            elif not container:
+                leaves.append(child)
+        return leaves
+
+    def _check_composite(self, genome: Dict[str, Any], composite: Dict[str, Any], children):
+        tracks = genome["tracks"]
+        leaves = self._leaves(composite["name"], tracks, children)
+        if not leaves:
+            self.report("warning", "composite has no sub-tracks", composite["file"], composite["line"],
+                        genome["name"], composite["name"])
+            return
+        kind = (composite["type"] or tracks[leaves[0]]["type"] or [None])[0]
+        for leaf in leaves:
+            leaf_kind = (tracks[leaf]["type"] or [None])[0]
+            if leaf_kind != kind:
+                self.report("error", f"type mismatch in compositeTrack '{composite['name']}': "
+                                     f"{leaf_kind} in a {kind} composite (one composite per type)",
+                            tracks[leaf]["file"], tracks[leaf]["line"], genome["name"], leaf)
+
+    # ── files ──
+
+    def probe_files(self):
+        paths = list(self.refs)
+        genomes = [g for g in self.genomes if g["twobit"]]
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            self.probes = dict(zip(paths, pool.map(probe, paths)))
+            self.contigs = dict(zip([g["name"] for g in genomes], pool.map(self._contigs, genomes)))
+
+    @staticmethod
+    def _contigs(genome: Dict[str, Any]) -> Optional[Dict[str, Optional[int]]]:
+        match = DEFAULT_POS_RE.match(genome["fields"].get("defaultPos", ""))
+        try:
+            with open(genome["twobit"], "rb") as f:
+                if f.read(4) not in MAGIC["2bit"]:
+                    return None
+            return read_2bit_index(genome["twobit"], match.group(1) if match else None)
+        except (OSError, struct.error, IndexError, UnicodeDecodeError):
+            return None
+
+    def check_files(self):
+        for path, refs in self.refs.items():
+            result = self.probes[path]
+            for ref in refs:
+                if ref.get("probe_only"):
+                    continue
+                where = {"file": ref["file"], "line": ref["line"], "genome": ref["genome"], "track": ref["track"]}
+                if not result["exists"]:
+                    if ref.get("companion") and path.endswith(".tbi") and self.probes[path[:-4] + ".csi"]["exists"]:
+                        self.report(ref["level"], "vcfTabix file has .csi index, expected .tbi "
+                                                  "(re-index with bcftools index -t or tabix -p vcf)", **where)
+                    elif ref.get("companion"):
+                        self.report(ref["level"], f"missing {ref['field']}: {os.path.basename(path)}", **where)
+                    else:
+                        self.report(ref["level"], f"{ref['field']} {os.path.relpath(path)} not found", **where)
+                elif result.get("error"):
+                    self.report(ref["level"], f"{ref['field']} {os.path.relpath(path)}: {result['error']}",
+                                **where)
+                elif result["size"] == 0:
+                    self.report(ref["level"], f"{ref['field']} {os.path.relpath(path)} is empty", **where)
+                elif ref["expect"] and not self._magic_ok(result["head"], ref["expect"]):
+                    self.report("error", f"{ref['field']} {os.path.relpath(path)} is not a {ref['expect']} file "
+                                         f"(header bytes {result['head'].hex()})", **where)
+
+    @staticmethod
+    def _magic_ok(head: bytes, expect: str) -> bool:
+        if expect == "gzip":
+            return head.startswith(GZIP_MAGIC)
+        return head in MAGIC[expect]
+
+    def check_default_pos(self):
+        for genome in self.genomes:
+            match = DEFAULT_POS_RE.match(genome["fields"].get("defaultPos", ""))
+            contigs = self.contigs.get(genome["name"])
+            if not match or contigs is None:
+                continue
+            contig, end = match.group(1), int(match.group(3))
+            line = genome["lines"]["defaultPos"]
+            if contig not in contigs:
+                self.report("error", f"defaultPos contig '{contig}' is not in the .2bit "
+                                     f"({len(contigs)} contigs, e.g. {', '.join(list(contigs)[:3])})",
+                            genome["file"], line, genome["name"])
+            elif contigs[contig] is not None and end > contigs[contig]:
+                self.report("error", f"defaultPos end {end} is past the end of {contig} ({contigs[contig]} bp)",
+                            genome["file"], line, genome["name"])
+
+    # ── public ──
+
+    def run(self) -> List[Dict[str, Any]]:
+        self.load()
+        for genome in self.genomes:
+            self.check_tracks(genome)
+        self.probe_files()
+        self.check_files()
+        self.check_default_pos()
+        self.findings.sort(key=lambda f: (f["genome"] or "", f["file"] or "", f["line"] or 0))
+        return self.findings
+
+    def index(self) -> Dict[str, Any]:
+        """Hub model (genomes, tracks, parents, files) plus findings, for --json"""
+        genomes = []
+        for genome in self.genomes:
+            tracks = []
+            for name in genome["order"]:
+                track = genome["tracks"][name]
+                tracks.append({"name": name, "parent": track["parent"], "type": " ".join(track["type"]),
+                               "container": track["container"], "file": track["file"], "line": track["line"],
+                               "files": track["files"]})
+            genomes.append({"genome": genome["name"], "file": genome["file"], "fields": genome["fields"],
+                            "tracks": tracks})
+        return {"hub": self.hub, "genomes": genomes, "remote": sorted(set(self.remote)),
+                "findings": self.findings}
+
+
+# ── CLI ──
+
+
+def print_report(validator: HubValidator, elapsed: float):
+    hub = validator.hub.get("hub", "?")
+    print(f"Hub: {hub} ({validator.hub_txt})")
+    for genome in validator.genomes:
+        print(f"  {genome['name']}: {len(genome['tracks'])} tracks")
+    local = sum(1 for refs in validator.refs.values() if not all(r.get("probe_only") for r in refs))
+    print(f"  {local} local files checked, {len(set(validator.remote))} remote URLs not checked")
+    print()
+    for finding in validator.findings:
+        icon = "❌" if finding["level"] == "error" else "⚠️ "
+        location = os.path.relpath(finding["file"]) if finding["file"] else ""
+        if finding["line"]:
+            location += f":{finding['line']}"
+        track = f" [{finding['track']}]" if finding["track"] else ""
+        print(f"{icon} {location}{track} {finding['message']}")
+    errors = sum(1 for f in validator.findings if f["level"] == "error")
+    warnings = len(validator.findings) - errors
+    if not validator.findings:
+        print("✅ No problems found")
+    print(f"\n{errors} error(s), {warnings} warning(s) in {elapsed:.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Validate a local UCSC track hub bundle",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__,
+    )
+    parser.add_argument("hub", help="hub.txt, or the directory containing it")
+    parser.add_argument("--strict", action="store_true", help="Exit 1 on warnings too")
+    parser.add_argument("--json", help="Write the hub index and findings as JSON")
+    parser.add_argument("--workers", type=int, default=32, help="Threads for file checks (default: 32)")
+    args = parser.parse_args()
+
+    hub_txt = os.path.join(args.hub, "hub.txt") if os.path.isdir(args.hub) else args.hub
+    if not os.path.isfile(hub_txt):
+        print(f"Error: {hub_txt} not found", file=sys.stderr)
+        sys.exit(1)
+
+    start = time.time()
+    validator = HubValidator(hub_txt, workers=args.workers)
+    findings = validator.run()
+    print_report(validator, time.time() - start)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(validator.index(), f, indent=2)
+        print(f"\nIndex written to {args.json}")
+
+    failing = [f for f in findings if f["level"] == "error" or args.strict]
+    sys.exit(1 if failing else 0)
+
+
+if __name__ == "__main__":
+    main()
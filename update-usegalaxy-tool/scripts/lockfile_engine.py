@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+Batch lockfile engine for the usegalaxy-tools repository.
+
+Parses every section `.yml` / `.yml.lock` pair in `usegalaxy.org/` and
+`test.galaxyproject.org/` once, indexes which sections each (name, owner)
+appears in, applies a whole batch of revision additions and section moves in
+memory, and writes back only the files that changed. Output follows the
+format in references/file-formats.md (sorted revisions, repeated
+tool_panel_section_label, install_* flags), so fix_lockfile.py has nothing
+left to normalize for the touched sections.
+
+Batch file (YAML or JSON), one entry per tool:
+
+    - name: diamond
+      owner: bgruening
+      revision: 5f4a1b2c3d4e
+      sections: [metagenomic_analysis, Proteomics]   # ids or labels
+    - name: fastp
+      owner: iuc
+      revision: 0a1b2c3d4e5f
+      sections: [ngs_mapping]
+      keep_other_sections: true                      # add only, no move
+
+A tool present in a section not listed in `sections` is removed from it
+(Step 4 of SKILL.md) unless `keep_other_sections` is true. Sections that do
+not exist yet are created; a plain string is used as the label and the
+file name is derived from it.
+
+Usage:
+    # Show the plan (no files written)
+    python lockfile_engine.py --repo path/to/usegalaxy-tools --batch updates.yml
+
+    # Apply it
+    python lockfile_engine.py --repo path/to/usegalaxy-tools --batch updates.yml --apply
+
+    # Where is a tool installed?
+    python lockfile_engine.py --repo path/to/usegalaxy-tools --find diamond bgruening
+"""
+
+import argparse
+import json
+import string
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import yaml
+except ImportError:
+    print("Error: PyYAML is not installed. Install with: pip install pyyaml", file=sys.stderr)
+    sys.exit(1)
+
+_Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_Dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+TOOLSET_DIRS = ("usegalaxy.org", "test.galaxyproject.org")
+INSTALL_FLAGS = (
+    "install_repository_dependencies",
+    "install_resolver_dependencies",
+    "install_tool_dependencies",
+)
+
+ToolKey = Tuple[str, str]
+
+
+def section_id_chr(c: str) -> str:
+    return (c if c in string.ascii_letters + string.digits else '_').lower()
+
+
+def section_label_to_id(label: str) -> str:
+    return ''.join(map(section_id_chr, label))
+
+
+def dump_yaml(data: Dict[str, Any]) -> str:
+    """Serialize the way usegalaxy-tools files are written (sorted keys, block style)."""
+    return yaml.dump(data, Dumper=_Dumper, default_flow_style=False, sort_keys=True)
+
+
+class Section:
+    """One `.yml` / `.yml.lock` pair in a toolset directory"""
+
+    def __init__(self, toolset: str, section_id: str, yml_path: Path, lock_path: Path):
+        self.toolset = toolset
+        self.section_id = section_id
+        self.yml_path = yml_path
+        self.lock_path = lock_path
+        self.yml_text = yml_path.read_text() if yml_path.exists() else None
+        self.lock_text = lock_path.read_text() if lock_path.exists() else None
+        self.yml = yaml.load(self.yml_text, Loader=_Loader) if self.yml_text else None
+        self.lock = yaml.load(self.lock_text, Loader=_Loader) if self.lock_text else None
+        self.yml = self.yml or {}
+        self.lock = self.lock or {}
+        # `tools:` with no entries loads as None
+        self.yml["tools"] = self.yml.get("tools") or []
+        self.lock["tools"] = self.lock.get("tools") or []
+        self.label = (self.yml.get("tool_panel_section_label")
+                      or self.lock.get("tool_panel_section_label")
+                      or section_id)
+
+    @classmethod
+    def new(cls, toolset_dir: Path, label: str, section_id: Optional[str] = None) -> "Section":
+        section_id = section_id or section_label_to_id(label)
+        section = cls(toolset_dir.name, section_id,
+                      toolset_dir / f"{section_id}.yml", toolset_dir / f"{section_id}.yml.lock")
+        section.label = label
+        return section
+
+    def _find(self, tools: List[Dict[str, Any]], key: ToolKey) -> Optional[Dict[str, Any]]:
+        for tool in tools:
+            if (tool.get("name"), tool.get("owner")) == key:
+                return tool
+        return None
+
+    @property
+    def panel_id(self) -> str:
+        """tool_panel_section_id, derived from the label as fix_lockfile.py does"""
+        return section_label_to_id(self.label)
+
+    def lock_entry(self, key: ToolKey) -> Optional[Dict[str, Any]]:
+        return self._find(self.lock["tools"], key)
+
+    def add_revision(self, key: ToolKey, revision: str, tool_shed_url: Optional[str] = None):
+        """Add `revision` for the tool, adding the tool to both files if absent"""
+        if self._find(self.yml["tools"], key) is None:
+            entry = {"name": key[0], "owner": key[1]}
+            if tool_shed_url:
+                entry["tool_shed_url"] = tool_shed_url
+            self.yml["tools"].append(entry)
+        entry = self.lock_entry(key)
+        if entry is None:
+            entry = {"name": key[0], "owner": key[1], "revisions": []}
+            if tool_shed_url:
+                entry["tool_shed_url"] = tool_shed_url
+            self.lock["tools"].append(entry)
+        entry["revisions"] = entry.get("revisions") or []
+        if revision not in entry["revisions"]:
+            entry["revisions"].append(revision)
+
+    def remove_tool(self, key: ToolKey):
+        for data in (self.yml, self.lock):
+            data["tools"] = [t for t in data["tools"]
+                             if (t.get("name"), t.get("owner")) != key]
+
+    def render(self) -> Tuple[str, str]:
+        """Return (yml_text, lock_text) in the documented format"""
+        # The unlocked .yml keeps its hand-maintained order; new tools are appended
+        yml = dict(self.yml)
+        yml["tool_panel_section_label"] = self.label
+
+        lock = dict(self.lock)
+        for flag in INSTALL_FLAGS:
+            lock.setdefault(flag, False)
+        lock["tool_panel_section_label"] = self.label
+        tools = []
+        seen = set()
+        for tool in sorted(lock["tools"], key=lambda t: (t["name"], t["owner"])):
+            key = (tool["name"], tool["owner"])
+            if key in seen:
+                # Deduplicate like fix_lockfile.py: merge revisions into the first entry
+                first = next(t for t in tools if (t["name"], t["owner"]) == key)
+                first["revisions"] = sorted(set(first["revisions"]) | set(tool.get("revisions") or []))
+                continue
+            seen.add(key)
+            tool = dict(tool)
+            tool["revisions"] = sorted(set(tool.get("revisions") or []))
+            tool["tool_panel_section_id"] = self.panel_id
+            tool["tool_panel_section_label"] = self.label
+            tools.append(tool)
+        lock["tools"] = tools
+        return dump_yaml(yml), dump_yaml(lock)
+
+
+class LockfileIndex:
+    """All sections of all toolsets in a usegalaxy-tools checkout, parsed once"""
+
+    def __init__(self, repo: Path, toolsets: Optional[List[str]] = None):
+        """
+        Load and index every section file
+
+        Args:
+            repo: Path to the usegalaxy-tools checkout
+            toolsets: Toolset directory names to load (default: all found)
+        """
+        self.repo = Path(repo)
+        names = toolsets or [t for t in TOOLSET_DIRS if (self.repo / t).is_dir()]
+        if not names:
+            raise FileNotFoundError(f"Not in a usegalaxy-tools repo: {self.repo}")
+        self.toolsets = names
+        self.sections: Dict[Tuple[str, str], Section] = {}
+        self.by_tool: Dict[ToolKey, List[Tuple[str, str]]] = defaultdict(list)
+        self._touched = set()
+        for toolset in names:
+            toolset_dir = self.repo / toolset
+            stems = {p.name[:-len(".yml.lock")] for p in toolset_dir.glob("*.yml.lock")}
+            stems |= {p.stem for p in toolset_dir.glob("*.yml")}
+            for stem in sorted(stems):
+                section = Section(toolset, stem, toolset_dir / f"{stem}.yml",
+                                  toolset_dir / f"{stem}.yml.lock")
+                self.sections[(toolset, stem)] = section
+                for tool in section.lock["tools"] + section.yml["tools"]:
+                    key = (tool.get("name"), tool.get("owner"))
+                    if (toolset, stem) not in self.by_tool[key]:
+                        self.by_tool[key].append((toolset, stem))
+
+    def find(self, name: str, owner: str) -> List[Dict[str, Any]]:
+        """
+        Where a tool is installed
+
+        Returns:
+            One dict per (toolset, section) with the locked revisions
+        """
+        found = []
+        for toolset, section_id in self.by_tool.get((name, owner), []):
+            entry = self.sections[(toolset, section_id)].lock_entry((name, owner)) or {}
+            found.append({
+                "toolset": toolset,
+                "section": section_id,
+                "revisions": sorted(entry.get("revisions") or []),
+            })
+        return found
+
+    def _resolve_section(self, toolset: str, spec: Any) -> Section:
+        """Find a section by id or label, creating it if it does not exist"""
+        if isinstance(spec, dict):
+            label = spec.get("label")
+            section_id = spec.get("id") or section_label_to_id(label)
+        else:
+            label, section_id = spec, section_label_to_id(spec)
+        for candidate in (spec if isinstance(spec, str) else None, section_id):
+            if candidate and (toolset, candidate) in self.sections:
+                return self.sections[(toolset, candidate)]
+        for section in self.sections.values():
+            if section.toolset == toolset and section.label == label:
+                return section
+        section = Section.new(self.repo / toolset, label or section_id, section_id)
+        self.sections[(toolset, section_id)] = section
+        return section
+
+    def apply(self, updates: List[Dict[str, Any]]) -> List[str]:
+        """
+        Apply a batch of updates in memory
+
+        Args:
+            updates: Entries with name, owner, revision, sections and optional
+                keep_other_sections, tool_shed_url, toolsets
+
+        Returns:
+            Human-readable plan lines, one per action
+        """
+        plan = []
+        for update in updates:
+            key = (update["name"], update["owner"])
+            revision = update["revision"]
+            for toolset in update.get("toolsets") or self.toolsets:
+                if toolset not in self.toolsets:
+                    raise ValueError(f"Toolset '{toolset}' is not loaded")
+                targets = [self._resolve_section(toolset, s) for s in update["sections"]]
+                target_ids = {s.section_id for s in targets}
+                for section in targets:
+                    entry = section.lock_entry(key)
+                    if entry is None:
+                        action = "add tool" if section.lock_text is not None else "create section, add tool"
+                    elif revision in (entry.get("revisions") or []):
+                        plan.append(f"{toolset}/{section.section_id}: {key[0]} already has {revision}")
+                        continue
+                    else:
+                        action = "add revision"
+                    section.add_revision(key, revision, update.get("tool_shed_url"))
+                    self._touched.add((toolset, section.section_id))
+                    if (toolset, section.section_id) not in self.by_tool[key]:
+                        self.by_tool[key].append((toolset, section.section_id))
+                    plan.append(f"{toolset}/{section.section_id}: {action} {key[0]} ({key[1]}) {revision}")
+                if update.get("keep_other_sections"):
+                    continue
+                for toolset_name, section_id in list(self.by_tool[key]):
+                    if toolset_name != toolset or section_id in target_ids:
+                        continue
+                    self.sections[(toolset, section_id)].remove_tool(key)
+                    self.by_tool[key].remove((toolset, section_id))
+                    self._touched.add((toolset, section_id))
+                    plan.append(f"{toolset}/{section_id}: remove {key[0]} ({key[1]})")
+        return plan
+
+    def write(self, dry_run: bool = False) -> List[Path]:
+        """
+        Write back the sections touched by apply() whose content changed
+
+        Returns:
+            Paths that were (or, with dry_run, would be) written
+        """
+        written = []
+        for toolset, section_id in sorted(self._touched):
+            section = self.sections[(toolset, section_id)]
+            yml_text, lock_text = section.render()
+            for path, old, new in ((section.yml_path, section.yml_text, yml_text),
+                                   (section.lock_path, section.lock_text, lock_text)):
+                if old == new:
+                    continue
+                if not dry_run:
+                    path.write_text(new)
+                written.append(path)
+        return written
+
+
+def load_batch(path: Path) -> List[Dict[str, Any]]:
+    with open(path) as f:
+        data = json.load(f) if path.suffix == ".json" else yaml.load(f, Loader=_Loader)
+    if isinstance(data, dict):
+        data = data.get("updates", [])
+    for entry in data:
+        missing = [k for k in ("name", "owner", "revision", "sections") if not entry.get(k)]
+        if missing:
+            raise ValueError(f"Batch entry {entry} is missing: {', '.join(missing)}")
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Apply batched tool revision updates to usegalaxy-tools lockfiles",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument("--repo", type=Path, default=Path.cwd(), help="usegalaxy-tools checkout (default: cwd)")
+    parser.add_argument("--toolset", action="append", choices=TOOLSET_DIRS,
+                        help="Restrict to a toolset directory (repeatable; default: all found)")
+    parser.add_argument("--batch", type=Path, help="YAML/JSON file with the updates to apply")
+    parser.add_argument("--apply", action="store_true", help="Write the changed files (default: show plan only)")
+    parser.add_argument("--find", nargs=2, metavar=("NAME", "OWNER"), help="Show where a tool is installed")
+    args = parser.parse_args()
+
+    try:
+        index = LockfileIndex(args.repo, args.toolset)
+    except (FileNotFoundError, yaml.YAMLError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.find:
+        occurrences = index.find(*args.find)
+        if not occurrences:
+            print(f"{args.find[0]} ({args.find[1]}) is not installed in {', '.join(index.toolsets)}")
+        for occ in occurrences:
+            print(f"{occ['toolset']}/{occ['section']}: {', '.join(occ['revisions']) or '(no revisions)'}")
+        sys.exit(0)
+
+    if not args.batch:
+        parser.error("--batch or --find is required")
+
+    try:
+        plan = index.apply(load_batch(args.batch))
+    except (OSError, ValueError, KeyError, yaml.YAMLError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    for line in plan:
+        print(line)
+    changed = index.write(dry_run=not args.apply)
+    verb = "Wrote" if args.apply else "Would write"
+    print(f"\n{verb} {len(changed)} file(s):")
+    for path in changed:
+        print(f"  {path.relative_to(index.repo)}")
+    if not args.apply and changed:
+        print("\nRe-run with --apply to write these files.")
+
+
+if __name__ == "__main__":
+    main()
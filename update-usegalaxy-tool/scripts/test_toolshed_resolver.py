@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Tests for toolshed_resolver.py against a local stub ToolShed.
+
+Usage:
+    python -m unittest test_toolshed_resolver      # from this directory
+    python -m pytest test_toolshed_resolver.py
+"""
+
+import json
+import tempfile
+import threading
+import unittest
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from toolshed_resolver import ToolShedResolver
+
+# owner/name -> repository id, installable revisions (oldest first) and per-changeset tool versions
+REPOSITORIES = {
+    "bgruening/diamond": {
+        "id": "r1",
+        "revisions": ["aaa111", "bbb222", "ccc333"],
+        "versions": {"aaa111": "2.0.15", "bbb222": "2.1.8+galaxy0", "ccc333": "2.1.22"},
+    },
+    "iuc/fastp": {
+        "id": "r2",
+        "revisions": ["ddd444"],
+        "versions": {"ddd444": "0.23.4"},
+    },
+}
+
+
+class StubToolShed(ThreadingHTTPServer):
+    """The subset of the ToolShed API the resolver uses, with injectable failures"""
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.fail = {}      # path -> number of 500 responses to send before answering
+        self.hits = {}      # path -> request count
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, code, body):
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(json.dumps(body).encode())
+
+    def do_GET(self):
+        url = urllib.parse.urlparse(self.path)
+        path, query = url.path, urllib.parse.parse_qs(url.query)
+        server = self.server
+        server.hits[path] = server.hits.get(path, 0) + 1
+        if server.fail.get(path, 0):
+            server.fail[path] -= 1
+            return self._reply(500, {"err_msg": "Internal Server Error"})
+
+        by_id = {repo["id"]: repo for repo in REPOSITORIES.values()}
+        parts = path.strip("/").split("/")
+        if path == "/api/repositories":
+            repo = REPOSITORIES.get(f"{query['owner'][0]}/{query['name'][0]}")
+            return self._reply(200, [{"id": repo["id"]}] if repo else [])
+        if len(parts) == 4 and parts[3] == "installable_revisions" and parts[2] in by_id:
+            return self._reply(200, by_id[parts[2]]["revisions"])
+        if len(parts) == 5 and parts[3] == "changeset_revision" and parts[2] in by_id:
+            version = by_id[parts[2]]["versions"].get(parts[4])
+            if version:
+                return self._reply(200, {"tools": [{"id": "tool", "version": version}]})
+        self._reply(404, {"err_msg": "Not found"})
+
+
+class ToolShedResolverTest(unittest.TestCase):
+    def setUp(self):
+        self.shed = StubToolShed()
+        threading.Thread(target=self.shed.serve_forever, daemon=True).start()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = Path(self.tmp.name) / "toolshed.json"
+
+    def tearDown(self):
+        self.shed.shutdown()
+        self.shed.server_close()
+        self.tmp.cleanup()
+
+    def resolver(self, retries=0):
+        return ToolShedResolver(self.shed.url, self.cache, workers=4, timeout=5, retries=retries)
+
+    def test_resolves_versions_and_latest(self):
+        results = self.resolver().resolve([
+            ("diamond", "bgruening", "2.1.8"),
+            ("diamond", "bgruening", "latest"),
+            ("fastp", "iuc", "0.23.4"),
+        ])
+        self.assertEqual(results[0]["revision"], "bbb222")
+        self.assertEqual(results[0]["resolved_version"], "2.1.8+galaxy0")
+        self.assertEqual(results[1]["revision"], "ccc333")
+        self.assertEqual(results[2]["revision"], "ddd444")
+
+    def test_repeat_run_uses_cache(self):
+        self.resolver().resolve([("diamond", "bgruening", "2.1.22")])
+        self.shed.hits.clear()
+        result = self.resolver().resolve([("diamond", "bgruening", "2.1.22")])[0]
+        self.assertEqual(result["revision"], "ccc333")
+        # only installable_revisions is fetched again
+        self.assertEqual(list(self.shed.hits), ["/api/repositories/r1/installable_revisions"])
+
+    def test_unknown_version_and_repository(self):
+        results = self.resolver().resolve([("diamond", "bgruening", "9.9"), ("nope", "iuc", "1.0")])
+        self.assertEqual(results[0]["error"], "No installable revision of bgruening/diamond has version 9.9")
+        self.assertIn("2.1.22", results[0]["available_versions"])
+        self.assertIn("not found", results[1]["error"])
+
+    def test_failed_changeset_is_not_reported_as_missing_version(self):
+        self.shed.fail["/api/repositories/r1/changeset_revision/ccc333"] = 99
+        result = self.resolver().resolve([("diamond", "bgruening", "2.1.22")])[0]
+        self.assertNotIn("revision", result)
+        self.assertTrue(result["error"].startswith("could not resolve: changeset ccc333"), result["error"])
+
+        # the failed changeset was not cached, so the next run fetches it and succeeds
+        self.shed.fail.clear()
+        result = self.resolver().resolve([("diamond", "bgruening", "2.1.22")])[0]
+        self.assertEqual(result["revision"], "ccc333")
+
+    def test_transient_failure_is_retried(self):
+        self.shed.fail["/api/repositories/r1/changeset_revision/ccc333"] = 1
+        result = self.resolver(retries=2).resolve([("diamond", "bgruening", "2.1.22")])[0]
+        self.assertEqual(result["revision"], "ccc333")
+        self.assertEqual(self.shed.hits["/api/repositories/r1/changeset_revision/ccc333"], 2)
+
+    def test_failed_repository_lookup(self):
+        self.shed.fail["/api/repositories/r2/installable_revisions"] = 99
+        result = self.resolver().resolve([("fastp", "iuc", "0.23.4")])[0]
+        self.assertTrue(result["error"].startswith("could not resolve:"), result["error"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Resolve ToolShed tool versions to changeset revisions, concurrently and cached.
+
+Step 2 of SKILL.md walks `installable_revisions` and fetches
+`/changeset_revision/{hash}` one at a time. This resolver fetches all
+unknown changesets of every requested repository in parallel, keeps their
+metadata in a persistent cache (metadata for a given hash never changes),
+and builds a version -> revision index per repository. Only the
+`installable_revisions` list is fetched fresh each run, so repeat lookups
+cost one request per repository.
+
+Usage:
+    # Single tool
+    python toolshed_resolver.py diamond bgruening 2.1.22
+
+    # Batch: entries with name, owner, version (other keys are passed through)
+    python toolshed_resolver.py --batch wanted.yml --output updates.yml
+
+    # Against another ToolShed (or a local stub for testing, see
+    # test_toolshed_resolver.py)
+    python toolshed_resolver.py --toolshed http://localhost:9009 fastp iuc latest
+
+Transient failures (connection errors, timeouts, 429 and 5xx responses) are
+retried with backoff. A repository any of whose changesets still cannot be
+fetched is reported as "could not resolve", never as "no such version";
+only changesets fetched successfully are cached, so the next run retries
+the rest.
+
+The --output file has `revision` filled in for every resolved entry and
+can be fed straight to `lockfile_engine.py --batch`.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_TOOLSHED = "https://toolshed.g2.bx.psu.edu"
+DEFAULT_CACHE = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "galaxy-skills" / "toolshed.json"
+DEFAULT_WORKERS = 16
+DEFAULT_RETRIES = 3
+
+
+def versions_in_metadata(metadata: Dict[str, Any]) -> List[str]:
+    """Tool version strings declared by one changeset's metadata"""
+    versions = []
+    tool_versions = metadata.get("tool_versions") or {}
+    if isinstance(tool_versions, dict):
+        versions.extend(str(v) for v in tool_versions.values())
+    for tool in metadata.get("tools") or []:
+        if tool.get("version"):
+            versions.append(str(tool["version"]))
+    return list(dict.fromkeys(versions))
+
+
+def version_matches(requested: str, available: str) -> bool:
+    """Exact match, or a Galaxy `+galaxyN` wrapper suffix on the same version"""
+    return available == requested or available.split("+galaxy")[0] == requested
+
+
+class ToolShedResolver:
+    """Resolve (name, owner, version) to installable changeset revisions"""
+
+    def __init__(self, toolshed_url: str = DEFAULT_TOOLSHED, cache_path: Optional[Path] = DEFAULT_CACHE,
+                 workers: int = DEFAULT_WORKERS, timeout: float = 30, retries: int = DEFAULT_RETRIES):
+        """
+        Args:
+            toolshed_url: ToolShed base URL
+            cache_path: JSON file for cached repository ids and changeset
+                metadata, or None to disable persistence
+            workers: Maximum concurrent HTTP requests
+            timeout: Per-request timeout in seconds
+            retries: Retries per request after a transient failure
+        """
+        self.toolshed_url = toolshed_url.rstrip("/")
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.workers = workers
+        self.timeout = timeout
+        self.retries = retries
+        self._cache = self._load_cache()
+        shed = self._cache.setdefault(self.toolshed_url, {})
+        self._repo_ids: Dict[str, str] = shed.setdefault("repository_ids", {})
+        self._changesets: Dict[str, Dict[str, Any]] = shed.setdefault("changesets", {})
+
+    # ── cache ──
+
+    def _load_cache(self) -> Dict[str, Any]:
+        if not self.cache_path or not self.cache_path.exists():
+            return {}
+        try:
+            with open(self.cache_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_cache(self):
+        """Write the cache atomically so concurrent runs never see a partial file"""
+        if not self.cache_path:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.cache_path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(self._cache, f)
+        os.replace(tmp, self.cache_path)
+
+    # ── HTTP ──
+
+    def _get(self, path: str, **params) -> Any:
+        url = f"{self.toolshed_url}/api/{path}"
+        if params:
+            url += "?" + urllib.parse.urlencode(params)
+        for attempt in range(self.retries + 1):
+            try:
+                with urllib.request.urlopen(url, timeout=self.timeout) as resp:
+                    return json.load(resp)
+            except urllib.error.HTTPError as e:
+                e.close()
+                if (e.code != 429 and e.code < 500) or attempt == self.retries:
+                    raise
+            except (urllib.error.URLError, OSError):
+                if attempt == self.retries:
+                    raise
+            # full-jitter exponential backoff
+            time.sleep(random.uniform(0, 0.5 * 2 ** attempt))
+
+    def _repository_id(self, name: str, owner: str) -> str:
+        key = f"{owner}/{name}"
+        if key not in self._repo_ids:
+            repos = self._get("repositories", name=name, owner=owner)
+            if not repos:
+                raise LookupError(f"Repository {owner}/{name} not found on {self.toolshed_url}")
+            self._repo_ids[key] = repos[0]["id"]
+        return self._repo_ids[key]
+
+    def _installable_revisions(self, repo_id: str) -> List[str]:
+        return self._get(f"repositories/{repo_id}/installable_revisions")
+
+    def _changeset(self, repo_id: str, changeset: str) -> Dict[str, Any]:
+        return self._get(f"repositories/{repo_id}/changeset_revision/{changeset}")
+
+    # ── resolution ──
+
+    def version_index(self, repo_id: str, revisions: List[str]) -> Dict[str, str]:
+        """
+        Map every tool version in a repository to the newest revision declaring it
+
+        Args:
+            repo_id: ToolShed repository id
+            revisions: Installable revisions, oldest first
+
+        Returns:
+            Dict of version string -> changeset revision
+        """
+        index = {}
+        for changeset in revisions:
+            metadata = self._changesets.get(f"{repo_id}:{changeset}")
+            if metadata is None:
+                continue
+            for version in versions_in_metadata(metadata):
+                index[version] = changeset
+        return index
+
+    def resolve(self, requests: Iterable[Tuple[str, str, str]]) -> List[Dict[str, Any]]:
+        """
+        Resolve a batch of (name, owner, version) requests
+
+        `version` may be "latest". All repositories are looked up together
+        and every uncached changeset across them is fetched concurrently.
+
+        Returns:
+            One dict per request, in order, with name, owner, version and
+            either revision (plus available versions) or error
+        """
+        requests = list(requests)
+        repos = list(dict.fromkeys((name, owner) for name, owner, _ in requests))
+        state: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+        def lookup(repo):
+            try:
+                repo_id = self._repository_id(*repo)
+                return repo, {"id": repo_id, "revisions": self._installable_revisions(repo_id)}
+            except LookupError as e:
+                return repo, {"error": str(e)}
+            except (urllib.error.URLError, OSError, ValueError) as e:
+                return repo, {"error": f"could not resolve: {e}"}
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            state.update(pool.map(lookup, repos))
+
+            missing = [(info["id"], changeset)
+                       for info in state.values() if "error" not in info
+                       for changeset in info["revisions"]
+                       if f"{info['id']}:{changeset}" not in self._changesets]
+
+            def fetch(item):
+                repo_id, changeset = item
+                try:
+                    return item, self._changeset(repo_id, changeset), None
+                except (urllib.error.URLError, OSError, ValueError) as e:
+                    return item, None, e
+
+            # A changeset that could not be fetched may declare the requested
+            # version, so its repository cannot be resolved this run
+            fetch_errors: Dict[str, List[str]] = {}
+            for (repo_id, changeset), metadata, error in pool.map(fetch, missing):
+                if error is None:
+                    self._changesets[f"{repo_id}:{changeset}"] = metadata
+                else:
+                    fetch_errors.setdefault(repo_id, []).append(f"changeset {changeset}: {error}")
+
+        # Each changeset's metadata is immutable, so what was fetched is
+        # complete on its own; failed changesets are simply not cached
+        self.save_cache()
+
+        results = []
+        for name, owner, version in requests:
+            info = state[(name, owner)]
+            result = {"name": name, "owner": owner, "version": version}
+            if "error" in info:
+                result["error"] = info["error"]
+            elif info["id"] in fetch_errors:
+                errors = fetch_errors[info["id"]]
+                more = f" (and {len(errors) - 1} more)" if len(errors) > 1 else ""
+                result["error"] = f"could not resolve: {errors[0]}{more}"
+            elif not info["revisions"]:
+                result["error"] = f"{owner}/{name} has no installable revisions"
+            else:
+                index = self.version_index(info["id"], info["revisions"])
+                result["available_versions"] = list(index)
+                if version == "latest":
+                    result["revision"] = info["revisions"][-1]
+                    latest = self._changesets.get(f"{info['id']}:{result['revision']}", {})
+                    result["resolved_version"] = ", ".join(versions_in_metadata(latest)) or None
+                else:
+                    matches = [v for v in index if version_matches(version, v)]
+                    if matches:
+                        result["revision"] = index[matches[-1]]
+                        result["resolved_version"] = matches[-1]
+                    else:
+                        result["error"] = f"No installable revision of {owner}/{name} has version {version}"
+            results.append(result)
+        return results
+
+
+def load_batch(path: Path) -> List[Dict[str, Any]]:
+    with open(path) as f:
+        if path.suffix == ".json":
+            data = json.load(f)
+        else:
+            import yaml
+            data = yaml.safe_load(f)
+    if isinstance(data, dict):
+        data = data.get("updates", [])
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Resolve ToolShed tool versions to changeset revisions",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument("tool", nargs="*", help="NAME OWNER VERSION (VERSION may be 'latest')")
+    parser.add_argument("--batch", type=Path, help="YAML/JSON list of entries with name, owner, version")
+    parser.add_argument("--output", type=Path, help="Write the batch back with revisions filled in (.yml or .json)")
+    parser.add_argument("--toolshed", default=DEFAULT_TOOLSHED, help=f"ToolShed URL (default: {DEFAULT_TOOLSHED})")
+    parser.add_argument("--cache", type=Path, default=DEFAULT_CACHE, help=f"Cache file (default: {DEFAULT_CACHE})")
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write the cache")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Concurrent requests (default: 16)")
+    args = parser.parse_args()
+
+    if args.batch:
+        entries = load_batch(args.batch)
+    elif len(args.tool) == 3:
+        entries = [{"name": args.tool[0], "owner": args.tool[1], "version": args.tool[2]}]
+    else:
+        parser.error("Provide NAME OWNER VERSION or --batch FILE")
+
+    resolver = ToolShedResolver(args.toolshed, None if args.no_cache else args.cache, args.workers)
+    results = resolver.resolve((e["name"], e["owner"], str(e.get("version", "latest"))) for e in entries)
+
+    failed = 0
+    for entry, result in zip(entries, results):
+        if "revision" in result:
+            entry["revision"] = result["revision"]
+            print(f"Found revision: {result['revision']} (version {result.get('resolved_version')}) "
+                  f"for {result['owner']}/{result['name']}")
+        else:
+            failed += 1
+            print(f"❌ {result['owner']}/{result['name']} {result['version']}: {result['error']}", file=sys.stderr)
+            if result.get("available_versions"):
+                print(f"   Available: {', '.join(result['available_versions'])}", file=sys.stderr)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            if args.output.suffix == ".json":
+                json.dump(entries, f, indent=2)
+            else:
+                import yaml
+                yaml.safe_dump(entries, f, default_flow_style=False, sort_keys=False)
+        print(f"Results written to {args.output}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
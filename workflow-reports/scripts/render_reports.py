@@ -0,0 +1,682 @@
+#!/usr/bin/env python3
+"""
+Pre-render a workflow report template for many invocations in one pass.
+
+Galaxy renders a report by resolving each directive of the template
+separately, one invocation at a time. For a study summary over dozens of
+invocations that means hundreds of sequential requests, many of them for
+the same objects (the workflow, shared inputs, the server version). This
+script parses the template once, works out every object each directive
+needs for every invocation, and fetches them as deduplicated, concurrent
+batches:
+
+    1. invocations (with step details)
+    2. datasets, collections, jobs, the workflow, version/configuration
+    3. dataset contents, job parameters and metrics (only once 2 says they are final)
+
+Responses for objects that can no longer change (dataset contents, finished
+jobs with their parameters and metrics, workflow versions) are kept in an
+on-disk cache, so re-rendering after new invocations only fetches what is new.
+Metadata of finished datasets and collections is cached for an hour only
+(METADATA_MAX_AGE), as they can still be renamed, deleted or purged. Output is one Markdown file
+per invocation plus an index, and optionally HTML.
+
+Usage:
+    # Template from a .ga file (report.markdown) or a plain Markdown file
+    python render_reports.py workflow.ga INVOCATION_ID [INVOCATION_ID ...] -o reports/
+
+    # All invocations of a stored workflow
+    python render_reports.py report.md --workflow-id WORKFLOW_ID -o reports/
+
+    # Also write HTML (requires: pip install markdown)
+    python render_reports.py report.md --workflow-id WORKFLOW_ID -o reports/ --html
+
+As a module (any object with get(path) -> JSON works as client, e.g. a stub):
+    from render_reports import GalaxyClient, ReportCompiler
+    compiler = ReportCompiler(GalaxyClient(url, api_key), url)
+    reports = compiler.render(template_text, invocation_ids)   # {invocation_id: markdown}
+
+Supported directives are those in references/directives.md; unsupported ones
+are kept as their original ```galaxy block.
+"""
+
+import argparse
+import hashlib
+import html
+import json
+import os
+import re
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+DEFAULT_CACHE_DIR = Path(os.environ.get(
+    "GALAXY_REPORT_CACHE",
+    Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "galaxy-skills" / "report-cache"))
+DEFAULT_WORKERS = 8
+DEFAULT_MAX_ROWS = 50
+MAX_ROUNDS = 5
+METADATA_MAX_AGE = 3600  # seconds finished dataset/collection metadata is reused from the cache
+
+TERMINAL_JOB_STATES = {"ok", "error", "deleted", "skipped"}
+
+BLOCK_RE = re.compile(r"```galaxy[ \t]*\n(.*?)\n[ \t]*```", re.DOTALL)
+DIRECTIVE_RE = re.compile(r"^\s*(\w+)\s*\((.*)\)\s*$", re.DOTALL)
+ARG_RE = re.compile(r"""(\w+)\s*=\s*("(?:[^"\\]|\\.)*"|'[^']*'|[^,\s)]+)""")
+
+# Directives whose output depends on dataset content rather than metadata alone
+CONTENT_DIRECTIVES = {"history_dataset_as_table", "history_dataset_embedded"}
+
+
+class GalaxyAPIError(Exception):
+    """Raised when a Galaxy API request fails"""
+    pass
+
+
+# ── template ──
+
+
+def parse_template(text: str) -> List[Union[str, Dict[str, Any]]]:
+    """
+    Split a report template into literal Markdown and directives
+
+    Returns:
+        List of strings and {"name", "args", "raw"} dicts, in template order
+    """
+    segments: List[Union[str, Dict[str, Any]]] = []
+    pos = 0
+    for block in BLOCK_RE.finditer(text):
+        segments.append(text[pos:block.start()])
+        pos = block.end()
+        match = DIRECTIVE_RE.match(block.group(1))
+        if not match:
+            segments.append(block.group(0))
+            continue
+        args = {}
+        for key, value in ARG_RE.findall(match.group(2)):
+            if value[:1] in "\"'":
+                value = value[1:-1].replace('\\"', '"')
+            args[key] = value
+        segments.append({"name": match.group(1), "args": args, "raw": block.group(0)})
+    segments.append(text[pos:])
+    return [s for s in segments if s != ""]
+
+
+def load_template(path: Path) -> str:
+    """Report Markdown from a .ga workflow (report.markdown) or a Markdown file"""
+    text = path.read_text()
+    if path.suffix == ".ga":
+        markdown = (json.loads(text).get("report") or {}).get("markdown")
+        if not markdown:
+            raise ValueError(f"{path} has no report.markdown")
+        return markdown
+    return text
+
+
+# ── HTTP + cache ──
+
+
+class GalaxyClient:
+    """Minimal GET-only Galaxy API client"""
+
+    def __init__(self, url: str, api_key: str, timeout: float = 60):
+        self.url = url.rstrip("/")
+        self.api_key = api_key
+        self.timeout = timeout
+
+    def get(self, path: str) -> Any:
+        req = urllib.request.Request(f"{self.url}/api/{path}", headers={"x-api-key": self.api_key})
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                return json.load(resp)
+        except urllib.error.HTTPError as e:
+            body = e.read().decode(errors="replace")
+            try:
+                message = json.loads(body).get("err_msg", body)
+            except ValueError:
+                message = body
+            raise GalaxyAPIError(f"GET {path}: HTTP {e.code}: {message}") from e
+
+
+class ResponseCache:
+    """JSON responses on disk, keyed by server and API path"""
+
+    def __init__(self, cache_dir: Path, server: str):
+        self.dir = Path(cache_dir)
+        self.server = server.rstrip("/")
+        self.dir.mkdir(parents=True, exist_ok=True)
+
+    def _file(self, path: str) -> Path:
+        return self.dir / (hashlib.sha256(f"{self.server}/api/{path}".encode()).hexdigest() + ".json")
+
+    def get(self, path: str) -> Optional[Any]:
+        try:
+            with open(self._file(path)) as f:
+                entry = json.load(f)
+            if entry["expires"] is not None and entry["expires"] < time.time():
+                return None
+            return entry["response"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def put(self, path: str, response: Any, max_age: Optional[float] = None):
+        """Store a response; max_age (seconds) limits how long it is served, None keeps it for good"""
+        target = self._file(path)
+        tmp = target.with_suffix(".tmp")
+        expires = None if max_age is None else time.time() + max_age
+        with open(tmp, "w") as f:
+            json.dump({"path": path, "response": response, "expires": expires}, f)
+        os.replace(tmp, target)
+
+
+def is_final(path: str, response: Any) -> bool:
+    """Whether a response describes an object that can no longer change (safe to cache for good)"""
+    if isinstance(response, dict) and "error" in response:
+        return False
+    if path.startswith("datasets/"):
+        # content is only requested for datasets already in state ok
+        return path.endswith("/get_content_as_text")
+    if path.startswith("jobs/"):
+        # parameters never change; metrics are only requested for finished jobs
+        return "/" in path.split("?")[0][len("jobs/"):] or response.get("state") in TERMINAL_JOB_STATES
+    return path.startswith("workflows/") and "instance=true" in path
+
+
+def is_settled(path: str, response: Any) -> bool:
+    """Whether a dataset or collection is done, so its metadata may be cached for METADATA_MAX_AGE
+
+    Finished datasets and collections can still be renamed, annotated, deleted or purged,
+    so unlike final responses they are only reused for a while.
+    """
+    if isinstance(response, dict) and "error" in response:
+        return False
+    if path.startswith("datasets/"):
+        return response.get("state") == "ok"
+    if path.startswith("dataset_collections/"):
+        return response.get("populated_state") == "ok" and all(
+            (e.get("object") or {}).get("state", "ok") == "ok" for e in response.get("elements", []))
+    return False
+
+
+# ── compiler ──
+
+
+class ReportCompiler:
+    """Resolve report directives for a batch of invocations with shared, cached fetches"""
+
+    def __init__(self, client, url: str, cache: Optional[ResponseCache] = None,
+                 workers: int = DEFAULT_WORKERS, max_rows: int = DEFAULT_MAX_ROWS):
+        """
+        Args:
+            client: Object with get(path) -> parsed JSON (GalaxyClient or a stub)
+            url: Galaxy URL used for links in the rendered reports
+            cache: On-disk cache for final objects, or None
+            workers: Concurrent requests per batch
+            max_rows: Rows shown by history_dataset_as_table
+        """
+        self.client = client
+        self.url = url.rstrip("/")
+        self.cache = cache
+        self.workers = workers
+        self.max_rows = max_rows
+        self.data: Dict[str, Any] = {}
+        self.stats = {"requests": 0, "cached": 0, "rounds": 0}
+
+    # ── fetching ──
+
+    def _fetch_one(self, path: str) -> Tuple[str, Any, bool]:
+        if self.cache:
+            cached = self.cache.get(path)
+            if cached is not None:
+                return path, cached, True
+        try:
+            return path, self.client.get(path), False
+        except (GalaxyAPIError, urllib.error.URLError, OSError, ValueError) as e:
+            return path, {"error": str(e)}, False
+
+    def fetch(self, paths: List[str]):
+        """Fetch paths not fetched yet, concurrently, storing final responses in the cache"""
+        paths = [p for p in dict.fromkeys(paths) if p not in self.data]
+        if not paths:
+            return
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for path, response, cached in pool.map(self._fetch_one, paths):
+                self.data[path] = response
+                if cached:
+                    self.stats["cached"] += 1
+                    continue
+                self.stats["requests"] += 1
+                if self.cache and is_final(path, response):
+                    self.cache.put(path, response)
+                elif self.cache and is_settled(path, response):
+                    self.cache.put(path, response, METADATA_MAX_AGE)
+
+    def get(self, path: str) -> Optional[Any]:
+        response = self.data.get(path)
+        return None if response is None or (isinstance(response, dict) and "error" in response) else response
+
+    # ── reference resolution ──
+
+    @staticmethod
+    def _invocation_path(invocation_id: str) -> str:
+        return f"invocations/{invocation_id}?step_details=true"
+
+    def _target(self, directive: Dict[str, Any], invocation: Dict[str, Any]) -> Tuple[Optional[str], Optional[str]]:
+        """(src, id) referenced by a directive: src is hda, hdca or job"""
+        args = directive["args"]
+        if "history_dataset_id" in args:
+            return "hda", args["history_dataset_id"]
+        if "history_dataset_collection_id" in args:
+            return "hdca", args["history_dataset_collection_id"]
+        if "job_id" in args:
+            return "job", args["job_id"]
+        if "output" in args:
+            label = args["output"]
+            if label in invocation.get("outputs", {}):
+                return "hda", invocation["outputs"][label]["id"]
+            if label in invocation.get("output_collections", {}):
+                return "hdca", invocation["output_collections"][label]["id"]
+        if "input" in args:
+            for item in invocation.get("inputs", {}).values():
+                if item.get("label") == args["input"]:
+                    return ("hdca" if item.get("src") == "hdca" else "hda"), item["id"]
+        if "step" in args:
+            for step in invocation.get("steps", []):
+                if step.get("workflow_step_label") == args["step"]:
+                    jobs = step.get("jobs") or ([{"id": step["job_id"]}] if step.get("job_id") else [])
+                    if jobs:
+                        return "job", jobs[0]["id"]
+        return None, None
+
+    def _items(self, invocation: Dict[str, Any], kind: str) -> List[Tuple[str, str, str]]:
+        """(label, src, id) of an invocation's inputs or outputs"""
+        if kind == "inputs":
+            return [(item.get("label") or f"Input {index}", item.get("src", "hda"), item["id"])
+                    for index, item in invocation.get("inputs", {}).items()]
+        items = [(label, "hda", item["id"]) for label, item in invocation.get("outputs", {}).items()]
+        items += [(label, "hdca", item["id"]) for label, item in invocation.get("output_collections", {}).items()]
+        return items
+
+    @staticmethod
+    def _object_path(src: str, object_id: str) -> str:
+        if src == "hdca":
+            return f"dataset_collections/{object_id}?instance_type=history"
+        if src == "job":
+            return f"jobs/{object_id}?full=true"
+        return f"datasets/{object_id}"
+
+    def _element_ids(self, src: str, object_id: str) -> List[Tuple[str, str]]:
+        """(element identifier, dataset id) for a collection, flattened; [(name, id)] for a dataset"""
+        if src == "hda":
+            return [("", object_id)]
+        collection = self.get(self._object_path("hdca", object_id)) or {}
+
+        def walk(elements, prefix=""):
+            for element in elements:
+                obj = element.get("object") or {}
+                name = f"{prefix}{element.get('element_identifier', '')}"
+                if element.get("element_type") == "dataset_collection":
+                    yield from walk(obj.get("elements", []), f"{name}/")
+                elif obj.get("id"):
+                    yield name, obj["id"]
+        return list(walk(collection.get("elements", [])))
+
+    # ── planning ──
+
+    def _needs(self, directive: Dict[str, Any], invocation: Dict[str, Any]) -> List[str]:
+        """API paths this directive needs, given what has been fetched so far"""
+        name = directive["name"]
+        if name in ("invocation_inputs", "invocation_outputs"):
+            return [self._object_path(src, oid) for _, src, oid in self._items(invocation, name[len("invocation_"):])]
+        if name in ("workflow_display", "workflow_license"):
+            return [f"workflows/{invocation['workflow_id']}?instance=true"]
+        if name == "generate_galaxy_version":
+            return ["version"]
+        if name.startswith("instance_"):
+            return ["configuration"]
+
+        src, object_id = self._target(directive, invocation)
+        if not src:
+            return []
+        needs = [self._object_path(src, object_id)]
+        if src == "job":
+            job = self.get(needs[0])
+            if name == "job_parameters":
+                needs.append(f"jobs/{object_id}/parameters_display")
+            elif name == "job_metrics" and job and job.get("state") in TERMINAL_JOB_STATES:
+                needs.append(f"jobs/{object_id}/metrics")
+            return needs
+        if name == "history_dataset_as_image" or name in CONTENT_DIRECTIVES or name == "history_dataset_peek":
+            for _, dataset_id in self._element_ids(src, object_id):
+                needs.append(f"datasets/{dataset_id}")
+                dataset = self.get(f"datasets/{dataset_id}")
+                if name in CONTENT_DIRECTIVES and dataset and dataset.get("state") == "ok":
+                    needs.append(f"datasets/{dataset_id}/get_content_as_text")
+        return needs
+
+    def collect(self, segments: List[Union[str, Dict[str, Any]]], invocation_ids: List[str]):
+        """Fetch everything the template needs for all invocations, in deduplicated rounds"""
+        self.fetch([self._invocation_path(i) for i in invocation_ids])
+        directives = [s for s in segments if isinstance(s, dict)]
+        for _ in range(MAX_ROUNDS):
+            needed = []
+            for invocation_id in invocation_ids:
+                invocation = self.get(self._invocation_path(invocation_id))
+                if invocation:
+                    for directive in directives:
+                        needed.extend(self._needs(directive, invocation))
+            if all(path in self.data for path in needed):
+                break
+            self.stats["rounds"] += 1
+            self.fetch(needed)
+
+    # ── rendering ──
+
+    def _display_url(self, dataset_id: str, ext: Optional[str] = None) -> str:
+        return f"{self.url}/api/datasets/{dataset_id}/display" + (f"?to_ext={ext}" if ext else "")
+
+    def _unavailable(self, path: str) -> str:
+        response = self.data.get(path)
+        reason = response["error"] if isinstance(response, dict) and "error" in response else "not available"
+        return f"*Unavailable: {reason}*"
+
+    def _table(self, text: str, headers: Optional[List[str]], show_headers: bool) -> str:
+        rows = [line.split("\t") for line in text.splitlines() if line.strip()]
+        if rows and rows[0][0].startswith("#"):
+            first = rows.pop(0)
+            headers = headers or [first[0].lstrip("#").strip(), *first[1:]]
+        truncated = len(rows) > self.max_rows
+        rows = rows[:self.max_rows]
+        width = max([len(r) for r in rows] + [len(headers or [])] or [1])
+        if not show_headers or not headers:
+            headers = [str(i + 1) for i in range(width)]
+        headers = (headers + [""] * width)[:width]
+
+        def cells(row):
+            return "| " + " | ".join(c.replace("|", "\\|") for c in (row + [""] * width)[:width]) + " |"
+        lines = [cells(headers), "|" + "---|" * width] + [cells(r) for r in rows]
+        if truncated:
+            lines.append(f"\n*First {self.max_rows} rows shown.*")
+        return "\n".join(lines)
+
+    def _dataset_block(self, name: str, args: Dict[str, str], dataset_id: str, label: str) -> str:
+        meta = self.get(f"datasets/{dataset_id}")
+        if meta is None:
+            return self._unavailable(f"datasets/{dataset_id}")
+        title = label or meta.get("name", dataset_id)
+        ext = meta.get("extension") or meta.get("file_ext")
+        if name == "history_dataset_as_image":
+            return f"![{title}]({self._display_url(dataset_id)})"
+        if name in CONTENT_DIRECTIVES:
+            if meta.get("state") != "ok":
+                return f"*{title}: dataset is {meta.get('state')}*"
+            content = self.get(f"datasets/{dataset_id}/get_content_as_text")
+            if content is None:
+                return self._unavailable(f"datasets/{dataset_id}/get_content_as_text")
+            text = content.get("item_data") or ""
+            if name == "history_dataset_embedded":
+                return text if ext == "html" else f"```\n{text.rstrip()}\n```"
+            body = self._table(text, meta.get("metadata_column_names"),
+                               args.get("show_column_headers", "true") != "false")
+            parts = [f"**{args['title']}**\n" if args.get("title") else "", body,
+                     f"\n*{args['footer']}*" if args.get("footer") else ""]
+            return "\n".join(p for p in parts if p)
+        if name == "history_dataset_peek":
+            peek = re.sub(r"<[^>]+>", " ", meta.get("peek") or "")
+            return f"```\n{html.unescape(peek).strip()}\n```"
+        return ""
+
+    def _render_dataset(self, directive: Dict[str, Any], invocation: Dict[str, Any]) -> str:
+        name, args = directive["name"], directive["args"]
+        src, object_id = self._target(directive, invocation)
+        if not src:
+            return "*Unavailable: reference not found in this invocation*"
+        path = self._object_path(src, object_id)
+        meta = self.get(path)
+        if meta is None:
+            return self._unavailable(path)
+
+        if name == "history_dataset_name":
+            return meta.get("name", "")
+        if name == "history_dataset_type":
+            return meta.get("extension") or meta.get("collection_type", "")
+        if name == "history_dataset_link":
+            target = (f"{self.url}/api/dataset_collections/{object_id}/download" if src == "hdca"
+                      else self._display_url(object_id, meta.get("extension")))
+            return f"[{args.get('label') or meta.get('name')}]({target})"
+        if name == "history_dataset_info":
+            return meta.get("misc_info") or meta.get("misc_blurb") or ""
+        if name in ("history_dataset_as_image", "history_dataset_peek") or name in CONTENT_DIRECTIVES:
+            blocks = [self._dataset_block(name, args, dataset_id, element)
+                      for element, dataset_id in self._element_ids(src, object_id)]
+            if src == "hdca" and name != "history_dataset_as_image":
+                blocks = [f"**{element}**\n\n{block}"
+                          for (element, _), block in zip(self._element_ids(src, object_id), blocks)]
+            return "\n\n".join(blocks)
+        # history_dataset_display, history_dataset_collection_display, history_dataset_index
+        return self._describe(src, object_id, meta.get("name", object_id))
+
+    def _describe(self, src: str, object_id: str, label: str) -> str:
+        meta = self.get(self._object_path(src, object_id))
+        if meta is None:
+            return f"- **{label}**: {self._unavailable(self._object_path(src, object_id))}"
+        if src == "hdca":
+            elements = self._element_ids(src, object_id)
+            lines = [f"- **{label}**: {meta.get('name', '')} ({meta.get('collection_type')}, "
+                     f"{len(elements)} datasets)"]
+            return "\n".join(lines + [f"  - [{e}]({self._display_url(d)})" for e, d in elements])
+        return (f"- **{label}**: [{meta.get('name')}]({self._display_url(object_id, meta.get('extension'))}) "
+                f"({meta.get('extension')}, {meta.get('state')})")
+
+    def _render_job(self, directive: Dict[str, Any], invocation: Dict[str, Any]) -> str:
+        name = directive["name"]
+        src, job_id = self._target(directive, invocation)
+        if src != "job":
+            return "*Unavailable: step has no job in this invocation*"
+        job = self.get(f"jobs/{job_id}?full=true")
+        if job is None:
+            return self._unavailable(f"jobs/{job_id}?full=true")
+        if name in ("tool_stdout", "tool_stderr"):
+            text = (job.get(name) or job.get(name.replace("tool_", "")) or "").rstrip()
+            return f"```\n{text}\n```" if text else "*No output*"
+        if name == "job_parameters":
+            params = self.get(f"jobs/{job_id}/parameters_display")
+            if params is None:
+                return self._unavailable(f"jobs/{job_id}/parameters_display")
+            rows = ["| Parameter | Value |", "|---|---|"]
+            for p in params.get("parameters", []):
+                value = p.get("value")
+                if isinstance(value, (dict, list)):
+                    value = json.dumps(value)
+                indent = "&nbsp;" * 4 * max(0, p.get("depth", 1) - 1)
+                rows.append(f"| {indent}{p.get('text', '')} | {str(value).replace('|', chr(92) + '|')} |")
+            return "\n".join(rows)
+        if name == "job_metrics":
+            metrics = self.get(f"jobs/{job_id}/metrics")
+            if metrics is None:
+                return f"*Job is {job.get('state')}; metrics not available yet*"
+            rows = ["| Metric | Value |", "|---|---|"]
+            rows += [f"| {m.get('title') or m.get('name')} | {m.get('value')} |" for m in metrics]
+            return "\n".join(rows)
+        return ""
+
+    def _render_directive(self, directive: Dict[str, Any], invocation: Dict[str, Any]) -> str:
+        name = directive["name"]
+        if name.startswith("history_dataset"):
+            return self._render_dataset(directive, invocation)
+        if name.startswith("job_") or name.startswith("tool_std"):
+            return self._render_job(directive, invocation)
+        if name == "invocation_time":
+            return invocation.get("create_time", "")
+        if name in ("invocation_inputs", "invocation_outputs"):
+            items = self._items(invocation, name[len("invocation_"):])
+            return "\n".join(self._describe(src, oid, label) for label, src, oid in items) or "*None*"
+        if name == "history_link":
+            return f"[Import this history]({self.url}/histories/view?id={invocation.get('history_id')})"
+        if name == "workflow_image":
+            return f"[View workflow in Galaxy]({self.url}/workflows/invocations/{invocation.get('id')})"
+        if name in ("workflow_display", "workflow_license"):
+            workflow = self.get(f"workflows/{invocation['workflow_id']}?instance=true")
+            if workflow is None:
+                return self._unavailable(f"workflows/{invocation['workflow_id']}?instance=true")
+            if name == "workflow_license":
+                return workflow.get("license") or "*No license specified*"
+            steps = sorted((workflow.get("steps") or {}).values(), key=lambda s: s.get("id", 0))
+            lines = [f"**{workflow.get('name')}**", ""]
+            for step in steps:
+                what = step.get("tool_id") or step.get("type")
+                version = f" {step['tool_version']}" if step.get("tool_version") else ""
+                label = f"{step['label']}: " if step.get("label") else ""
+                lines.append(f"{step.get('id', 0) + 1}. {label}{what}{version}")
+            return "\n".join(lines)
+        if name == "generate_time":
+            return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
+        if name == "generate_galaxy_version":
+            version = self.get("version") or {}
+            return f"Galaxy {version.get('version_major', '?')}.{version.get('version_minor', '?')}"
+        if name.startswith("instance_"):
+            config = self.get("configuration") or {}
+            key = {"instance_access_link": "instance_access_url", "instance_help_link": "helpsite_url",
+                   "instance_citation_link": "citation_url"}.get(name)
+            link = config.get(key) or self.url
+            return f"[{link}]({link})"
+        return directive["raw"]
+
+    def render_one(self, segments: List[Union[str, Dict[str, Any]]], invocation_id: str) -> str:
+        invocation = self.get(self._invocation_path(invocation_id))
+        if invocation is None:
+            return f"# Invocation {invocation_id}\n\n{self._unavailable(self._invocation_path(invocation_id))}\n"
+        # directive output is block-level: a table followed directly by the next
+        # template line would take that line as one more row, so every directive
+        # is separated from its surroundings by exactly one blank line
+        out: List[str] = []
+        after_directive = False
+        for segment in segments:
+            if isinstance(segment, str):
+                out.append(segment.lstrip("\n") if after_directive else segment)
+                after_directive = False
+                continue
+            body = self._render_directive(segment, invocation)
+            if segment["args"].get("collapse") and body != segment["raw"]:
+                body = f"<details><summary>{segment['args']['collapse']}</summary>\n\n{body}\n\n</details>"
+            while out and not out[-1].strip("\n"):
+                out.pop()
+            if out:
+                out[-1] = out[-1].rstrip("\n") + "\n\n"
+            out.append(body.strip("\n") + "\n\n")
+            after_directive = True
+        return "".join(out).rstrip("\n") + "\n"
+
+    def render(self, template: str, invocation_ids: List[str]) -> Dict[str, str]:
+        """
+        Render a template for each invocation
+
+        Returns:
+            Dict of invocation id -> rendered Markdown
+        """
+        segments = parse_template(template)
+        self.collect(segments, invocation_ids)
+        return {i: self.render_one(segments, i) for i in invocation_ids}
+
+
+# ── CLI ──
+
+
+def to_html(markdown_text: str, title: str, markdown_module: Callable) -> str:
+    body = markdown_module(markdown_text, extensions=["tables", "fenced_code"])
+    return (f"<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>{html.escape(title)}</title></head>\n"
+            f"<body>\n{body}\n</body></html>\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Render a workflow report template for many invocations",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument("template", type=Path, help="Report template (.md) or workflow (.ga with report.markdown)")
+    parser.add_argument("invocations", nargs="*", help="Invocation IDs")
+    parser.add_argument("--workflow-id", help="Render all invocations of this stored workflow")
+    parser.add_argument("--limit", type=int, default=100, help="Max invocations with --workflow-id (default: 100)")
+    parser.add_argument("-o", "--output-dir", type=Path, default=Path("reports"),
+                        help="Directory for <invocation_id>.md and index.md (default: reports)")
+    parser.add_argument("--html", action="store_true", help="Also write .html (requires the markdown package)")
+    parser.add_argument("--url", help="Galaxy instance URL (or set GALAXY_URL env var)")
+    parser.add_argument("--api-key", help="Galaxy API key (or set GALAXY_API_KEY env var)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Concurrent API requests (default: {DEFAULT_WORKERS})")
+    parser.add_argument("--max-rows", type=int, default=DEFAULT_MAX_ROWS,
+                        help=f"Rows per history_dataset_as_table (default: {DEFAULT_MAX_ROWS})")
+    parser.add_argument("--cache-dir", type=Path, default=DEFAULT_CACHE_DIR,
+                        help=f"Response cache (default: {DEFAULT_CACHE_DIR})")
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write the response cache")
+    args = parser.parse_args()
+
+    url = args.url or os.environ.get("GALAXY_URL")
+    api_key = args.api_key or os.environ.get("GALAXY_API_KEY")
+    if not url or not api_key:
+        print("Error: Galaxy URL and API key required (--url/--api-key or GALAXY_URL/GALAXY_API_KEY)",
+              file=sys.stderr)
+        sys.exit(1)
+    markdown_module = None
+    if args.html:
+        try:
+            from markdown import markdown as markdown_module
+        except ImportError:
+            print("Error: markdown is not installed. Install with: pip install markdown", file=sys.stderr)
+            sys.exit(1)
+    try:
+        template = load_template(args.template)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    client = GalaxyClient(url, api_key)
+    invocation_ids = list(args.invocations)
+    if args.workflow_id:
+        try:
+            listed = client.get(f"invocations?workflow_id={args.workflow_id}&limit={args.limit}")
+        except (GalaxyAPIError, urllib.error.URLError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        invocation_ids += [i["id"] for i in listed if i["id"] not in invocation_ids]
+    if not invocation_ids:
+        print("Error: no invocations given (pass IDs or --workflow-id)", file=sys.stderr)
+        sys.exit(1)
+
+    cache = None if args.no_cache else ResponseCache(args.cache_dir, url)
+    compiler = ReportCompiler(client, url, cache, args.workers, args.max_rows)
+    reports = compiler.render(template, invocation_ids)
+
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    index = ["# Workflow reports", "", "| Invocation | State | Created | Report |", "|---|---|---|---|"]
+    failed = 0
+    for invocation_id, text in reports.items():
+        (args.output_dir / f"{invocation_id}.md").write_text(text)
+        if markdown_module:
+            (args.output_dir / f"{invocation_id}.html").write_text(to_html(text, invocation_id, markdown_module))
+        invocation = compiler.get(ReportCompiler._invocation_path(invocation_id))
+        if invocation is None:
+            failed += 1
+            print(f"❌ {invocation_id}: {compiler.data[ReportCompiler._invocation_path(invocation_id)]['error']}")
+            continue
+        index.append(f"| {invocation_id} | {invocation.get('state')} | {invocation.get('create_time', '')} "
+                     f"| [{invocation_id}.md]({invocation_id}.md) |")
+        print(f"✅ {invocation_id} ({invocation.get('state')})")
+    (args.output_dir / "index.md").write_text("\n".join(index) + "\n")
+    if markdown_module:
+        (args.output_dir / "index.html").write_text(to_html("\n".join(index), "Workflow reports", markdown_module))
+
+    stats = compiler.stats
+    print(f"\n{len(reports)} report(s) in {args.output_dir}: {stats['requests']} API requests, "
+          f"{stats['cached']} from cache, {stats['rounds']} fetch rounds after the invocations")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Tests for render_reports.py against an in-process stub Galaxy API.
+
+Usage:
+    python -m unittest test_render_reports      # from this directory
+    python -m pytest test_render_reports.py
+"""
+
+import tempfile
+import threading
+import unittest
+from collections import Counter
+from pathlib import Path
+
+from render_reports import GalaxyAPIError, ReportCompiler, ResponseCache
+
+
+def invocation(invocation_id, results, masks, job):
+    return {
+        "id": invocation_id, "state": "scheduled", "history_id": f"h{invocation_id}", "workflow_id": "wf1",
+        "create_time": "2026-01-01T10:00:00",
+        "inputs": {"0": {"id": "shared_in", "src": "hda", "label": "ROI image"}},
+        "outputs": {"Results": {"id": results, "src": "hda"}},
+        "output_collections": {"Masks": {"id": masks, "src": "hdca"}},
+        "steps": [{"workflow_step_label": "Threshold", "job_id": None, "jobs": [{"id": job}]}],
+    }
+
+
+def collection(*dataset_ids):
+    return {"name": "masks", "collection_type": "list", "populated_state": "ok",
+            "elements": [{"element_identifier": d, "element_type": "hda", "object": {"id": d, "state": "ok"}}
+                         for d in dataset_ids]}
+
+
+# API path -> response; inv1 is finished, inv2 still running
+RESPONSES = {
+    "invocations/inv1?step_details=true": invocation("inv1", "t1", "c1", "j1"),
+    "invocations/inv2?step_details=true": invocation("inv2", "t2", "c2", "j2"),
+    "datasets/shared_in": {"id": "shared_in", "name": "roi.tiff", "extension": "tiff", "state": "ok"},
+    "datasets/t1": {"id": "t1", "name": "results.tsv", "extension": "tabular", "state": "ok",
+                    "metadata_column_names": ["sample", "area"]},
+    "datasets/t2": {"id": "t2", "name": "results.tsv", "extension": "tabular", "state": "running"},
+    "datasets/t1/get_content_as_text": {"item_data": "s1\t10\ns2\t20\n"},
+    "datasets/m1": {"id": "m1", "name": "m1.png", "extension": "png", "state": "ok"},
+    "datasets/m2": {"id": "m2", "name": "m2.png", "extension": "png", "state": "ok"},
+    "dataset_collections/c1?instance_type=history": collection("m1", "m2"),
+    "dataset_collections/c2?instance_type=history": collection("m1"),
+    "jobs/j1?full=true": {"id": "j1", "state": "ok", "tool_stdout": "done\n", "tool_stderr": ""},
+    "jobs/j2?full=true": {"id": "j2", "state": "running", "tool_stdout": ""},
+    "jobs/j1/parameters_display": {"parameters": [{"text": "Method", "value": "otsu", "depth": 1}]},
+    "jobs/j2/parameters_display": {"parameters": [{"text": "Method", "value": "li", "depth": 1}]},
+    "workflows/wf1?instance=true": {"name": "Stain WF", "steps": {}},
+}
+
+TEMPLATE = """# Stain report
+
+```galaxy
+history_dataset_as_table(output="Results", show_column_headers=true)
+```
+**Masks**
+
+```galaxy
+history_dataset_as_image(output="Masks")
+```
+
+```galaxy
+job_parameters(step="Threshold")
+```
+
+```galaxy
+tool_stdout(step="Threshold")
+```
+
+```galaxy
+history_dataset_display(output="Missing")
+```
+"""
+
+
+class StubClient:
+    """get(path) against RESPONSES, counting requests per path"""
+
+    def __init__(self):
+        self.hits = Counter()
+        self._lock = threading.Lock()
+
+    def get(self, path):
+        with self._lock:
+            self.hits[path] += 1
+        if path not in RESPONSES:
+            raise GalaxyAPIError(f"GET {path}: HTTP 404: not found")
+        return RESPONSES[path]
+
+
+class ReportCompilerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_dir = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def render(self, cache=True):
+        client = StubClient()
+        url = "https://galaxy.example.org"
+        compiler = ReportCompiler(client, url, ResponseCache(self.cache_dir, url) if cache else None, workers=4)
+        return compiler.render(TEMPLATE, ["inv1", "inv2"]), client
+
+    def test_each_path_fetched_once(self):
+        reports, client = self.render(cache=False)
+        self.assertEqual(set(reports), {"inv1", "inv2"})
+        self.assertEqual([p for p, n in client.hits.items() if n > 1], [])
+        # m1 is in the Masks collection of both invocations
+        self.assertEqual(client.hits["datasets/m1"], 1)
+        # content only for the finished dataset
+        self.assertIn("datasets/t1/get_content_as_text", client.hits)
+        self.assertNotIn("datasets/t2/get_content_as_text", client.hits)
+
+    def test_rerun_serves_only_final_and_settled_responses_from_cache(self):
+        self.render()
+        _, client = self.render()
+        fetched = set(client.hits)
+        # still running, so fetched again
+        self.assertIn("invocations/inv1?step_details=true", fetched)
+        self.assertIn("datasets/t2", fetched)
+        self.assertIn("jobs/j2?full=true", fetched)
+        # final or settled
+        for path in ("datasets/t1", "datasets/t1/get_content_as_text", "datasets/m1",
+                     "dataset_collections/c1?instance_type=history", "jobs/j1?full=true",
+                     "jobs/j1/parameters_display"):
+            self.assertNotIn(path, fetched)
+
+    def test_settled_metadata_expires(self):
+        self.render()
+        cache = ResponseCache(self.cache_dir, "https://galaxy.example.org")
+        cache.put("datasets/t1", RESPONSES["datasets/t1"], max_age=-1)
+        _, client = self.render()
+        self.assertIn("datasets/t1", client.hits)
+        self.assertNotIn("datasets/t1/get_content_as_text", client.hits)
+
+    def test_unresolved_reference_renders_unavailable(self):
+        reports, _ = self.render(cache=False)
+        self.assertIn("*Unavailable", reports["inv1"])
+
+    def test_directive_output_is_a_separate_block(self):
+        reports, _ = self.render(cache=False)
+        report = reports["inv1"]
+        self.assertIn("| s2 | 20 |\n\n**Masks**", report)
+        self.assertNotIn("\n\n\n", report)
+
+
+if __name__ == "__main__":
+    unittest.main()